@@ -0,0 +1,122 @@
+"""
+POST /api/v1/batch/ -- beberapa GET JSON dalam satu round-trip.
+
+    {"requests": [
+        {"id": "coach", "url": "/api/v1/coaches/<uuid>/?include=reviews"},
+        {"id": "mine", "url": "/tournament/my/"}
+    ]}
+
+->  {"responses": [{"id": "coach", "status": 200, "body": {...}}, ...]}
+
+Sub-request dijalankan berurutan di proses yang sama, pakai session & objek
+user yang sama dengan request batch (user.coach / user.member cukup di-load
+sekali) dan di dalam main.request_cache.request_cache(), jadi lookup
+Coach / Member yang berulang antar sub-request tidak query ulang.
+Hanya view GET JSON di BATCH_VIEWS yang boleh dipanggil.
+"""
+import json
+import logging
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import Http404, JsonResponse
+from django.urls import Resolver404, resolve
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+from main.http import compress_response
+from main.request_cache import request_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_REQUESTS = 20
+BATCH_VIEWS = {
+    'api:coach_list', 'api:coach_detail',
+    'api:booking_list', 'api:booking_detail',
+    'api:review_list', 'api:review_detail',
+    'api:tournament_list', 'api:tournament_detail',
+    'api:community_list', 'api:community_detail',
+    'api:post_list', 'api:post_detail',
+    'reviews:coach_reviews_json', 'reviews:review_detail_json',
+    'tournaments:tournament_view', 'tournaments:my_tournaments_ajax', 'tournaments:tournament_show',
+    'forum:post_feed', 'forum:comment_list',
+    'community:message_history',
+}
+# Header request batch yang tidak diteruskan ke sub-request: sub-response tidak
+# dikompres / 304 sendiri (response gabungan yang dikompres)
+_DROP_META = {
+    'HTTP_ACCEPT_ENCODING', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+    'CONTENT_TYPE', 'CONTENT_LENGTH',
+}
+
+
+def _sub_request(request, url):
+    parts = urlsplit(url)
+    environ = {key: value for key, value in request.META.items() if key not in _DROP_META}
+    environ.update({
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': parts.path,
+        'QUERY_STRING': parts.query,
+        # View yang juga melayani HTML (tournament_view, dll) -> varian JSON
+        'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest',
+        'wsgi.input': BytesIO(b''),
+        'wsgi.url_scheme': request.scheme,
+    })
+    sub = WSGIRequest(environ)
+    sub.user = request.user
+    sub.session = request.session
+    return sub
+
+
+def _run(request, url):
+    """Jalankan satu sub-request. Return dict {status, body[, location]}."""
+    if not isinstance(url, str) or not url.startswith('/'):
+        return {'status': 400, 'body': {'error': "'url' must be an absolute path"}}
+    try:
+        match = resolve(urlsplit(url).path)
+    except Resolver404:
+        return {'status': 404, 'body': {'error': 'Not found'}}
+    if match.view_name not in BATCH_VIEWS:
+        return {'status': 403, 'body': {'error': f"'{match.view_name}' is not allowed in a batch"}}
+
+    try:
+        response = match.func(_sub_request(request, url), *match.args, **match.kwargs)
+    except Http404:
+        return {'status': 404, 'body': {'error': 'Not found'}}
+    except PermissionDenied:
+        return {'status': 403, 'body': {'error': 'Forbidden'}}
+    except Exception:
+        logger.exception('Batch sub-request %s failed', url)
+        return {'status': 500, 'body': {'error': 'Internal error'}}
+
+    result = {'status': response.status_code, 'body': None}
+    if response.has_header('Location'):
+        result['location'] = response['Location']
+    if response['Content-Type'].startswith('application/json') and not response.streaming:
+        result['body'] = json.loads(response.content)
+    return result
+
+
+@csrf_exempt  # hanya menjalankan view GET (read-only)
+@require_POST
+@compress_response
+def batch(request):
+    try:
+        payload = json.loads(request.body)
+        items = payload['requests']
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Body must be {"requests": [{"id": ..., "url": ...}, ...]}'}, status=400)
+    if len(items) > MAX_BATCH_REQUESTS:
+        return JsonResponse({'error': f'At most {MAX_BATCH_REQUESTS} requests per batch'}, status=400)
+
+    responses = []
+    with request_cache():
+        for index, item in enumerate(items):
+            result = _run(request, item.get('url'))
+            responses.append({'id': item.get('id', index), **result})
+    return JsonResponse({'responses': responses})
@@ -0,0 +1,327 @@
+"""
+Serializer ringan untuk /api/v1/ (tanpa dependency tambahan).
+
+Satu Serializer per resource:
+
+    class CoachSerializer(Serializer):
+        model = Coach
+        fields = {
+            "id": Field("pk"),
+            "name": Field(lambda c: c.user.get_full_name(), related=("user",)),
+        }
+        includes = {"reviews": Include("received_reviews", ReviewSerializer, many=True)}
+
+- `?fields=id,name` memilih field (sparse fieldset); select_related /
+  annotation hanya dipasang untuk field yang dipilih.
+- `?include=reviews` menyisipkan objek relasi; FK -> select_related,
+  many -> prefetch_related dengan queryset yang sudah dioptimasi serializer
+  anaknya. Field objek include bisa dipilih dengan `?fields[reviews]=id,rating`.
+"""
+from django.contrib.auth.models import User
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+
+from booking.models import Booking
+from community.models import Community
+from forum.models import Comment, ForumPost
+from reviews.models import Review
+from tournaments.models import Tournament
+from users.models import Coach, Member
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class Field:
+    """
+    source: nama atribut atau fungsi(obj).
+    related: path select_related yang dibaca field ini.
+    annotation: (nama, expression) yang perlu di-annotate ke queryset.
+    """
+
+    def __init__(self, source, related=(), annotation=None):
+        self.source = source
+        self.related = tuple(related)
+        self.annotation = annotation
+
+    def get(self, obj):
+        if callable(self.source):
+            return self.source(obj)
+        return getattr(obj, self.source)
+
+
+class Include:
+    def __init__(self, path, serializer, many=False, queryset=None):
+        self.path = path
+        self.serializer = serializer
+        self.many = many
+        self.queryset = queryset
+
+
+def count_of(model, fk, **filters):
+    """COUNT baris `model` per objek lewat subquery (tanpa GROUP BY di query utama)."""
+    rows = (
+        model._default_manager.filter(**{fk: OuterRef("pk")}, **filters)
+        .order_by()
+        .values(fk)
+        .annotate(n=Count("pk"))
+        .values("n")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def _names(raw):
+    return [name.strip() for name in raw.split(",") if name.strip()]
+
+
+class Serializer:
+    model = None
+    fields = {}
+    includes = {}
+
+    def __init__(self, fields=None, include=(), include_fields=None):
+        include_fields = include_fields or {}
+        if fields is not None:
+            unknown = set(fields) - set(self.fields)
+            if unknown:
+                raise ApiError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+            fields = [name for name in self.fields if name in fields]
+        self.selected = fields if fields else list(self.fields)
+
+        unknown = set(include) - set(self.includes)
+        if unknown:
+            raise ApiError(f"Unknown include(s): {', '.join(sorted(unknown))}")
+        self.nested = {
+            name: self.includes[name].serializer(fields=include_fields.get(name))
+            for name in self.includes if name in include
+        }
+
+    @classmethod
+    def from_request(cls, request):
+        include_fields = {
+            key[len("fields["):-1]: _names(value)
+            for key, value in request.GET.items()
+            if key.startswith("fields[") and key.endswith("]")
+        }
+        include = _names(request.GET.get("include", ""))
+        unknown = set(include_fields) - set(include)
+        if unknown:
+            raise ApiError(f"fields[...] for relation(s) not included: {', '.join(sorted(unknown))}")
+        fields = _names(request.GET["fields"]) if request.GET.get("fields") else None
+        return cls(fields=fields, include=include, include_fields=include_fields)
+
+    def _select_related(self, prefix=""):
+        paths = set()
+        for name in self.selected:
+            paths.update(prefix + path for path in self.fields[name].related)
+        for name, child in self.nested.items():
+            spec = self.includes[name]
+            if not spec.many:
+                paths.add(prefix + spec.path)
+                paths |= child._select_related(prefix + spec.path + "__")
+        return paths
+
+    def optimize(self, queryset):
+        """Pasang select_related / prefetch_related / annotate sesuai field & include terpilih."""
+        select = self._select_related()
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        annotations = dict(
+            self.fields[name].annotation for name in self.selected if self.fields[name].annotation
+        )
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        for name, child in self.nested.items():
+            spec = self.includes[name]
+            if spec.many:
+                base = spec.queryset if spec.queryset is not None else child.model._default_manager.all()
+                queryset = queryset.prefetch_related(Prefetch(spec.path, queryset=child.optimize(base)))
+        return queryset
+
+    def serialize(self, obj):
+        data = {name: self.fields[name].get(obj) for name in self.selected}
+        for name, child in self.nested.items():
+            spec = self.includes[name]
+            if spec.many:
+                data[name] = [child.serialize(o) for o in getattr(obj, spec.path).all()]
+            else:
+                related = getattr(obj, spec.path)
+                data[name] = child.serialize(related) if related is not None else None
+        return data
+
+
+def _full_name(user):
+    return user.get_full_name() or user.username
+
+
+class UserSerializer(Serializer):
+    model = User
+    fields = {
+        "id": Field("pk"),
+        "username": Field("username"),
+        "first_name": Field("first_name"),
+        "last_name": Field("last_name"),
+    }
+
+
+class MemberSerializer(Serializer):
+    model = Member
+    fields = {
+        "id": Field("pk"),
+        "username": Field(lambda m: m.user.username, related=("user",)),
+        "name": Field(lambda m: _full_name(m.user), related=("user",)),
+        "city": Field("city"),
+        "profile_photo": Field("profile_photo"),
+    }
+
+
+class ReviewSerializer(Serializer):
+    model = Review
+    fields = {
+        "id": Field("pk"),
+        "coach_id": Field("coach_id"),
+        "reviewer_id": Field("reviewer_id"),
+        "reviewer_username": Field(lambda r: r.reviewer.user.username, related=("reviewer__user",)),
+        "rating": Field("rating"),
+        "comment": Field("comment"),
+        "created_at": Field("created_at"),
+        "updated_at": Field("updated_at"),
+    }
+
+
+class CoachSerializer(Serializer):
+    model = Coach
+    fields = {
+        "id": Field("pk"),
+        "username": Field(lambda c: c.user.username, related=("user",)),
+        "name": Field(lambda c: _full_name(c.user), related=("user",)),
+        "sport": Field("sport"),
+        "city": Field("city"),
+        "hourly_fee": Field("hourly_fee"),
+        "profile_photo": Field("profile_photo"),
+        "description": Field("description"),
+        "phone": Field("phone"),
+        "rating_avg": Field(lambda c: round(c.rating_avg, 2)),
+        "rating_count": Field("rating_count"),
+    }
+    includes = {
+        "user": Include("user", UserSerializer),
+        "reviews": Include(
+            "received_reviews", ReviewSerializer, many=True,
+            queryset=Review.objects.order_by("-created_at", "-id"),
+        ),
+    }
+
+
+# Include balik ke coach / reviewer (didefinisikan setelah CoachSerializer ada)
+ReviewSerializer.includes = {
+    "coach": Include("coach", CoachSerializer),
+    "reviewer": Include("reviewer", MemberSerializer),
+}
+MemberSerializer.includes = {"user": Include("user", UserSerializer)}
+
+
+class BookingSerializer(Serializer):
+    model = Booking
+    fields = {
+        "id": Field("pk"),
+        "coach_id": Field("coach_id"),
+        "member_id": Field("member_id"),
+        "date": Field("date"),
+        "start_time": Field("start_time"),
+        "end_time": Field("end_time"),
+        "location": Field("location"),
+        # display_status: booking yang sudah lewat tampil completed (Booking.with_display_status)
+        "status": Field(lambda b: getattr(b, "display_status", b.status)),
+        "created_at": Field("created_at"),
+    }
+    includes = {
+        "coach": Include("coach", CoachSerializer),
+        "member": Include("member", MemberSerializer),
+    }
+
+
+class TournamentSerializer(Serializer):
+    model = Tournament
+    fields = {
+        "id": Field("pk"),
+        "name": Field("namaTournaments"),
+        "category": Field("tipeTournaments"),
+        "date": Field("tanggalTournaments"),
+        "location": Field("lokasiTournaments"),
+        "description": Field("deskripsiTournaments"),
+        "poster": Field("posterTournaments"),
+        "is_open": Field("flagTournaments"),
+        "creator_id": Field("pembuatTournaments_id"),
+        "participants_count": Field("jumlahPesertaTournaments"),
+        "capacity": Field("kapasitasTournaments"),
+        "updated_at": Field("updated_at"),
+    }
+    includes = {
+        "creator": Include("pembuatTournaments", CoachSerializer),
+        "participants": Include("pesertaTournaments", MemberSerializer, many=True),
+    }
+
+
+class CommunitySerializer(Serializer):
+    model = Community
+    fields = {
+        "id": Field("pk"),
+        "name": Field("name"),
+        "short_description": Field("short_description"),
+        "full_description": Field("full_description"),
+        "profile_image_url": Field("profile_image_url"),
+        "created_at": Field("created_at"),
+        "created_by_id": Field("created_by_id"),
+        "members_count": Field("members_count"),
+    }
+    includes = {
+        "created_by": Include("created_by", UserSerializer),
+    }
+
+
+class CommentSerializer(Serializer):
+    model = Comment
+    fields = {
+        "id": Field("pk"),
+        "author_id": Field("author_id"),
+        "name": Field("name"),
+        "content": Field("content"),
+        "parent_id": Field("parent_id"),
+        "depth": Field("depth"),
+        "replies_count": Field("replies_count"),
+        "created_at": Field("created_at"),
+    }
+    includes = {
+        "author": Include("author", UserSerializer),
+    }
+
+
+class PostSerializer(Serializer):
+    model = ForumPost
+    fields = {
+        "id": Field("pk"),
+        "author_id": Field("author_id"),
+        "author_username": Field(lambda p: p.author.username, related=("author",)),
+        "content": Field("content"),
+        "created_at": Field("created_at"),
+        "score": Field("score"),
+        "upvotes": Field("upvotes"),
+        "downvotes": Field("downvotes"),
+        "comments_count": Field(
+            "active_comments",
+            annotation=("active_comments", count_of(Comment, "post", is_active=True)),
+        ),
+    }
+    includes = {
+        "author": Include("author", UserSerializer),
+        # Komentar level atas saja; balasan lewat endpoint comment_list forum
+        "comments": Include(
+            "comments", CommentSerializer, many=True,
+            queryset=Comment.objects.filter(is_active=True, parent__isnull=True).order_by("id"),
+        ),
+    }
@@ -0,0 +1,185 @@
+import gzip
+import json
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from booking.models import Booking
+from community.models import Community, Membership
+from forum.models import Comment, ForumPost
+from reviews.models import Review
+from tournaments.models import Tournament
+from users.models import Coach, Member
+
+
+class ApiTestData(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.coaches = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'coach{i}', password='pass123', first_name=f'Coach{i}')
+            cls.coaches.append(Coach.objects.create(user=user, sport='tennis', city='Depok', hourly_fee=100 + i))
+        cls.member_user = User.objects.create_user(username='member', password='pass123')
+        cls.member = Member.objects.create(user=cls.member_user, city='Depok', phone='1')
+        for i, coach in enumerate(cls.coaches):
+            other = Member.objects.create(
+                user=User.objects.create_user(username=f'm{i}', password='pass123'), city='Bogor', phone='1'
+            )
+            Review.objects.create(coach=coach, reviewer=other, rating=4, comment='ok')
+            Review.objects.create(coach=coach, reviewer=cls.member, rating=5, comment='mantap')
+        cls.booking = Booking.objects.create(
+            coach=cls.coaches[0], member=cls.member, date=date.today() + timedelta(days=1),
+            start_time=time(9), end_time=time(10),
+        )
+        cls.tournament = Tournament.objects.create(
+            pembuatTournaments=cls.coaches[0], tipeTournaments='tennis', namaTournaments='Open',
+            tanggalTournaments=date.today() + timedelta(days=3), lokasiTournaments='GOR',
+            deskripsiTournaments='-', posterTournaments='https://example.com/p.png',
+        )
+        cls.tournament.add_participant(cls.member)
+        cls.community = Community.objects.create(
+            name='Tenis Depok', short_description='s', full_description='f', created_by=cls.member_user
+        )
+        Membership.objects.create(community=cls.community, user=cls.member_user)
+        cls.post = ForumPost.objects.create(author=cls.member_user, content='Halo forum')
+        Comment.objects.create(post=cls.post, author=cls.member_user, content='komentar')
+
+
+class ApiV1Tests(ApiTestData):
+    def get(self, name, *args, **params):
+        return self.client.get(reverse(f'api:{name}', args=args), params)
+
+    def test_sparse_fieldset(self):
+        data = self.get('coach_list', fields='id,name').json()['data']
+        self.assertEqual(len(data), 3)
+        self.assertEqual(set(data[0]), {'id', 'name'})
+
+    def test_include_has_constant_query_count(self):
+        with self.assertNumQueries(2):  # coach + user (JOIN), reviews + reviewer user (prefetch)
+            data = self.get('coach_list', include='reviews,user', **{'fields[reviews]': 'rating,reviewer_username'}).json()['data']
+        self.assertEqual(len(data[0]['reviews']), 2)
+        self.assertEqual(set(data[0]['reviews'][0]), {'rating', 'reviewer_username'})
+        self.assertEqual(data[0]['user']['username'], data[0]['username'])
+
+        with self.assertNumQueries(1):
+            data = self.get('review_list', include='coach,reviewer').json()['data']
+        self.assertEqual(len(data), 6)
+        self.assertIn('name', data[0]['coach'])
+
+    def test_unknown_field_or_include_is_400(self):
+        self.assertEqual(self.get('coach_list', fields='password').status_code, 400)
+        self.assertEqual(self.get('coach_list', include='bookings').status_code, 400)
+        self.assertEqual(self.get('coach_list', **{'fields[user]': 'id'}).status_code, 400)
+        self.assertEqual(self.get('coach_list', limit='x').status_code, 400)
+        response = self.get('review_list', coach='abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': "'coach' must be a UUID"})
+
+    def test_pagination(self):
+        first = self.get('coach_list', limit=2, fields='id').json()
+        self.assertTrue(first['meta']['has_more'])
+        second = self.client.get(first['meta']['next']).json()
+        self.assertFalse(second['meta']['has_more'])
+        ids = [c['id'] for c in first['data'] + second['data']]
+        self.assertEqual(len(set(ids)), 3)
+
+    def test_bookings_require_login_and_are_scoped(self):
+        self.assertEqual(self.get('booking_list').status_code, 401)
+        self.client.login(username='member', password='pass123')
+        data = self.get('booking_list', include='coach').json()['data']
+        self.assertEqual([b['id'] for b in data], [self.booking.id])
+        self.assertEqual(data[0]['coach']['username'], 'coach0')
+
+        self.client.login(username='coach2', password='pass123')
+        self.assertEqual(self.get('booking_list').json()['data'], [])
+        self.assertEqual(self.get('booking_detail', self.booking.id).status_code, 404)
+
+    def test_detail_endpoints_and_counts(self):
+        tournament = self.get('tournament_detail', self.tournament.pk, include='participants').json()['data']
+        self.assertEqual(tournament['participants_count'], 1)
+        self.assertEqual(tournament['participants'][0]['username'], 'member')
+
+        community = self.get('community_detail', self.community.pk).json()['data']
+        self.assertEqual(community['members_count'], 1)
+
+        post = self.get('post_detail', self.post.pk, include='comments,author').json()['data']
+        self.assertEqual(post['comments_count'], 1)
+        self.assertEqual(post['comments'][0]['content'], 'komentar')
+        self.assertEqual(post['author']['username'], 'member')
+
+        self.assertEqual(self.get('post_detail', 9999).json(), {'error': 'Not found'})
+
+    def test_gzip_compression(self):
+        url = reverse('api:review_list')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        payload = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(payload['data']), 6)
+
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertLess(len(response.content), len(plain.content))
+
+
+class BatchTests(ApiTestData):
+    def batch(self, *urls, **extra):
+        body = {'requests': [{'id': str(i), 'url': url} for i, url in enumerate(urls)]}
+        response = self.client.post(
+            reverse('api:batch'), json.dumps(body), content_type='application/json', **extra
+        )
+        return response
+
+    def test_combines_whitelisted_reads(self):
+        self.client.login(username='member', password='pass123')
+        coach = self.coaches[0]
+        response = self.batch(
+            reverse('api:coach_detail', args=[coach.pk]) + '?fields=id,name',
+            reverse('reviews:coach_reviews_json', args=[coach.pk]),
+            reverse('api:booking_list'),
+            reverse('tournaments:my_tournaments_ajax'),
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([r['status'] for r in results], [200, 200, 200, 200])
+        self.assertEqual([r['id'] for r in results], ['0', '1', '2', '3'])
+        self.assertEqual(set(results[0]['body']['data']), {'id', 'name'})
+        self.assertEqual(results[1]['body']['pagination']['total_items'], 2)
+        self.assertEqual(results[2]['body']['data'][0]['id'], self.booking.id)
+        self.assertEqual(results[3]['body']['tournaments'][0]['nama'], 'Open')
+
+    def test_shared_lookups_within_batch(self):
+        self.client.login(username='member', password='pass123')
+        url = reverse('reviews:coach_reviews_json', args=[self.coaches[0].pk])
+        with CaptureQueriesContext(connection) as ctx:
+            results = self.batch(url, url + '?rating=5').json()['responses']
+        self.assertEqual([r['status'] for r in results], [200, 200])
+        member_lookups = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'FROM "users_member"' in q['sql']]
+        coach_lookups = [q for q in ctx.captured_queries if q['sql'].startswith('SELECT "users_coach"')]
+        self.assertEqual(len(member_lookups), 1)
+        self.assertEqual(len(coach_lookups), 1)
+
+    def test_rejects_non_whitelisted_and_unknown(self):
+        results = self.batch('/forum/create/', '/tidak-ada/', 'relative').json()['responses']
+        self.assertEqual([r['status'] for r in results], [403, 404, 400])
+        # Sub-request login_required tanpa login -> redirect dilaporkan apa adanya
+        result = self.batch(reverse('tournaments:my_tournaments_ajax')).json()['responses'][0]
+        self.assertEqual(result['status'], 302)
+        self.assertIn('location', result)
+
+    def test_invalid_body_and_method(self):
+        url = reverse('api:batch')
+        self.assertEqual(self.client.post(url, 'nope', content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.post(url, json.dumps({'requests': ['/x/']}), content_type='application/json').status_code, 400)
+        self.assertEqual(self.batch(*['/api/v1/coaches/'] * 21).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+    def test_combined_response_is_compressed(self):
+        response = self.batch(reverse('api:review_list'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(body['responses'][0]['body']['data']), 6)
@@ -0,0 +1,21 @@
+from django.urls import path
+
+from . import batch, views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('coaches/', views.coach_list, name='coach_list'),
+    path('coaches/<uuid:coach_id>/', views.coach_detail, name='coach_detail'),
+    path('bookings/', views.booking_list, name='booking_list'),
+    path('bookings/<int:booking_id>/', views.booking_detail, name='booking_detail'),
+    path('reviews/', views.review_list, name='review_list'),
+    path('reviews/<int:review_id>/', views.review_detail, name='review_detail'),
+    path('tournaments/', views.tournament_list, name='tournament_list'),
+    path('tournaments/<uuid:tournament_id>/', views.tournament_detail, name='tournament_detail'),
+    path('communities/', views.community_list, name='community_list'),
+    path('communities/<int:community_id>/', views.community_detail, name='community_detail'),
+    path('posts/', views.post_list, name='post_list'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('batch/', batch.batch, name='batch'),
+]
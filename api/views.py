@@ -0,0 +1,206 @@
+"""
+/api/v1/ -- JSON read API untuk client mobile (Flutter).
+
+Semua endpoint list menerima:
+    ?fields=a,b           sparse fieldset
+    ?include=rel          objek relasi (lihat `includes` di serializers)
+    ?fields[rel]=a,b      field objek relasi
+    ?limit=20&offset=0    paging (limit maks. 100)
+
+Format: {"data": [...], "meta": {"limit", "offset", "has_more", "next"}} untuk
+list dan {"data": {...}} untuk detail. Error: {"error": "..."}.
+Response di-gzip (atau brotli kalau terpasang) lewat main.http.compress_response.
+"""
+import uuid
+from functools import wraps
+
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from booking.models import Booking
+from community.models import Community
+from forum.models import ForumPost
+from main.http import compress_response
+from reviews.models import Review
+from tournaments.models import Tournament
+from users.models import Coach
+
+from .serializers import (
+    ApiError,
+    BookingSerializer,
+    CoachSerializer,
+    CommunitySerializer,
+    PostSerializer,
+    ReviewSerializer,
+    TournamentSerializer,
+)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def api_view(view):
+    """GET saja, ApiError -> JSON error, response dikompres."""
+    @require_GET
+    @compress_response
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as exc:
+            return JsonResponse({"error": exc.message}, status=exc.status)
+        except Http404:
+            return JsonResponse({"error": "Not found"}, status=404)
+
+    return wrapper
+
+
+def _int_param(request, name, default):
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise ApiError(f"'{name}' must be an integer") from None
+
+
+def _uuid_param(request, name):
+    raw = request.GET.get(name)
+    if not raw:
+        return None
+    try:
+        return uuid.UUID(raw)
+    except ValueError:
+        raise ApiError(f"'{name}' must be a UUID") from None
+
+
+def _require_login(request):
+    if not request.user.is_authenticated:
+        raise ApiError("Authentication required", status=401)
+
+
+def _list_response(request, queryset, serializer_cls):
+    serializer = serializer_cls.from_request(request)
+    limit = min(max(_int_param(request, "limit", DEFAULT_LIMIT), 1), MAX_LIMIT)
+    offset = max(_int_param(request, "offset", 0), 0)
+
+    # Ambil 1 ekstra untuk has_more, tanpa COUNT(*)
+    rows = list(serializer.optimize(queryset)[offset:offset + limit + 1])
+    has_more = len(rows) > limit
+    next_url = None
+    if has_more:
+        params = request.GET.copy()
+        params["offset"] = offset + limit
+        next_url = f"{request.path}?{params.urlencode()}"
+    return JsonResponse({
+        "data": [serializer.serialize(obj) for obj in rows[:limit]],
+        "meta": {"limit": limit, "offset": offset, "has_more": has_more, "next": next_url},
+    })
+
+
+def _detail_response(request, queryset, serializer_cls, **lookup):
+    serializer = serializer_cls.from_request(request)
+    obj = get_object_or_404(serializer.optimize(queryset), **lookup)
+    return JsonResponse({"data": serializer.serialize(obj)})
+
+
+# ================== Coaches ==================
+@api_view
+def coach_list(request):
+    qs = Coach.objects.order_by("-rating_avg", "-rating_count", "pk")
+    if request.GET.get("sport"):
+        qs = qs.filter(sport=request.GET["sport"])
+    if request.GET.get("city"):
+        qs = qs.filter(city__iexact=request.GET["city"])
+    return _list_response(request, qs, CoachSerializer)
+
+
+@api_view
+def coach_detail(request, coach_id):
+    return _detail_response(request, Coach.objects.all(), CoachSerializer, pk=coach_id)
+
+
+# ================== Bookings (milik user login) ==================
+def _my_bookings(request):
+    _require_login(request)
+    qs = Booking.objects.filter(Q(member__user=request.user) | Q(coach__user=request.user))
+    return Booking.with_display_status(qs)
+
+
+@api_view
+def booking_list(request):
+    qs = _my_bookings(request).order_by("-date", "-start_time", "-id")
+    if request.GET.get("status"):
+        qs = qs.filter(display_status=request.GET["status"])
+    return _list_response(request, qs, BookingSerializer)
+
+
+@api_view
+def booking_detail(request, booking_id):
+    return _detail_response(request, _my_bookings(request), BookingSerializer, pk=booking_id)
+
+
+# ================== Reviews ==================
+@api_view
+def review_list(request):
+    qs = Review.objects.order_by("-created_at", "-id")
+    coach_id = _uuid_param(request, "coach")
+    if coach_id is not None:
+        qs = qs.filter(coach_id=coach_id)
+    rating = _int_param(request, "rating", None)
+    if rating is not None:
+        qs = qs.filter(rating=rating)
+    return _list_response(request, qs, ReviewSerializer)
+
+
+@api_view
+def review_detail(request, review_id):
+    return _detail_response(request, Review.objects.all(), ReviewSerializer, pk=review_id)
+
+
+# ================== Tournaments ==================
+@api_view
+def tournament_list(request):
+    qs = Tournament.objects.order_by("tanggalTournaments", "pk")
+    if request.GET.get("category"):
+        qs = qs.filter(tipeTournaments=request.GET["category"])
+    if request.GET.get("open") in ("1", "true"):
+        qs = qs.filter(flagTournaments=True)
+    return _list_response(request, qs, TournamentSerializer)
+
+
+@api_view
+def tournament_detail(request, tournament_id):
+    return _detail_response(request, Tournament.objects.all(), TournamentSerializer, pk=tournament_id)
+
+
+# ================== Communities ==================
+@api_view
+def community_list(request):
+    qs = Community.objects.order_by("-created_at", "-id")
+    if request.GET.get("q"):
+        q = request.GET["q"]
+        qs = qs.filter(Q(name__icontains=q) | Q(short_description__icontains=q))
+    return _list_response(request, qs, CommunitySerializer)
+
+
+@api_view
+def community_detail(request, community_id):
+    return _detail_response(request, Community.objects.all(), CommunitySerializer, pk=community_id)
+
+
+# ================== Forum ==================
+@api_view
+def post_list(request):
+    qs = ForumPost.objects.order_by("-created_at", "-id")
+    if request.GET.get("author"):
+        qs = qs.filter(author__username=request.GET["author"])
+    return _list_response(request, qs, PostSerializer)
+
+
+@api_view
+def post_detail(request, post_id):
+    return _detail_response(request, ForumPost.objects.all(), PostSerializer, pk=post_id)
@@ -5,6 +5,7 @@ from django.http import JsonResponse
 from django.contrib.auth.models import User
 import json
 from django.contrib.auth import logout as auth_logout
+from users.passwords import create_user
 
 @csrf_exempt
 def login(request):
@@ -56,8 +57,7 @@ def register(request):
             }, status=400)
         
         # Create the new user
-        user = User.objects.create_user(username=username, password=password1)
-        user.save()
+        user = create_user(username=username, password=password1)
         
         return JsonResponse({
             "username": user.username,
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Booking
+from .models import Booking, CoachAvailability
 
 
 @admin.register(Booking)
@@ -57,3 +57,14 @@ class BookingAdmin(admin.ModelAdmin):
 
     def has_view_permission(self, request, obj=None):
         return True
+
+
+@admin.register(CoachAvailability)
+class CoachAvailabilityAdmin(admin.ModelAdmin):
+    """Jadwal mingguan coach (sumber slot kosong di booking/slots.py)."""
+
+    list_display = ("coach", "weekday", "start_time", "end_time")
+    list_filter = ("weekday",)
+    search_fields = ("coach__user__username", "coach__user__first_name")
+    list_select_related = ("coach__user",)
+    ordering = ("coach", "weekday", "start_time")
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # Sweeper booking completed in-process (opsional, default mati).
+        # Alternatifnya jalankan `manage.py complete_bookings` dari cron.
+        interval = getattr(settings, 'BOOKING_SWEEPER_INTERVAL', 0)
+        if interval:
+            from .sweeper import start_scheduler
+            start_scheduler(interval, getattr(settings, 'BOOKING_SWEEPER_BATCH_SIZE', 500))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from booking.sweeper import complete_expired_bookings
+from main.tasks import enqueue
+
+
+class Command(BaseCommand):
+    help = "Tandai booking aktif yang sudah lewat jadi 'completed' (bulk UPDATE per batch)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--interval", type=int, default=0,
+            help="Ulangi setiap N detik (0 = jalan sekali lalu keluar).",
+        )
+        parser.add_argument(
+            "--enqueue", action="store_true",
+            help="Masukkan sweep ke task queue (diproses `run_worker`) alih-alih jalan di sini.",
+        )
+
+    def handle(self, *args, **options):
+        if options["enqueue"]:
+            # Key per menit: cron di beberapa host tidak membuat sweep dobel
+            _, created = enqueue(
+                "booking.complete_expired", kwargs={"batch_size": options["batch_size"]},
+                key=f"booking.complete_expired:{timezone.now():%Y-%m-%dT%H:%M}",
+            )
+            self.stdout.write("Sweep enqueued." if created else "Sweep already enqueued for this minute.")
+            return
+
+        while True:
+            count, elapsed_ms = complete_expired_bookings(options["batch_size"])
+            self.stdout.write(
+                self.style.SUCCESS(f"{count} booking(s) marked as completed in {elapsed_ms:.1f} ms.")
+            )
+            if not options["interval"]:
+                return
+            time.sleep(options["interval"])
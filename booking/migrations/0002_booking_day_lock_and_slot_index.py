@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingDayLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['coach', 'date', 'status', 'start_time', 'end_time'], name='booking_coach_slot_idx'),
+        ),
+        migrations.AddField(
+            model_name='bookingdaylock',
+            name='coach',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.coach'),
+        ),
+        migrations.AddConstraint(
+            model_name='bookingdaylock',
+            constraint=models.UniqueConstraint(fields=('coach', 'date'), name='unique_booking_lock_per_coach_day'),
+        ),
+    ]
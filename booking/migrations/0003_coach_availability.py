@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0002_booking_day_lock_and_slot_index'),
+        ('users', '0003_coach_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CoachAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('coach', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability', to='users.coach')),
+            ],
+            options={
+                'ordering': ['weekday', 'start_time'],
+                'indexes': [models.Index(fields=['coach', 'weekday', 'start_time'], name='booking_availability_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('start_time__lt', models.F('end_time'))), name='availability_start_before_end')],
+            },
+        ),
+    ]
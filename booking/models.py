@@ -1,9 +1,89 @@
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Case, CharField, F, Q, Value, When
 from django.utils import timezone
 from users.models import Coach, Member
 from datetime import time as dtime
 
 
+ACTIVE_STATUSES = ['pending', 'confirmed', 'rescheduled']
+
+
+def expired_q(now=None):
+    """Filter booking aktif yang jam selesainya sudah lewat (belum ditandai completed)."""
+    now = timezone.localtime(now)
+    return Q(status__in=ACTIVE_STATUSES) & (
+        Q(date__lt=now.date()) | Q(date=now.date(), end_time__lt=now.time())
+    )
+
+
+class BookingDayLock(models.Model):
+    """
+    Satu baris per (coach, tanggal) yang di-lock selama cek bentrok + simpan booking,
+    supaya dua request bersamaan untuk slot yang sama tidak bisa lolos dua-duanya.
+    """
+    coach = models.ForeignKey(Coach, on_delete=models.CASCADE, related_name="+")
+    date = models.DateField()
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["coach", "date"], name="unique_booking_lock_per_coach_day"),
+        ]
+
+    def __str__(self):
+        return f"lock {self.coach_id} @ {self.date}"
+
+    @classmethod
+    def acquire(cls, coach, date):
+        """
+        Lock baris (coach, date) sampai transaksi yang sedang berjalan selesai.
+        Harus dipanggil di dalam transaction.atomic().
+        """
+        if connection.features.has_select_for_update:
+            lock, _ = cls.objects.get_or_create(coach=coach, date=date)
+            return cls.objects.select_for_update().get(pk=lock.pk)
+
+        # SQLite tidak punya row lock: statement pertama di transaksi harus berupa
+        # write supaya koneksi langsung memegang write lock database sebelum cek bentrok.
+        if not cls.objects.filter(coach=coach, date=date).update(version=F("version") + 1):
+            try:
+                with transaction.atomic():
+                    cls.objects.create(coach=coach, date=date)
+            except IntegrityError:
+                cls.objects.filter(coach=coach, date=date).update(version=F("version") + 1)
+        return cls.objects.get(coach=coach, date=date)
+
+
+class CoachAvailability(models.Model):
+    """Jendela jadwal mingguan coach (berulang tiap minggu), dasar slot di booking/slots.py."""
+
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    ]
+    coach = models.ForeignKey(Coach, on_delete=models.CASCADE, related_name="availability")
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)  # sama dengan date.weekday()
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+
+    class Meta:
+        ordering = ['weekday', 'start_time']
+        indexes = [
+            models.Index(fields=['coach', 'weekday', 'start_time'], name='booking_availability_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=Q(start_time__lt=F('end_time')), name='availability_start_before_end'),
+        ]
+
+    def __str__(self):
+        return f"{self.coach_id} {self.get_weekday_display()} {self.start_time:%H:%M}-{self.end_time:%H:%M}"
+
+
 class Booking(models.Model):
     # --- Relasi (One-to-One) ---
     coach = models.ForeignKey(Coach, on_delete=models.CASCADE, related_name="bookings")
@@ -28,6 +108,19 @@ class Booking(models.Model):
 
     class Meta:
         ordering = ['-date', '-start_time', '-created_at']
+        indexes = [
+            models.Index(
+                fields=['coach', 'date', 'status', 'start_time', 'end_time'],
+                name='booking_coach_slot_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # (coach, tanggal) saat dimuat: signals menginvalidasi cache slot hari lama kalau booking dipindah
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_slot_day = (instance.__dict__.get('coach_id'), instance.__dict__.get('date'))
+        return instance
 
     def __str__(self):
         coach_name = (
@@ -40,6 +133,104 @@ class Booking(models.Model):
         )
         return f"{member_name} with {coach_name} on {self.date} {self.start_time}-{self.end_time}"
 
+    @property
+    def status_label(self):
+        """Label status yang ditampilkan; pakai anotasi `display_status` kalau ada."""
+        status = getattr(self, 'display_status', self.status)
+        return dict(self.STATUS_CHOICES).get(status, status)
+
+    # ---------- UTIL: Status completed ----------
+    @staticmethod
+    def with_display_status(qs, now=None):
+        """
+        Anotasi `display_status`: booking aktif yang sudah lewat tampil sebagai
+        'completed' tanpa menulis ke database (sweeper yang update row-nya).
+        """
+        return qs.annotate(
+            display_status=Case(
+                When(expired_q(now), then=Value('completed')),
+                default=F('status'),
+                output_field=CharField(),
+            )
+        )
+
+    @classmethod
+    def complete_expired(cls, batch_size=500, now=None):
+        """
+        Tandai booking aktif yang sudah lewat jadi 'completed', satu UPDATE per batch.
+        Return jumlah row yang berubah.
+        """
+        now = now or timezone.now()
+        total = 0
+        while True:
+            ids = list(
+                cls.objects.filter(expired_q(now)).order_by().values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return total
+            total += cls.objects.filter(expired_q(now), id__in=ids).update(status='completed')
+
+    # ---------- UTIL: Aksi massal coach ----------
+    # aksi -> (status asal yang diizinkan, status tujuan, pesan kalau status asal tidak cocok)
+    BULK_ACTIONS = {
+        'confirm': (('pending',), 'confirmed', 'Not pending'),
+        'accept_reschedule': (('rescheduled',), 'confirmed', 'Not rescheduled'),
+        'reject_reschedule': (('rescheduled',), 'cancelled', 'Not rescheduled'),
+        'cancel': (tuple(ACTIVE_STATUSES), 'cancelled', 'Not active'),
+    }
+
+    @classmethod
+    def bulk_transition(cls, coach, action, ids):
+        """
+        Jalankan `action` (lihat BULK_ACTIONS) untuk booking `ids` milik `coach`.
+        Kepemilikan dan status asal dicek di WHERE; perubahannya satu UPDATE (tanpa
+        transaksi/lock: WHERE status__in sudah menolak row yang diubah request lain).
+        Return list hasil per id (urutan sama dengan `ids`):
+        {"id", "ok": True, "status"} atau {"id", "ok": False, "error"[, "status"]}.
+        """
+        from . import slots
+
+        sources, target, mismatch = cls.BULK_ACTIONS[action]
+        # Booking milik coach lain diperlakukan sama dengan yang tidak ada
+        found = {
+            pk: (status, day)
+            for pk, status, day in cls.objects.filter(coach=coach, id__in=ids)
+            .order_by().values_list('id', 'status', 'date')
+        }
+        eligible = [pk for pk, (status, _) in found.items() if status in sources]
+        updated = set(eligible)
+        if eligible:
+            matched = cls.objects.filter(coach=coach, id__in=eligible, status__in=sources).update(status=target)
+            if matched != len(eligible):
+                # Ada yang berubah di antara SELECT dan UPDATE (request lain): baca ulang statusnya
+                current = dict(cls.objects.filter(id__in=eligible).order_by().values_list('id', 'status'))
+                updated = {pk for pk in eligible if current.get(pk) == target}
+                for pk in eligible:
+                    if pk not in current:
+                        del found[pk]
+                    elif pk not in updated:
+                        found[pk] = (current[pk], found[pk][1])
+
+        # Booking yang batal membebaskan slot; UPDATE queryset tidak mengirim post_save
+        if target not in ACTIVE_STATUSES and updated:
+            days = {found[pk][1] for pk in updated}
+
+            def invalidate():
+                for day in days:
+                    slots.invalidate_day(coach.pk, day)
+
+            transaction.on_commit(invalidate)
+
+        results = []
+        for pk in ids:
+            if pk in updated:
+                results.append({'id': pk, 'ok': True, 'status': target})
+            elif pk in found:
+                results.append({'id': pk, 'ok': False, 'error': mismatch, 'status': found[pk][0]})
+            else:
+                results.append({'id': pk, 'ok': False, 'error': 'Booking not found'})
+        return results
+
     # ---------- UTIL: Deteksi Overlap ----------
     @staticmethod
     def _is_overlap(a_start, a_end, b_start, b_end):
@@ -48,19 +239,36 @@ class Booking(models.Model):
 
     @staticmethod
     def is_conflict(coach, date, start_time, end_time, exclude_booking_id=None):
-        """Cek apakah coach sudah punya booking aktif di waktu yang sama"""
+        """
+        Cek apakah coach sudah punya booking aktif di waktu yang sama.
+        Overlap dicek langsung di SQL (pakai booking_coach_slot_idx), bukan loop Python.
+        """
         qs = Booking.objects.filter(
             coach=coach,
             date=date,
-            status__in=['pending', 'confirmed', 'rescheduled']
+            status__in=ACTIVE_STATUSES,
+            start_time__lt=end_time,
+            end_time__gt=start_time,
         )
         if exclude_booking_id:
             qs = qs.exclude(id=exclude_booking_id)
+        return qs.exists()
 
-        for b in qs.only('start_time', 'end_time'):
-            if Booking._is_overlap(start_time, end_time, b.start_time, b.end_time):
-                return True
-        return False
+    # ---------- UTIL: Booking baru (atomic) ----------
+    @classmethod
+    def book(cls, coach, member, date, start_time, end_time, **fields):
+        """
+        Buat booking baru kalau slot coach masih kosong. Cek bentrok + insert jalan di
+        bawah lock (coach, date) yang sama, jadi request paralel tidak bisa double-book.
+        """
+        with transaction.atomic():
+            BookingDayLock.acquire(coach, date)
+            if cls.is_conflict(coach, date, start_time, end_time):
+                raise ValueError(f"Coach {coach.user.get_full_name()} is unavailable at the selected time.")
+            return cls.objects.create(
+                coach=coach, member=member, date=date,
+                start_time=start_time, end_time=end_time, **fields
+            )
 
     # ---------- UTIL: Reschedule ----------
     def reschedule(self, new_date, new_start_time, new_end_time):
@@ -70,16 +278,19 @@ class Booking(models.Model):
         if new_start_time >= new_end_time:
             raise ValueError("Jam mulai harus lebih kecil dari jam selesai")
 
-        # Cek bentrok untuk coach
-        if Booking.is_conflict(
-            coach=self.coach, date=new_date,
-            start_time=new_start_time, end_time=new_end_time,
-            exclude_booking_id=self.id
-        ):
-            raise ValueError(f"Coach {self.coach.user.get_full_name()} sudah punya booking yang bentrok")
-
-        self.date = new_date
-        self.start_time = new_start_time
-        self.end_time = new_end_time
-        self.status = 'rescheduled'
-        self.save()
+        with transaction.atomic():
+            BookingDayLock.acquire(self.coach, new_date)
+
+            # Cek bentrok untuk coach
+            if Booking.is_conflict(
+                coach=self.coach, date=new_date,
+                start_time=new_start_time, end_time=new_end_time,
+                exclude_booking_id=self.id
+            ):
+                raise ValueError(f"Coach {self.coach.user.get_full_name()} sudah punya booking yang bentrok")
+
+            self.date = new_date
+            self.start_time = new_start_time
+            self.end_time = new_end_time
+            self.status = 'rescheduled'
+            self.save()
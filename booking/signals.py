@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import slots
+from .models import Booking, CoachAvailability
+
+
+# Invalidasi setelah commit: kalau dihapus lebih awal, request lain bisa mengisi
+# cache lagi dari data sebelum commit.
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def invalidate_booking_slots(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    days = {(instance.coach_id, instance.date)}
+    loaded = getattr(instance, '_loaded_slot_day', None)
+    if loaded and None not in loaded:
+        days.add(loaded)
+    instance._loaded_slot_day = (instance.coach_id, instance.date)
+
+    def invalidate():
+        for coach_id, day in days:
+            slots.invalidate_day(coach_id, day)
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=CoachAvailability)
+@receiver(post_delete, sender=CoachAvailability)
+def invalidate_coach_slots(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    coach_id = instance.coach_id
+    transaction.on_commit(lambda: slots.invalidate_coach(coach_id))
@@ -0,0 +1,136 @@
+"""
+Slot kosong coach: jadwal mingguan (CoachAvailability) dikurangi booking aktif,
+dipotong per SLOT_LENGTH (1 jam, sama dengan durasi booking di create_booking).
+
+Hasil per (coach, tanggal) disimpan di cache Django. Key memuat versi per coach
+(naik kalau jadwal mingguan berubah); booking baru / pindah / batal cukup
+menghapus key hari itu (lihat booking/signals.py). Slot yang jamnya sudah lewat
+disaring saat dibaca, bukan disimpan di cache.
+
+Update lewat queryset (Booking.complete_expired) tidak menginvalidasi cache,
+tapi itu hanya menyentuh booking yang sudah lewat.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from main.cache import invalidate, namespace_version
+
+from .models import ACTIVE_STATUSES, Booking
+from users.models import Coach
+
+SLOT_LENGTH = timedelta(hours=1)
+KEY_PREFIX = 'booking:slots'
+
+
+def _namespace(coach_id):
+    return f'slots-{coach_id}'
+
+
+def _day_key(coach_id, version, day):
+    return f'{KEY_PREFIX}:{coach_id}:{version}:{day.isoformat()}'
+
+
+def _windows_key(coach_id, version):
+    return f'{KEY_PREFIX}:{coach_id}:{version}:windows'
+
+
+def invalidate_day(coach_id, day):
+    """Booking coach di tanggal `day` berubah."""
+    cache.delete(_day_key(coach_id, namespace_version(_namespace(coach_id)), day))
+
+
+def invalidate_coach(coach_id):
+    """Jadwal mingguan coach berubah: semua hari (dan jendela yang di-cache) tidak berlaku lagi."""
+    invalidate(_namespace(coach_id))
+
+
+def weekly_windows(coach_id, version):
+    """
+    {weekday: [(start, end), ...]} untuk coach; None kalau coach tidak ada.
+    Satu query (LEFT JOIN coach -> availability), hasilnya di-cache per versi coach.
+    """
+    key = _windows_key(coach_id, version)
+    windows = cache.get(key)
+    if windows is None:
+        rows = list(
+            Coach.objects.filter(pk=coach_id)
+            .order_by('availability__weekday', 'availability__start_time')
+            .values_list('availability__weekday', 'availability__start_time', 'availability__end_time')
+        )
+        if not rows:
+            return None
+        windows = {}
+        for weekday, start, end in rows:
+            if weekday is not None:
+                windows.setdefault(weekday, []).append((start, end))
+        cache.set(key, windows, settings.BOOKING_SLOTS_CACHE_TIMEOUT)
+    return windows
+
+
+def _day_slots(day, windows, busy):
+    """Slot (start, end) di dalam jendela hari itu yang tidak overlap dengan booking `busy`."""
+    slots = []
+    for window_start, window_end in windows:
+        start = datetime.combine(day, window_start)
+        end = datetime.combine(day, window_end)
+        while start + SLOT_LENGTH <= end:
+            slot_start, slot_end = start.time(), (start + SLOT_LENGTH).time()
+            if not any(Booking._is_overlap(slot_start, slot_end, b_start, b_end) for b_start, b_end in busy):
+                slots.append((slot_start, slot_end))
+            start += SLOT_LENGTH
+    return slots
+
+
+def free_slots(coach_id, date_from, date_to):
+    """
+    {tanggal: [(start, end), ...]} untuk date_from..date_to (inklusif); None kalau coach tidak ada.
+    Hari yang tidak ada di cache dihitung dengan satu query booking untuk seluruh rentangnya.
+    """
+    version = namespace_version(_namespace(coach_id))
+    windows = weekly_windows(coach_id, version)
+    if windows is None:
+        return None
+
+    days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+    keys = {day: _day_key(coach_id, version, day) for day in days}
+    cached = cache.get_many(keys.values())
+    result = {day: cached[keys[day]] for day in days if keys[day] in cached}
+
+    missing = [day for day in days if day not in result and windows.get(day.weekday())]
+    if missing:
+        busy = {}
+        for day, start, end in (
+            Booking.objects.filter(
+                coach_id=coach_id, date__gte=missing[0], date__lte=missing[-1], status__in=ACTIVE_STATUSES,
+            )
+            .order_by()
+            .values_list('date', 'start_time', 'end_time')
+        ):
+            busy.setdefault(day, []).append((start, end))
+        computed = {day: _day_slots(day, windows[day.weekday()], busy.get(day, ())) for day in missing}
+        cache.set_many({keys[day]: slots for day, slots in computed.items()}, settings.BOOKING_SLOTS_CACHE_TIMEOUT)
+        result.update(computed)
+
+    # Hari tanpa jendela = tidak ada slot (tidak perlu di-cache)
+    now = timezone.localtime()
+    return {
+        day: [
+            (start, end) for start, end in result.get(day, [])
+            if day > now.date() or (day == now.date() and start > now.time())
+        ]
+        for day in days
+    }
+
+
+def is_within_availability(coach, day, start_time, end_time):
+    """
+    True kalau rentang jatuh di dalam salah satu jendela mingguan coach.
+    Coach yang belum mengisi jadwal dianggap bebas (perilaku lama).
+    """
+    windows = weekly_windows(coach.pk, namespace_version(_namespace(coach.pk)))
+    if not windows:
+        return True
+    return any(start <= start_time and end_time <= end for start, end in windows.get(day.weekday(), []))
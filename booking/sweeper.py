@@ -0,0 +1,52 @@
+import logging
+import threading
+import time
+
+from django.db import close_old_connections
+
+from .models import Booking
+
+logger = logging.getLogger(__name__)
+
+_scheduler = None
+
+
+def complete_expired_bookings(batch_size=500):
+    """Jalankan satu kali sweep booking yang sudah lewat, log jumlah row & durasinya."""
+    started = time.monotonic()
+    count = Booking.complete_expired(batch_size=batch_size)
+    elapsed_ms = (time.monotonic() - started) * 1000
+    logger.info("[AutoComplete] %d booking(s) marked as completed in %.1f ms.", count, elapsed_ms)
+    return count, elapsed_ms
+
+
+class SweeperThread(threading.Thread):
+    """Thread daemon yang menjalankan complete_expired_bookings setiap `interval` detik."""
+
+    def __init__(self, interval, batch_size=500):
+        super().__init__(name="booking-sweeper", daemon=True)
+        self.interval = interval
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            close_old_connections()
+            try:
+                complete_expired_bookings(self.batch_size)
+            except Exception:
+                logger.exception("[AutoComplete] sweep failed")
+            finally:
+                close_old_connections()
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def start_scheduler(interval, batch_size=500):
+    """Start sweeper in-process (sekali per proses). Dipanggil dari BookingConfig.ready()."""
+    global _scheduler
+    if _scheduler is None or not _scheduler.is_alive():
+        _scheduler = SweeperThread(interval, batch_size)
+        _scheduler.start()
+    return _scheduler
@@ -0,0 +1,8 @@
+from main.tasks import task
+
+from .sweeper import complete_expired_bookings
+
+
+@task('booking.complete_expired', max_attempts=3, priority=-1)
+def complete_expired(batch_size=500):
+    complete_expired_bookings(batch_size)
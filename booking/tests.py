@@ -1,11 +1,19 @@
-from django.test import TestCase, Client
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, Client
 from django.urls import reverse
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time as dtime
+from io import StringIO
 import json
+import threading
+import time
 
 from users.models import Coach, Member, User
-from .models import Booking
+from main.testing import QueryBudgetMixin, bulk_users
+from . import slots
+from .models import Booking, CoachAvailability
 
 
 class BookingModelTests(TestCase):
@@ -251,7 +259,7 @@ class BookingViewsTests(TestCase):
         
     def test_auto_complete_bookings_marks_past_bookings_completed(self):
         """Booking yang sudah lewat otomatis jadi completed"""
-        from booking.views import auto_complete_bookings
+        from booking.sweeper import complete_expired_bookings
         past_date = timezone.localdate() - timedelta(days=1)
         booking = Booking.objects.create(
             coach=self.coach,
@@ -261,10 +269,46 @@ class BookingViewsTests(TestCase):
             end_time=(datetime.now() + timedelta(hours=1)).time(),
             status="confirmed",
         )
-        auto_complete_bookings()
+        with self.assertLogs("booking.sweeper", "INFO"):
+            count, _ = complete_expired_bookings()
         booking.refresh_from_db()
+        self.assertEqual(count, 1)
         self.assertEqual(booking.status, "completed")
 
+    def test_complete_bookings_command_updates_in_batches(self):
+        past_date = timezone.localdate() - timedelta(days=1)
+        for hour in range(9, 14):
+            Booking.objects.create(
+                coach=self.coach, member=self.member, date=past_date,
+                start_time=dtime(hour, 0), end_time=dtime(hour + 1, 0), status="pending",
+            )
+        upcoming = Booking.objects.create(
+            coach=self.coach, member=self.member, date=self.date.date(),
+            start_time=dtime(9, 0), end_time=dtime(10, 0), status="pending",
+        )
+        out = StringIO()
+        with self.assertLogs("booking.sweeper", "INFO"):
+            call_command("complete_bookings", "--batch-size", "2", stdout=out)
+        self.assertIn("5 booking(s) marked as completed", out.getvalue())
+        self.assertEqual(Booking.objects.filter(status="completed").count(), 5)
+        upcoming.refresh_from_db()
+        self.assertEqual(upcoming.status, "pending")
+
+    def test_booking_list_shows_past_booking_completed_without_writing(self):
+        self.client.login(username="member1", password="123")
+        booking = Booking.objects.create(
+            coach=self.coach, member=self.member,
+            date=timezone.localdate() - timedelta(days=1),
+            start_time=dtime(9, 0), end_time=dtime(10, 0), status="confirmed",
+        )
+        response = self.client.get(reverse("booking:list"))
+        self.assertEqual(response.status_code, 200)
+        shown = response.context["bookings"].get(id=booking.id)
+        self.assertEqual(shown.display_status, "completed")
+        self.assertEqual(shown.status_label, "Completed")
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, "confirmed")
+
     def test_reschedule_booking_invalid_format(self):
         """Pastikan reschedule gagal kalau format tanggal salah"""
         booking = Booking.objects.create(
@@ -401,3 +445,291 @@ class BookingViewsTests(TestCase):
         self.assertJSONEqual(response.content, {"ok": False, "error": "Already confirmed"})
 
 
+
+class CoachSlotsTests(TestCase):
+    """Jadwal mingguan coach -> slot kosong 1 jam (booking/slots.py) + endpoint JSON."""
+
+    def setUp(self):
+        cache.clear()
+        self.coach = Coach.objects.create(user=User.objects.create_user(username="coach1", password="123"))
+        self.member = Member.objects.create(user=User.objects.create_user(username="member1", password="123"))
+        # Besok (selalu di masa depan, jadi tidak ada slot yang disaring karena sudah lewat)
+        self.day = timezone.localdate() + timedelta(days=1)
+        CoachAvailability.objects.create(
+            coach=self.coach, weekday=self.day.weekday(), start_time=dtime(9), end_time=dtime(12),
+        )
+        self.url = reverse("booking:slots", args=[self.coach.pk])
+
+    def get_slots(self, **params):
+        params.setdefault("from", self.day.isoformat())
+        params.setdefault("to", self.day.isoformat())
+        return self.client.get(self.url, params)
+
+    def book(self, start, status="pending"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Booking.objects.create(
+                coach=self.coach, member=self.member, date=self.day,
+                start_time=dtime(start), end_time=dtime(start + 1), status=status,
+            )
+
+    def test_slots_from_weekly_windows(self):
+        response = self.get_slots()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["slot_minutes"], 60)
+        self.assertEqual(data["days"], [{"date": self.day.isoformat(), "slots": [
+            {"start": "09:00", "end": "10:00"},
+            {"start": "10:00", "end": "11:00"},
+            {"start": "11:00", "end": "12:00"},
+        ]}])
+
+    def test_default_range_is_one_week(self):
+        days = self.client.get(self.url).json()["days"]
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[0]["date"], timezone.localdate().isoformat())
+
+    def test_booking_removes_slot_and_cancel_restores_it(self):
+        self.get_slots()  # isi cache dulu
+        booking = self.book(10)
+        starts = [s["start"] for s in self.get_slots().json()["days"][0]["slots"]]
+        self.assertEqual(starts, ["09:00", "11:00"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.status = "cancelled"
+            booking.save()
+        starts = [s["start"] for s in self.get_slots().json()["days"][0]["slots"]]
+        self.assertEqual(starts, ["09:00", "10:00", "11:00"])
+
+    def test_moved_booking_invalidates_old_day(self):
+        booking = self.book(9)
+        self.get_slots()
+        booking = Booking.objects.get(pk=booking.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            booking.date = self.day + timedelta(days=7)
+            booking.save()
+        self.assertEqual(len(self.get_slots().json()["days"][0]["slots"]), 3)
+
+    def test_cached_days_skip_booking_query(self):
+        self.get_slots()
+        with self.assertNumQueries(0):
+            self.get_slots()
+
+    def test_availability_change_invalidates_cache(self):
+        self.get_slots()
+        with self.captureOnCommitCallbacks(execute=True):
+            CoachAvailability.objects.create(
+                coach=self.coach, weekday=self.day.weekday(), start_time=dtime(14), end_time=dtime(16),
+            )
+        self.assertEqual(len(self.get_slots().json()["days"][0]["slots"]), 5)
+
+    def test_unknown_coach_404(self):
+        response = self.client.get(reverse("booking:slots", args=["00000000-0000-0000-0000-000000000000"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_ranges_400(self):
+        self.assertEqual(self.get_slots(**{"from": "kemarin"}).status_code, 400)
+        self.assertEqual(self.get_slots(to=(self.day - timedelta(days=2)).isoformat()).status_code, 400)
+        self.assertEqual(self.get_slots(to=(self.day + timedelta(days=60)).isoformat()).status_code, 400)
+
+    def test_create_booking_outside_availability_rejected(self):
+        self.client.login(username="member1", password="123")
+        url = reverse("booking:create", args=[self.coach.id])
+        response = self.client.post(url, {"location": "Depok", "date": f"{self.day.isoformat()}T15:00"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Booking.objects.exists())
+
+        response = self.client.post(url, {"location": "Depok", "date": f"{self.day.isoformat()}T11:00"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.get().start_time, dtime(11))
+
+    def test_coach_saves_availability(self):
+        self.client.login(username="coach1", password="123")
+        url = reverse("booking:availability")
+        form = {f"day_{d}": "" for d in range(7)}
+        form["day_0"] = "14:00-16:00, 08:00-10:00"
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, form)
+        self.assertRedirects(response, url)
+        self.assertEqual(
+            list(CoachAvailability.objects.filter(coach=self.coach).values_list("weekday", "start_time")),
+            [(0, dtime(8)), (0, dtime(14))],
+        )
+        self.assertContains(self.client.get(url), "08:00-10:00, 14:00-16:00")
+
+    def test_availability_rejects_overlap_and_bad_format(self):
+        self.client.login(username="coach1", password="123")
+        url = reverse("booking:availability")
+        for value in ("09:00-12:00, 11:00-13:00", "9-12", "12:00-09:00"):
+            response = self.client.post(url, {"day_0": value})
+            self.assertEqual(response.status_code, 200)
+        # Jadwal lama tidak berubah
+        self.assertEqual(CoachAvailability.objects.filter(coach=self.coach).count(), 1)
+
+    def test_member_cannot_open_availability(self):
+        self.client.login(username="member1", password="123")
+        self.assertRedirects(self.client.get(reverse("booking:availability")), reverse("booking:list"),
+                             fetch_redirect_response=False)
+
+
+class BookingBulkActionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.coach = Coach.objects.create(user=User.objects.create_user(username="coach1", password="123"))
+        other = Coach.objects.create(user=User.objects.create_user(username="coach2", password="123"))
+        self.member = Member.objects.create(user=User.objects.create_user(username="member1", password="123"))
+        self.day = timezone.localdate() + timedelta(days=1)
+        self.url = reverse("booking:ajax_bulk_action")
+
+        def make(hour, status, coach=self.coach):
+            return Booking.objects.create(
+                coach=coach, member=self.member, date=self.day,
+                start_time=dtime(hour), end_time=dtime(hour + 1), status=status,
+            ).pk
+
+        self.pending = [make(8, "pending"), make(9, "pending")]
+        self.confirmed = make(10, "confirmed")
+        self.rescheduled = make(11, "rescheduled")
+        self.foreign = make(12, "pending", coach=other)
+        self.client.login(username="coach1", password="123")
+
+    def post(self, action, ids):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {"action": action, "ids": ids}, content_type="application/json")
+
+    def status(self, pk):
+        return Booking.objects.get(pk=pk).status
+
+    def test_confirm_many_with_per_id_results(self):
+        ids = [*self.pending, self.confirmed, self.foreign, 999999]
+        with self.assertNumQueries(5):  # session, user, coach, SELECT, UPDATE
+            response = self.post("confirm", ids)
+        data = response.json()
+        self.assertEqual(data["updated"], 2)
+        self.assertEqual(data["results"], [
+            {"id": self.pending[0], "ok": True, "status": "confirmed"},
+            {"id": self.pending[1], "ok": True, "status": "confirmed"},
+            {"id": self.confirmed, "ok": False, "error": "Not pending", "status": "confirmed"},
+            {"id": self.foreign, "ok": False, "error": "Booking not found"},
+            {"id": 999999, "ok": False, "error": "Booking not found"},
+        ])
+        self.assertEqual([self.status(pk) for pk in self.pending], ["confirmed", "confirmed"])
+        self.assertEqual(self.status(self.foreign), "pending")
+
+    def test_reschedule_actions_only_touch_rescheduled(self):
+        data = self.post("reject_reschedule", [self.rescheduled, self.pending[0]]).json()
+        self.assertEqual([r["ok"] for r in data["results"]], [True, False])
+        self.assertEqual(self.status(self.rescheduled), "cancelled")
+        self.assertEqual(self.status(self.pending[0]), "pending")
+
+        data = self.post("accept_reschedule", [self.rescheduled]).json()
+        self.assertEqual(data["results"][0]["error"], "Not rescheduled")
+
+    def test_cancel_frees_slots(self):
+        CoachAvailability.objects.create(
+            coach=self.coach, weekday=self.day.weekday(), start_time=dtime(8), end_time=dtime(12),
+        )
+        slots_url = reverse("booking:slots", args=[self.coach.pk])
+        params = {"from": self.day.isoformat(), "to": self.day.isoformat()}
+        self.assertEqual(self.client.get(slots_url, params).json()["days"][0]["slots"], [])
+
+        data = self.post("cancel", [*self.pending, self.confirmed]).json()
+        self.assertEqual(data["updated"], 3)
+        starts = [s["start"] for s in self.client.get(slots_url, params).json()["days"][0]["slots"]]
+        self.assertEqual(starts, ["08:00", "09:00", "10:00"])
+
+    def test_invalid_payloads_400(self):
+        self.assertEqual(self.post("delete", self.pending).status_code, 400)
+        self.assertEqual(self.post("confirm", []).status_code, 400)
+        self.assertEqual(self.post("confirm", ["1"]).status_code, 400)
+        self.assertEqual(self.post("confirm", list(range(1, 102))).status_code, 400)
+        response = self.client.post(self.url, "not json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_member_forbidden(self):
+        self.client.login(username="member1", password="123")
+        self.assertEqual(self.post("confirm", self.pending).status_code, 403)
+        self.assertEqual(self.status(self.pending[0]), "pending")
+
+
+class BookingConcurrencyTests(TransactionTestCase):
+    """Request paralel ke slot yang sama: hanya satu yang boleh berhasil."""
+
+    ATTEMPTS = 8
+
+    def setUp(self):
+        self.coach = Coach.objects.create(user=User.objects.create_user(username="coach1", password="123"))
+        self.members = [
+            Member.objects.create(user=User.objects.create_user(username=f"member{i}", password="123"))
+            for i in range(self.ATTEMPTS)
+        ]
+        self.date = timezone.localdate() + timedelta(days=1)
+
+    def test_parallel_booking_same_slot_only_one_succeeds(self):
+        barrier = threading.Barrier(self.ATTEMPTS)
+        results = []
+
+        def attempt(member):
+            barrier.wait()
+            try:
+                # DB SQLite in-memory untuk test (shared cache) langsung melempar
+                # "table is locked" alih-alih menunggu busy timeout -> coba lagi.
+                for _ in range(200):
+                    try:
+                        Booking.book(
+                            coach=self.coach, member=member, date=self.date,
+                            start_time=dtime(9, 0), end_time=dtime(10, 0),
+                        )
+                        results.append("ok")
+                        return
+                    except ValueError:
+                        results.append("conflict")
+                        return
+                    except OperationalError:
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=attempt, args=(m,)) for m in self.members]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results.count("ok"), 1)
+        self.assertEqual(results.count("conflict"), self.ATTEMPTS - 1)
+        self.assertEqual(Booking.objects.filter(coach=self.coach, date=self.date).count(), 1)
+
+    def test_book_allows_adjacent_slots(self):
+        Booking.book(coach=self.coach, member=self.members[0], date=self.date,
+                     start_time=dtime(9, 0), end_time=dtime(10, 0))
+        Booking.book(coach=self.coach, member=self.members[1], date=self.date,
+                     start_time=dtime(10, 0), end_time=dtime(11, 0))
+        with self.assertRaises(ValueError):
+            Booking.book(coach=self.coach, member=self.members[2], date=self.date,
+                         start_time=dtime(9, 30), end_time=dtime(10, 30))
+
+
+class BookingQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.coach = Coach.objects.create(
+            user=User.objects.create_user(username="coach", password="pass123"), sport="tennis", city="Depok"
+        )
+        self.client.login(username="coach", password="pass123")
+
+    def seed(self, n):
+        members = Member.objects.bulk_create(
+            Member(user=user, city="Depok", phone="1") for user in bulk_users(n, prefix="member")
+        )
+        today = timezone.localdate()
+        Booking.objects.bulk_create(
+            Booking(coach=self.coach, member=member, date=today + timedelta(days=i % 60 - 30))
+            for i, member in enumerate(members)
+        )
+
+    def test_booking_list(self):
+        self.assertQueryBudget(reverse("booking:list"), budget=5)
+
+    def test_coach_slots(self):
+        for weekday in range(7):
+            CoachAvailability.objects.create(coach=self.coach, weekday=weekday, start_time=dtime(7), end_time=dtime(21))
+        self.assertQueryBudget(reverse("booking:slots", args=[self.coach.pk]), budget=4)
@@ -10,6 +10,8 @@ urlpatterns = [
     path('edit/<int:booking_id>/', views.edit_booking, name='edit'),
     path('cancel/<int:booking_id>/', views.cancel_booking, name='cancel'),
     path('reschedule/<int:booking_id>/', views.reschedule_booking, name='reschedule'),
+    path('availability/', views.availability, name='availability'),
+    path('slots/<uuid:coach_id>/', views.coach_slots, name='slots'),
 
     # AJAX Member actions
     path('ajax_cancel/<int:booking_id>/', views.ajax_cancel, name='ajax_cancel'),
@@ -19,4 +21,5 @@ urlpatterns = [
     path('ajax_accept_reschedule/<int:booking_id>/', views.ajax_accept_reschedule, name='ajax_accept_reschedule'),
     path('ajax_reject_reschedule/<int:booking_id>/', views.ajax_reject_reschedule, name='ajax_reject_reschedule'),
     path('ajax_confirm_booking/<int:booking_id>/', views.ajax_confirm_booking, name='ajax_confirm_booking'),
+    path('ajax_bulk_action/', views.ajax_bulk_action, name='ajax_bulk_action'),
 ]
\ No newline at end of file
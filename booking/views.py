@@ -1,63 +1,44 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
+from django.conf import settings
 from django.contrib import messages
-from datetime import datetime, timedelta
+from datetime import date as ddate, datetime, timedelta
 from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth.decorators import login_required
-from django.db import models
+from django.db import transaction
+import json
 
 
-from .models import Booking
+from . import slots
+from .models import Booking, BookingDayLock, CoachAvailability
 from users.models import Coach, Member
 
 
-# Auto complete booking yang udah lewat
-def auto_complete_bookings():
-    """
-    Update otomatis semua booking yang sudah lewat jadi 'completed',
-    berlaku untuk member & coach, tanpa perlu cron job.
-    """
-    now = timezone.localtime()
-    today = now.date()
-    current_time = now.time()
-
-    # Booking yang statusnya masih aktif
-    active_bookings = Booking.objects.filter(
-        status__in=["pending", "confirmed", "rescheduled"]
-    )
-
-    # Booking yang tanggalnya sudah lewat atau waktu berakhirnya sudah lewat
-    expired_bookings = active_bookings.filter(
-        models.Q(date__lt=today) |
-        models.Q(date=today, end_time__lt=current_time)
-    )
-
-    count = 0
-    for booking in expired_bookings:
-        booking.status = "completed"
-        booking.save(update_fields=["status"])
-        count += 1
-
-    if count > 0:
-        print(f"[AutoComplete] {count} booking(s) marked as completed.")
-
-
 # 🟢 LIST BOOKINGS
 @login_required(login_url='/account/login/')
 def booking_list(request):
-    # Auto update setiap kali halaman dibuka
-    auto_complete_bookings()
-
     today = timezone.localdate()
     is_coach = hasattr(request.user, "coach")
     is_member = hasattr(request.user, "member")
 
     bookings = Booking.objects.none()
     if is_coach:
-        bookings = Booking.objects.filter(coach=request.user.coach).order_by('-date', '-start_time')
+        bookings = (
+            Booking.objects.filter(coach=request.user.coach)
+            .select_related('member__user')
+            .order_by('-date', '-start_time')
+        )
     elif is_member:
-        bookings = Booking.objects.filter(member=request.user.member).order_by('-date', '-start_time')
+        bookings = (
+            Booking.objects.filter(member=request.user.member)
+            .select_related('coach__user')
+            .order_by('-date', '-start_time')
+        )
+
+    # Status booking yang sudah lewat dihitung saat baca (tidak ada write di page load);
+    # row-nya di-update oleh `manage.py complete_bookings` / sweeper.
+    bookings = Booking.with_display_status(bookings)
 
     context = {
         "bookings": bookings,
@@ -105,21 +86,24 @@ def create_booking(request, coach_id):
             messages.error(request, "Booking date and time cannot be in the past.")
             return render(request, "booking/create_booking.html", {'coach': coach})
 
-        # Cek konflik waktu
-        if Booking.is_conflict(coach, date, start_time, end_time):
-            messages.error(request, f"Coach {coach.user.get_full_name()} is unavailable at the selected time.")
+        if not slots.is_within_availability(coach, date, start_time, end_time):
+            messages.error(request, "The selected time is outside the coach's weekly availability.")
             return render(request, "booking/create_booking.html", {'coach': coach})
 
-        # Simpan booking
-        Booking.objects.create(
-            member=member,
-            coach=coach,
-            date=date,
-            start_time=start_time,
-            end_time=end_time,
-            location=location,
-            status="pending",
-        )
+        # Cek konflik waktu + simpan booking (atomic, di bawah lock coach-hari)
+        try:
+            Booking.book(
+                coach=coach,
+                member=member,
+                date=date,
+                start_time=start_time,
+                end_time=end_time,
+                location=location,
+                status="pending",
+            )
+        except ValueError as e:
+            messages.error(request, str(e))
+            return render(request, "booking/create_booking.html", {'coach': coach})
 
         messages.success(request, f"Booking created successfully with coach {coach.user.get_full_name()}!")
         return redirect("booking:list")
@@ -129,6 +113,105 @@ def create_booking(request, coach_id):
 
 
 
+# 🟢 FREE SLOTS (JSON)
+@require_GET
+def coach_slots(request, coach_id):
+    """
+    GET /booking/slots/<coach_id>/?from=YYYY-MM-DD&to=YYYY-MM-DD
+    -> slot 1 jam yang masih kosong per hari (default 7 hari mulai hari ini).
+    """
+    today = timezone.localdate()
+    try:
+        date_from = ddate.fromisoformat(request.GET['from']) if request.GET.get('from') else today
+        date_to = ddate.fromisoformat(request.GET['to']) if request.GET.get('to') else date_from + timedelta(days=6)
+    except ValueError:
+        return JsonResponse({"error": "'from' and 'to' must be dates (YYYY-MM-DD)"}, status=400)
+    date_from = max(date_from, today)
+    if date_to < date_from:
+        return JsonResponse({"error": "'to' must not be before 'from' (or today)"}, status=400)
+    if (date_to - date_from).days >= settings.BOOKING_SLOTS_MAX_DAYS:
+        return JsonResponse({"error": f"Range is limited to {settings.BOOKING_SLOTS_MAX_DAYS} days"}, status=400)
+
+    free = slots.free_slots(coach_id, date_from, date_to)
+    if free is None:
+        return JsonResponse({"error": "Coach not found"}, status=404)
+    return JsonResponse({
+        "coach_id": str(coach_id),
+        "slot_minutes": int(slots.SLOT_LENGTH.total_seconds() // 60),
+        "days": [
+            {
+                "date": day.isoformat(),
+                "slots": [{"start": f"{start:%H:%M}", "end": f"{end:%H:%M}"} for start, end in day_slots],
+            }
+            for day, day_slots in free.items()
+        ],
+    })
+
+
+def _parse_windows(text):
+    """'09:00-12:00, 14:00-17:00' -> [(time, time), ...] urut & tidak overlap. Raise ValueError."""
+    windows = []
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        try:
+            start_str, end_str = part.split('-')
+            start = datetime.strptime(start_str.strip(), '%H:%M').time()
+            end = datetime.strptime(end_str.strip(), '%H:%M').time()
+        except ValueError:
+            raise ValueError(f"'{part}' is not in HH:MM-HH:MM format") from None
+        if start >= end:
+            raise ValueError(f"'{part}': start must be before end")
+        windows.append((start, end))
+    windows.sort()
+    for (_, prev_end), (start, _) in zip(windows, windows[1:]):
+        if start < prev_end:
+            raise ValueError("Windows on the same day must not overlap")
+    return windows
+
+
+# 🟢 WEEKLY AVAILABILITY (COACH)
+@login_required(login_url='/account/login/')
+def availability(request):
+    if not hasattr(request.user, "coach"):
+        messages.error(request, "Only coaches can set availability.")
+        return redirect("booking:list")
+    coach = request.user.coach
+    days = CoachAvailability.WEEKDAY_CHOICES
+
+    if request.method == "POST":
+        parsed, errors = {}, []
+        for weekday, label in days:
+            try:
+                parsed[weekday] = _parse_windows(request.POST.get(f"day_{weekday}", ""))
+            except ValueError as e:
+                errors.append(f"{label}: {e}")
+        if errors:
+            for error in errors:
+                messages.error(request, error)
+        else:
+            # Ganti seluruh jadwal mingguan sekaligus; cache slot coach diinvalidasi setelah commit
+            with transaction.atomic():
+                CoachAvailability.objects.filter(coach=coach).delete()
+                CoachAvailability.objects.bulk_create(
+                    CoachAvailability(coach=coach, weekday=weekday, start_time=start, end_time=end)
+                    for weekday, windows in parsed.items()
+                    for start, end in windows
+                )
+                transaction.on_commit(lambda: slots.invalidate_coach(coach.pk))
+            messages.success(request, "Weekly availability saved!")
+            return redirect("booking:availability")
+        values = {weekday: request.POST.get(f"day_{weekday}", "") for weekday, _ in days}
+    else:
+        windows = {}
+        for w in CoachAvailability.objects.filter(coach=coach):
+            windows.setdefault(w.weekday, []).append(f"{w.start_time:%H:%M}-{w.end_time:%H:%M}")
+        values = {weekday: ", ".join(windows.get(weekday, [])) for weekday, _ in days}
+
+    return render(request, "booking/availability.html", {
+        "coach": coach,
+        "days": [(weekday, label, values[weekday]) for weekday, label in days],
+    })
+
+
 # 🟢 EDIT BOOKING
 @login_required(login_url='/account/login/')
 def edit_booking(request, booking_id):
@@ -161,19 +244,24 @@ def edit_booking(request, booking_id):
             messages.error(request, "Start time must be before end time.")
             return render(request, 'booking/edit_booking.html', {'booking': booking})
 
-        # Check for conflicts with the same coach
-        if Booking.is_conflict(booking.coach, date, start_time, end_time, exclude_booking_id=booking.id):
+        with transaction.atomic():
+            BookingDayLock.acquire(booking.coach, date)
+
+            # Check for conflicts with the same coach
+            conflict = Booking.is_conflict(booking.coach, date, start_time, end_time, exclude_booking_id=booking.id)
+            if not conflict:
+                # Update booking fields
+                booking.location = location
+                booking.date = date
+                booking.start_time = start_time
+                booking.end_time = end_time
+                booking.status = status
+                booking.save()
+
+        if conflict:
             messages.error(request, f"Schedule conflicts with coach {booking.coach.user.get_full_name()}.")
             return render(request, 'booking/edit_booking.html', {'booking': booking})
 
-        # Update booking fields
-        booking.location = location
-        booking.date = date
-        booking.start_time = start_time
-        booking.end_time = end_time
-        booking.status = status
-        booking.save()
-
         messages.success(request, "Booking updated successfully!")
         return redirect('booking:list')
 
@@ -291,6 +379,48 @@ def ajax_reject_reschedule(request, booking_id):
         return JsonResponse({"ok": False, "error": "Booking not found"}, status=404)
 
 
+# 🟢 AJAX BULK ACTION (COACH)
+# Batas id per request, supaya satu request tidak mengunci ribuan row sekaligus
+BULK_MAX_IDS = 100
+
+
+@login_required(login_url='/account/login/')
+@require_POST
+def ajax_bulk_action(request):
+    """
+    POST JSON {"action": "confirm" | "accept_reschedule" | "reject_reschedule" | "cancel", "ids": [1, 2, ...]}
+    -> {"ok": true, "action", "updated": n, "results": [{"id", "ok", "status" | "error"}, ...]}
+    """
+    if not hasattr(request.user, "coach"):
+        return JsonResponse({"ok": False, "error": "Only coaches can do bulk actions"}, status=403)
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"ok": False, "error": "Invalid JSON"}, status=400)
+
+    action = data.get("action")
+    if action not in Booking.BULK_ACTIONS:
+        return JsonResponse(
+            {"ok": False, "error": f"'action' must be one of: {', '.join(Booking.BULK_ACTIONS)}"}, status=400,
+        )
+    ids = data.get("ids")
+    if not isinstance(ids, list) or not ids or not all(type(pk) is int for pk in ids):
+        return JsonResponse({"ok": False, "error": "'ids' must be a non-empty list of booking ids"}, status=400)
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > BULK_MAX_IDS:
+        return JsonResponse({"ok": False, "error": f"At most {BULK_MAX_IDS} ids per request"}, status=400)
+
+    results = Booking.bulk_transition(request.user.coach, action, ids)
+    return JsonResponse({
+        "ok": True,
+        "action": action,
+        "updated": sum(r["ok"] for r in results),
+        "results": results,
+    })
+
+
 # 🟢 AJAX CONFIRM BOOKING (COACH)
 @require_POST
 def ajax_confirm_booking(request, booking_id):
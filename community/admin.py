@@ -8,6 +8,7 @@ class CommunityAdmin(admin.ModelAdmin):
         'name',
         'short_description',
         'created_by',
+        'members_count',
         'created_at',
     )
     search_fields = (
@@ -23,6 +24,7 @@ class CommunityAdmin(admin.ModelAdmin):
         'full_description',
         'profile_image_url',
         'created_by',
+        'members_count',
         'created_at',
     )
 
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class CommunityConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'community'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,108 @@
+"""
+Pub/sub untuk event chat komunitas (dipakai community.consumers).
+
+- InMemoryBroker (default): fan-out ke socket di proses/worker yang sama.
+- RedisBroker (COMMUNITY_CHAT_BROKER=redis): PUBLISH ke Redis, tiap worker
+  PSUBSCRIBE sekali lalu fan-out lokal. Butuh paket `redis` (opsional).
+
+publish() boleh dipanggil dari thread mana pun (view sync / signal);
+pengiriman ke queue socket dijadwalkan di event loop pemilik queue.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+
+CHANNEL_PREFIX = 'community-chat:'
+
+
+class InMemoryBroker:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)  # community_id -> {(loop, queue)}
+
+    def subscribe(self, community_id):
+        """Dipanggil dari event loop. Return asyncio.Queue berisi event untuk satu socket."""
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        queue.overflowed = False
+        with self._lock:
+            self._subscribers[community_id].add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, community_id, queue):
+        with self._lock:
+            targets = self._subscribers.get(community_id)
+            if not targets:
+                return
+            targets.difference_update({t for t in targets if t[1] is queue})
+            if not targets:
+                del self._subscribers[community_id]
+
+    def subscriber_count(self, community_id=None):
+        with self._lock:
+            if community_id is not None:
+                return len(self._subscribers.get(community_id, ()))
+            return sum(len(t) for t in self._subscribers.values())
+
+    def publish(self, community_id, event):
+        with self._lock:
+            targets = list(self._subscribers.get(community_id, ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(_deliver, queue, event)
+
+
+def _deliver(queue, event):
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # Client terlalu lambat: tandai, consumer akan menutup socket (client reconnect)
+        queue.overflowed = True
+
+
+class RedisBroker(InMemoryBroker):
+    def __init__(self, url, queue_size=100):
+        super().__init__(queue_size)
+        import redis  # dependency opsional, hanya kalau backend redis dipilih
+
+        self.url = url
+        self._client = redis.Redis.from_url(url)
+        self._listener = None
+
+    def publish(self, community_id, event):
+        self._client.publish(f'{CHANNEL_PREFIX}{community_id}', json.dumps(event))
+
+    def subscribe(self, community_id):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return super().subscribe(community_id)
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self.url)
+        pubsub = client.pubsub()
+        await pubsub.psubscribe(f'{CHANNEL_PREFIX}*')
+        async for item in pubsub.listen():
+            if item['type'] != 'pmessage':
+                continue
+            community_id = int(item['channel'].decode().rsplit(':', 1)[1])
+            InMemoryBroker.publish(self, community_id, json.loads(item['data']))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            queue_size = settings.COMMUNITY_CHAT_QUEUE_SIZE
+            if settings.COMMUNITY_CHAT_BROKER == 'redis':
+                _broker = RedisBroker(settings.COMMUNITY_CHAT_REDIS_URL, queue_size)
+            else:
+                _broker = InMemoryBroker(queue_size)
+        return _broker
@@ -0,0 +1,146 @@
+"""
+WebSocket chat komunitas (ASGI murni, tanpa Channels).
+
+    ws(s)://<host>/ws/community/<id>/
+
+Hanya member komunitas (session login Django) yang boleh connect. Server
+mengirim event JSON: message.created / message.updated / message.deleted.
+Client cukup kirim {"type": "ping"} untuk keep-alive; pesan baru tetap
+dikirim lewat endpoint AJAX biasa.
+
+Event internal membership.removed / community.deleted tidak diteruskan ke
+client: socket user yang keluar (atau semua socket komunitas yang dihapus)
+ditutup dengan 4403 supaya tidak menerima pesan lagi.
+
+Butuh server ASGI (uvicorn, lihat Procfile); di WSGI route ini tidak bisa
+upgrade dan group.html jatuh ke polling.
+"""
+import asyncio
+import json
+import re
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+from django.http import parse_cookie
+from django.http.request import validate_host
+
+from .broker import get_broker
+
+WS_PATH = re.compile(r'^/ws/community/(?P<community_id>\d+)/$')
+
+# Close codes
+CLOSE_NOT_FOUND = 4404
+CLOSE_FORBIDDEN = 4403
+CLOSE_TRY_AGAIN = 1013  # koneksi penuh / client terlalu lambat
+
+# Jumlah socket terbuka di worker ini (diakses hanya dari event loop)
+_open_connections = 0
+
+
+def open_connections():
+    return _open_connections
+
+
+def _header(scope, name):
+    for key, value in scope.get('headers', []):
+        if key.decode('latin1').lower() == name:
+            return value.decode('latin1')
+    return ''
+
+
+def _origin_allowed(scope):
+    origin = _header(scope, 'origin')
+    if not origin:
+        return True
+    allowed = settings.ALLOWED_HOSTS
+    if settings.DEBUG and not allowed:
+        allowed = ['.localhost', '127.0.0.1', '[::1]']
+    return validate_host(urlparse(origin).hostname or '', allowed)
+
+
+def _member_id(scope, community_id):
+    """User id kalau session valid & user member komunitas, selain itu None."""
+    from .models import Membership
+
+    close_old_connections()
+    try:
+        cookies = parse_cookie(_header(scope, 'cookie'))
+        engine = import_module(settings.SESSION_ENGINE)
+        session = engine.SessionStore(cookies.get(settings.SESSION_COOKIE_NAME))
+        user = get_user(SimpleNamespace(session=session))
+        if not user.is_authenticated:
+            return None
+        if not Membership.objects.filter(
+            community_id=community_id, user=user, community__deleted_at__isnull=True
+        ).exists():
+            return None
+        return user.pk
+    finally:
+        close_old_connections()
+
+
+async def _pump(queue, send, user_id):
+    """Teruskan event dari broker ke socket; tutup kalau user sudah bukan member."""
+    while True:
+        event = await queue.get()
+        if queue.overflowed:
+            await send({'type': 'websocket.close', 'code': CLOSE_TRY_AGAIN})
+            return
+        if event.get('type') == 'community.deleted' or (
+            event.get('type') == 'membership.removed' and event.get('user_id') == user_id
+        ):
+            await send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN})
+            return
+        if event.get('type') == 'membership.removed':
+            continue
+        await send({'type': 'websocket.send', 'text': json.dumps(event)})
+
+
+async def websocket_application(scope, receive, send):
+    global _open_connections
+
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    match = WS_PATH.match(scope['path'])
+    if not match:
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+    if _open_connections >= settings.COMMUNITY_CHAT_MAX_CONNECTIONS:
+        await send({'type': 'websocket.close', 'code': CLOSE_TRY_AGAIN})
+        return
+    community_id = int(match['community_id'])
+    user_id = await sync_to_async(_member_id)(scope, community_id) if _origin_allowed(scope) else None
+    if user_id is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_FORBIDDEN})
+        return
+
+    broker = get_broker()
+    _open_connections += 1
+    queue = broker.subscribe(community_id)
+    pump = None
+    try:
+        await send({'type': 'websocket.accept'})
+        pump = asyncio.ensure_future(_pump(queue, send, user_id))
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message['type'] == 'websocket.receive' and message.get('text'):
+                try:
+                    payload = json.loads(message['text'])
+                except ValueError:
+                    continue
+                if isinstance(payload, dict) and payload.get('type') == 'ping':
+                    await send({'type': 'websocket.send', 'text': json.dumps({'type': 'pong'})})
+    finally:
+        if pump is not None:
+            pump.cancel()
+        broker.unsubscribe(community_id, queue)
+        _open_connections -= 1
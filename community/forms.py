@@ -25,6 +25,9 @@ class CommunityCreateForm(forms.ModelForm):
         name = self.cleaned_data['name'].strip()
         if not name:
             raise forms.ValidationError("Nama tidak boleh kosong.")
+        # Unique check ModelForm pakai Community.objects (tanpa yang sedang dihapus)
+        if Community.all_objects.filter(name=name, deleted_at__isnull=False).exists():
+            raise forms.ValidationError("Nama ini masih dipakai komunitas yang sedang dihapus, coba lagi nanti.")
         return name
     
     def clean_profile_image_url(self):
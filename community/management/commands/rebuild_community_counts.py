@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from community.models import Community
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang members_count Community dari tabel Membership."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--community", action="append", dest="community_ids", type=int,
+            help="Hanya rebuild komunitas dengan id ini (boleh diulang).",
+        )
+
+    def handle(self, *args, **options):
+        communities = Community.objects.all()
+        if options["community_ids"]:
+            communities = communities.filter(id__in=options["community_ids"])
+
+        with transaction.atomic():
+            updated = Community.rebuild_members_count(communities)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt member counts for {updated} community(ies)."))
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:48
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_members_count(apps, schema_editor):
+    Community = apps.get_model('community', 'Community')
+    Membership = apps.get_model('community', 'Membership')
+
+    per_community = (
+        Membership.objects.filter(community_id=OuterRef('pk'))
+        .order_by()
+        .values('community_id')
+        .annotate(n=Count('id'))
+        .values('n')
+    )
+    Community.objects.update(members_count=Coalesce(Subquery(per_community), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0002_message_window_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_members_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['members_count', 'id'], name='community_popular_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['created_at', 'id'], name='community_newest_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def mark_existing_messages_read(apps, schema_editor):
+    # Member lama tidak tiba-tiba punya ribuan unread: semua pesan yang sudah ada dianggap terbaca
+    Membership = apps.get_model('community', 'Membership')
+    Message = apps.get_model('community', 'Message')
+
+    latest = (
+        Message.objects.filter(community_id=OuterRef('community_id'))
+        .order_by()
+        .values('community_id')
+        .annotate(last=Max('id'))
+        .values('last')
+    )
+    Membership.objects.update(last_read_message_id=Coalesce(Subquery(latest), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('community', '0003_members_count_and_directory_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='membership',
+            name='last_read_message_id',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(mark_existing_messages_read, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['community', 'id'], name='community_message_unread_idx'),
+        ),
+    ]
@@ -1,8 +1,20 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.conf import settings
+from django.utils import timezone
+
+from main.tasks import enqueue_on_commit
 
 User = settings.AUTH_USER_MODEL
 
+class CommunityManager(models.Manager):
+    """Komunitas yang belum dihapus (lihat Community.soft_delete)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Community(models.Model):
     name = models.CharField(max_length=120, unique=True)
     short_description = models.CharField(max_length=200)
@@ -13,12 +25,51 @@ class Community(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='communities_created')
 
-    def members_count(self):
-        return self.memberships.count()
+    # Denormalisasi COUNT(memberships); dijaga signals Membership (lihat signals.py)
+    members_count = models.PositiveIntegerField(default=0, editable=False)
+    # Diisi saat dihapus: baris disembunyikan, DELETE + cascade jalan di task 'community.purge'
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = CommunityManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # Urutan direktori "popular" & "newest" (lihat views.DIRECTORY_SORTS)
+            models.Index(fields=['members_count', 'id'], name='community_popular_idx'),
+            models.Index(fields=['created_at', 'id'], name='community_newest_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def soft_delete(self):
+        """
+        Sembunyikan komunitas sekarang; membership + pesan dihapus worker setelah commit
+        (cascade ribuan pesan tidak jalan di request).
+        """
+        from .broker import get_broker
+
+        self.deleted_at = timezone.now()
+        self.save(update_fields=['deleted_at'])
+        enqueue_on_commit('community.purge', args=[self.pk], key=f'community.purge:{self.pk}')
+        # Socket chat yang masih terbuka ditutup
+        transaction.on_commit(lambda: get_broker().publish(self.pk, {'type': 'community.deleted'}))
+
+    @staticmethod
+    def rebuild_members_count(communities=None):
+        """Hitung ulang members_count dari tabel Membership. Return jumlah komunitas."""
+        per_community = (
+            Membership.objects.filter(community_id=OuterRef('pk'))
+            .order_by()
+            .values('community_id')
+            .annotate(n=Count('id'))
+            .values('n')
+        )
+        if communities is None:
+            communities = Community.objects.all()
+        return communities.update(members_count=Coalesce(Subquery(per_community), Value(0)))
+
 
 class Membership(models.Model):
     ROLE_CHOICES = (
@@ -29,6 +80,8 @@ class Membership(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='community_memberships')
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
     joined_at = models.DateTimeField(auto_now_add=True)
+    # id Message terakhir yang sudah dilihat; pesan dengan id lebih besar = unread
+    last_read_message_id = models.PositiveBigIntegerField(default=0)
 
     class Meta:
         unique_together = ('community', 'user')
@@ -36,6 +89,34 @@ class Membership(models.Model):
     def __str__(self):
         return f'{self.user} in {self.community} ({self.role})'
 
+    @staticmethod
+    def unread_counts(user, communities=None):
+        """
+        {community_id: jumlah pesan belum dibaca} untuk semua membership user,
+        satu query GROUP BY (range scan community_message_unread_idx).
+        Pesan kiriman user sendiri tidak dihitung; komunitas tanpa unread tidak ada di dict.
+        """
+        messages = Message.objects.filter(
+            community__memberships__user=user,
+            community__deleted_at__isnull=True,
+            id__gt=F('community__memberships__last_read_message_id'),
+        ).exclude(sender=user)
+        if communities is not None:
+            messages = messages.filter(community__in=communities)
+        return dict(
+            messages.order_by().values('community_id').annotate(n=Count('id')).values_list('community_id', 'n')
+        )
+
+    def mark_read(self, message_id):
+        """Majukan marker ke message_id (tidak pernah mundur). Return True kalau berubah."""
+        if message_id <= self.last_read_message_id:
+            return False
+        updated = Membership.objects.filter(pk=self.pk, last_read_message_id__lt=message_id).update(
+            last_read_message_id=message_id
+        )
+        self.last_read_message_id = message_id
+        return bool(updated)
+
 
 class Message(models.Model):
     community = models.ForeignKey(Community, on_delete=models.CASCADE, related_name='messages')
@@ -46,6 +127,12 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Jendela pesan terbaru & scroll-back per komunitas (lihat views.message_history)
+            models.Index(fields=['community', 'created_at', 'id'], name='community_message_window_idx'),
+            # Hitung unread: community_id = ? AND id > last_read_message_id (Membership.unread_counts)
+            models.Index(fields=['community', 'id'], name='community_message_unread_idx'),
+        ]
 
     def __str__(self):
         return f'{self.sender} @ {self.community}: {self.text[:30]}'
\ No newline at end of file
@@ -0,0 +1,58 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .broker import get_broker
+from .models import Community, Membership, Message
+
+
+def message_payload(message):
+    return {
+        'id': message.id,
+        'text': message.text,
+        'sender': message.sender.username,
+        'sender_id': message.sender_id,
+        'created_at': message.created_at.isoformat(),
+        'updated_at': message.updated_at.isoformat(),
+    }
+
+
+def _publish_after_commit(community_id, event):
+    # Event baru dikirim setelah commit, supaya client tidak melihat pesan yang di-rollback
+    transaction.on_commit(lambda: get_broker().publish(community_id, event))
+
+
+@receiver(post_save, sender=Message)
+def broadcast_message_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    event_type = 'message.created' if created else 'message.updated'
+    _publish_after_commit(instance.community_id, {'type': event_type, 'message': message_payload(instance)})
+
+
+@receiver(post_delete, sender=Message)
+def broadcast_message_deleted(sender, instance, **kwargs):
+    _publish_after_commit(instance.community_id, {'type': 'message.deleted', 'id': instance.id})
+
+
+# members_count: UPDATE atomik per join/leave (juga saat membership ikut terhapus CASCADE).
+# bulk_create tidak mengirim signal -> pakai Community.rebuild_members_count().
+@receiver(post_save, sender=Membership)
+def count_membership_added(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Community.objects.filter(pk=instance.community_id).update(members_count=F('members_count') + 1)
+
+
+@receiver(post_delete, sender=Membership)
+def count_membership_removed(sender, instance, **kwargs):
+    Community.objects.filter(pk=instance.community_id).update(
+        members_count=Greatest(F('members_count') - 1, 0)
+    )
+
+
+# Socket chat user yang keluar / dikeluarkan ditutup (lihat consumers._pump)
+@receiver(post_delete, sender=Membership)
+def broadcast_membership_removed(sender, instance, **kwargs):
+    _publish_after_commit(instance.community_id, {'type': 'membership.removed', 'user_id': instance.user_id})
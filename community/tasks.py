@@ -0,0 +1,9 @@
+from main.tasks import task
+
+from .models import Community
+
+
+@task('community.purge', max_attempts=3, priority=-1)
+def purge_community(community_id):
+    """DELETE komunitas yang sudah di-soft-delete, beserta cascade-nya (membership, pesan)."""
+    Community.all_objects.filter(pk=community_id, deleted_at__isnull=False).delete()
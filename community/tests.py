@@ -1,9 +1,19 @@
-from django.test import TestCase, Client
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, Client, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
+from main import tasks
+from main.testing import QueryBudgetMixin, bulk_users
+
+from .broker import get_broker
+from .consumers import websocket_application, open_connections
 from .models import Community, Membership, Message
 from .forms import CommunityCreateForm, MessageForm
 import json
+from io import StringIO
 
 
 class AdditionalCommunityModelTest(TestCase):
@@ -601,4 +611,394 @@ class EdgeCaseTests(TestCase):
         )
         str_repr = str(msg)
         self.assertIn(long_text[:30], str_repr)
-        self.assertEqual(len(long_text[:30]), 30)
\ No newline at end of file
+        self.assertEqual(len(long_text[:30]), 30)
+
+
+class CommunityChatSocketTests(TransactionTestCase):
+    """WebSocket /ws/community/<id>/ (consumer memakai koneksi DB sendiri -> TransactionTestCase)"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="member", password="pass123")
+        self.outsider = User.objects.create_user(username="outsider", password="pass123")
+        self.community = Community.objects.create(
+            name="Chat", short_description="s", full_description="f", created_by=self.user
+        )
+        Membership.objects.create(user=self.user, community=self.community)
+
+    def _scope(self, username=None, community_id=None):
+        headers = []
+        if username:
+            client = Client()
+            client.login(username=username, password="pass123")
+            session = client.cookies[settings.SESSION_COOKIE_NAME].value
+            headers.append((b'cookie', f'{settings.SESSION_COOKIE_NAME}={session}'.encode()))
+        return {
+            'type': 'websocket',
+            'path': f'/ws/community/{community_id or self.community.id}/',
+            'headers': headers,
+        }
+
+    @async_to_sync
+    async def _connect_and_close_code(self, scope):
+        comm = ApplicationCommunicator(websocket_application, scope)
+        await comm.send_input({'type': 'websocket.connect'})
+        output = await comm.receive_output(timeout=3)
+        await comm.wait(timeout=1)
+        return output.get('code')
+
+    def test_member_receives_published_events_and_pong(self):
+        scope = self._scope('member')
+
+        @async_to_sync
+        async def run():
+            comm = ApplicationCommunicator(websocket_application, scope)
+            await comm.send_input({'type': 'websocket.connect'})
+            self.assertEqual((await comm.receive_output(timeout=3))['type'], 'websocket.accept')
+            self.assertEqual(get_broker().subscriber_count(self.community.id), 1)
+
+            get_broker().publish(self.community.id, {'type': 'message.deleted', 'id': 7})
+            output = await comm.receive_output(timeout=1)
+            self.assertEqual(json.loads(output['text']), {'type': 'message.deleted', 'id': 7})
+
+            await comm.send_input({'type': 'websocket.receive', 'text': '{"type": "ping"}'})
+            output = await comm.receive_output(timeout=1)
+            self.assertEqual(json.loads(output['text']), {'type': 'pong'})
+
+            await comm.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await comm.wait(timeout=1)
+
+        run()
+        self.assertEqual(get_broker().subscriber_count(self.community.id), 0)
+        self.assertEqual(open_connections(), 0)
+
+    def test_socket_closed_when_member_leaves(self):
+        other = User.objects.create_user(username="other", password="pass123")
+        Membership.objects.create(user=other, community=self.community)
+        scope = self._scope('member')
+
+        @async_to_sync
+        async def run():
+            comm = ApplicationCommunicator(websocket_application, scope)
+            await comm.send_input({'type': 'websocket.connect'})
+            self.assertEqual((await comm.receive_output(timeout=3))['type'], 'websocket.accept')
+
+            # Member lain keluar: event internal tidak diteruskan, socket tetap terbuka
+            await sync_to_async(Membership.objects.filter(user=other).delete)()
+            get_broker().publish(self.community.id, {'type': 'message.deleted', 'id': 1})
+            output = await comm.receive_output(timeout=1)
+            self.assertEqual(json.loads(output['text'])['type'], 'message.deleted')
+
+            await sync_to_async(Membership.objects.filter(user=self.user).delete)()
+            output = await comm.receive_output(timeout=1)
+            self.assertEqual(output, {'type': 'websocket.close', 'code': 4403})
+            await comm.send_input({'type': 'websocket.disconnect', 'code': 4403})
+            await comm.wait(timeout=1)
+
+        run()
+        self.assertEqual(open_connections(), 0)
+
+    def test_non_member_and_anonymous_are_rejected(self):
+        self.assertEqual(self._connect_and_close_code(self._scope('outsider')), 4403)
+        self.assertEqual(self._connect_and_close_code(self._scope()), 4403)
+        self.assertEqual(self._connect_and_close_code(self._scope('member', community_id=999)), 4403)
+
+    @override_settings(COMMUNITY_CHAT_MAX_CONNECTIONS=0)
+    def test_connection_limit(self):
+        self.assertEqual(self._connect_and_close_code(self._scope('member')), 1013)
+
+
+class CommunityChatBroadcastTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="member", password="pass123")
+        self.community = Community.objects.create(
+            name="Chat", short_description="s", full_description="f", created_by=self.user
+        )
+        self.published = []
+        broker = get_broker()
+        original = broker.publish
+        broker.publish = lambda community_id, event: self.published.append((community_id, event))
+        self.addCleanup(setattr, broker, 'publish', original)
+
+    def test_message_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            msg = Message.objects.create(community=self.community, sender=self.user, text="halo")
+        self.assertEqual(self.published, [])  # belum commit
+
+        for callback in callbacks:
+            callback()
+        with self.captureOnCommitCallbacks(execute=True):
+            msg.text = "halo semua"
+            msg.save()
+        message_id = msg.id
+        with self.captureOnCommitCallbacks(execute=True):
+            msg.delete()
+
+        types = [event['type'] for _, event in self.published]
+        self.assertEqual(types, ['message.created', 'message.updated', 'message.deleted'])
+        self.assertEqual(self.published[0][1]['message']['sender'], 'member')
+        self.assertEqual(self.published[1][1]['message']['text'], 'halo semua')
+        self.assertEqual(self.published[2], (self.community.id, {'type': 'message.deleted', 'id': message_id}))
+
+
+class MessageHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="member", password="pass123")
+        self.community = Community.objects.create(
+            name="Chat", short_description="s", full_description="f", created_by=self.user
+        )
+        Membership.objects.create(user=self.user, community=self.community)
+        # bulk_create: created_at bisa sama persis -> urutan jatuh ke id
+        Message.objects.bulk_create(
+            Message(community=self.community, sender=self.user, text=f"msg {i}") for i in range(120)
+        )
+        self.ids = list(Message.objects.order_by('created_at', 'id').values_list('id', flat=True))
+        self.client.login(username="member", password="pass123")
+
+    def test_group_page_renders_latest_window_only(self):
+        response = self.client.get(reverse('community:my_group', args=[self.community.id]))
+        rendered = [m.id for m in response.context['messages']]
+        self.assertEqual(rendered, self.ids[-50:])
+        self.assertTrue(response.context['has_more'])
+        self.assertContains(response, f'data-before="{self.ids[-50]}"')
+        self.assertNotContains(response, 'msg 0<')
+
+    def test_backfill_walks_history_in_chunks(self):
+        url = reverse('community:message_history', args=[self.community.id])
+        seen = []
+        before = self.ids[-50]
+        while True:
+            data = self.client.get(url, {'before': before, 'limit': 30}).json()
+            seen = [m['id'] for m in data['messages']] + seen
+            if not data['has_more']:
+                break
+            before = data['before']
+        self.assertEqual(seen, self.ids[:-50])
+
+    def test_backfill_continues_when_anchor_deleted(self):
+        url = reverse('community:message_history', args=[self.community.id])
+        anchor = self.ids[-50]
+        Message.objects.filter(id=anchor).delete()
+        data = self.client.get(url, {'before': anchor, 'limit': 10}).json()
+        self.assertEqual([m['id'] for m in data['messages']], self.ids[-60:-50])
+        self.assertTrue(data['has_more'])
+
+    def test_latest_chunk_without_before(self):
+        url = reverse('community:message_history', args=[self.community.id])
+        data = self.client.get(url, {'limit': 5}).json()
+        self.assertEqual([m['id'] for m in data['messages']], self.ids[-5:])
+        self.assertEqual(data['messages'][-1]['text'], 'msg 119')
+
+    def test_backfill_errors(self):
+        url = reverse('community:message_history', args=[self.community.id])
+        self.assertEqual(self.client.get(url, {'before': 'abc'}).status_code, 400)
+
+        User.objects.create_user(username="outsider", password="pass123")
+        self.client.login(username="outsider", password="pass123")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+class CommunityQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pass123')
+        self.client.login(username='reader', password='pass123')
+        self.group = Community.objects.create(
+            name='Group', short_description='s', full_description='f', created_by=self.user
+        )
+        Membership.objects.create(community=self.group, user=self.user, role='admin')
+
+    def seed(self, n):
+        users = bulk_users(n, prefix='member')
+        start = Community.objects.count()
+        communities = Community.objects.bulk_create(
+            Community(name=f'Komunitas {start + i}', short_description='s', full_description='f', created_by=user)
+            for i, user in enumerate(users)
+        )
+        # setengah komunitas sudah dijoin user yang login (my_list), sisanya muncul di home
+        Membership.objects.bulk_create(
+            [Membership(community=c, user=c.created_by, role='admin') for c in communities]
+            + [Membership(community=c, user=self.user) for c in communities[::2]]
+            + [Membership(community=self.group, user=user) for user in users]
+        )
+        Message.objects.bulk_create(Message(community=self.group, sender=user, text='halo') for user in users)
+
+    def test_community_home(self):
+        self.assertQueryBudget(reverse('community:home'), budget=6)
+
+    def test_community_home_json(self):
+        self.assertQueryBudget(
+            reverse('community:home'), budget=5, data={'sort': 'newest'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+
+    def test_my_community_list(self):
+        # + 1 query GROUP BY unread untuk halaman ini
+        self.assertQueryBudget(reverse('community:my_list'), budget=7)
+
+    def test_my_community_group(self):
+        # + 1 UPDATE last_read_message_id
+        self.assertQueryBudget(reverse('community:my_group', args=[self.group.id]), budget=8)
+
+    def test_unread_counts(self):
+        self.assertQueryBudget(reverse('community:unread_counts'), budget=3)
+
+
+class CommunityDirectoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pass123')
+        self.others = [User.objects.create_user(username=f'u{i}', password='pass123') for i in range(3)]
+        self.small = Community.objects.create(name='Small', short_description='s', full_description='f', created_by=self.user)
+        self.big = Community.objects.create(name='Big', short_description='s', full_description='f', created_by=self.user)
+        self.joined = Community.objects.create(name='Joined', short_description='s', full_description='f', created_by=self.user)
+        Membership.objects.create(community=self.small, user=self.others[0])
+        for user in self.others:
+            Membership.objects.create(community=self.big, user=user)
+        Membership.objects.create(community=self.joined, user=self.user)
+
+    def get_json(self, **params):
+        return self.client.get(reverse('community:home'), params, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_members_count_follows_join_leave_and_cascade(self):
+        self.big.refresh_from_db()
+        self.assertEqual(self.big.members_count, 3)
+        self.client.login(username='reader', password='pass123')
+        self.client.get(reverse('community:join', args=[self.big.id]))
+        self.client.get(reverse('community:join', args=[self.big.id]))
+        self.big.refresh_from_db()
+        self.assertEqual(self.big.members_count, 4)
+        self.client.get(reverse('community:leave', args=[self.big.id]))
+        self.others[0].delete()
+        self.big.refresh_from_db()
+        self.assertEqual(self.big.members_count, 2)
+
+    def test_json_excludes_joined_and_sorts(self):
+        self.client.login(username='reader', password='pass123')
+        data = self.get_json().json()
+        self.assertEqual([c['name'] for c in data['communities']], ['Big', 'Small'])
+        self.assertEqual(data['communities'][0]['members_count'], 3)
+        self.assertEqual(data['count'], 2)
+        self.assertFalse(data['has_next'])
+
+        self.assertEqual([c['name'] for c in self.get_json(sort='newest').json()['communities']], ['Big', 'Small'])
+        self.assertEqual([c['name'] for c in self.get_json(sort='name').json()['communities']], ['Big', 'Small'])
+        self.assertEqual(self.get_json(sort='members').status_code, 400)
+
+    def test_anonymous_sees_all_and_html_keeps_sort(self):
+        data = self.get_json(sort='name').json()
+        self.assertEqual([c['name'] for c in data['communities']], ['Big', 'Joined', 'Small'])
+        response = self.client.get(reverse('community:home'), {'sort': 'newest', 'q': 'i'})
+        self.assertContains(response, '<option value="newest" class="text-black" selected>')
+        self.assertContains(response, '3 members')
+        # sort tidak dikenal di halaman HTML -> default
+        self.assertEqual(self.client.get(reverse('community:home'), {'sort': 'x'}).context['sort'], 'popular')
+
+    def test_rebuild_command_fixes_drifted_counts(self):
+        Community.objects.update(members_count=0)
+        call_command('rebuild_community_counts', stdout=StringIO())
+        self.assertEqual(
+            dict(Community.objects.values_list('name', 'members_count')), {'Small': 1, 'Big': 3, 'Joined': 1}
+        )
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password='pass123')
+        self.other = User.objects.create_user(username='writer', password='pass123')
+        self.a = Community.objects.create(name='A', short_description='s', full_description='f', created_by=self.other)
+        self.b = Community.objects.create(name='B', short_description='s', full_description='f', created_by=self.other)
+        for c in (self.a, self.b):
+            Membership.objects.create(community=c, user=self.user)
+            Membership.objects.create(community=c, user=self.other, role='admin')
+        self.client.login(username='reader', password='pass123')
+
+    def post(self, community, n, sender=None):
+        return [Message.objects.create(community=community, sender=sender or self.other, text='halo') for _ in range(n)]
+
+    def test_unread_counts_in_one_query(self):
+        self.post(self.a, 3)
+        self.post(self.b, 1)
+        self.post(self.a, 2, sender=self.user)  # pesan sendiri tidak dihitung
+        with self.assertNumQueries(1):
+            unread = Membership.unread_counts(self.user)
+        self.assertEqual(unread, {self.a.id: 3, self.b.id: 1})
+        self.assertEqual(Membership.unread_counts(self.user, [self.b.id]), {self.b.id: 1})
+
+        data = self.client.get(reverse('community:unread_counts')).json()
+        self.assertEqual(data, {'unread': {str(self.a.id): 3, str(self.b.id): 1}, 'total': 4})
+
+    def test_opening_group_advances_marker(self):
+        last = self.post(self.a, 3)[-1]
+        self.post(self.b, 2)
+        self.client.get(reverse('community:my_group', args=[self.a.id]))
+        self.assertEqual(Membership.objects.get(user=self.user, community=self.a).last_read_message_id, last.id)
+        self.assertEqual(Membership.unread_counts(self.user), {self.b.id: 2})
+
+        response = self.client.get(reverse('community:my_list'))
+        counts = {m.community_id: m.unread_count for m in response.context['memberships']}
+        self.assertEqual(counts, {self.a.id: 0, self.b.id: 2})
+        self.assertContains(response, '2 new')
+
+    def test_mark_read_endpoint(self):
+        first, second = self.post(self.a, 2)
+        url = reverse('community:mark_read', args=[self.a.id])
+        self.assertEqual(self.client.post(url, {'message_id': second.id}).json()['last_read_message_id'], second.id)
+        # marker tidak mundur
+        self.assertEqual(self.client.post(url, {'message_id': first.id}).json()['last_read_message_id'], second.id)
+        self.assertEqual(self.client.post(url, {'message_id': 'x'}).status_code, 400)
+        self.assertEqual(self.client.post(url, {'message_id': second.id + 100}).status_code, 404)
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+        User.objects.create_user(username='outsider', password='pass123')
+        self.client.login(username='outsider', password='pass123')
+        self.assertEqual(self.client.post(url, {'message_id': second.id}).status_code, 403)
+
+    def test_history_before_join_is_not_unread(self):
+        c = Community.objects.create(name='C', short_description='s', full_description='f', created_by=self.other)
+        self.post(c, 5)
+        self.client.get(reverse('community:join', args=[c.id]))
+        self.assertNotIn(c.id, Membership.unread_counts(self.user))
+        self.post(c, 1)
+        self.assertEqual(Membership.unread_counts(self.user)[c.id], 1)
+
+
+class CommunityDeleteTests(TestCase):
+    """Hapus komunitas: langsung tersembunyi, cascade dihapus task 'community.purge'."""
+
+    def setUp(self):
+        self.owner = User.objects.create_user(username="owner", password="pass123")
+        self.member = User.objects.create_user(username="member", password="pass123")
+        self.community = Community.objects.create(
+            name="Futsal", short_description="s", full_description="f", created_by=self.owner,
+        )
+        for user in (self.owner, self.member):
+            Membership.objects.create(community=self.community, user=user)
+        Message.objects.create(community=self.community, sender=self.member, text="halo")
+        self.url = reverse('community:delete', args=[self.community.id])
+
+    def test_owner_delete_hides_then_worker_purges(self):
+        self.client.login(username="owner", password="pass123")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url)
+        self.assertRedirects(response, reverse('community:my_list'))
+
+        self.assertFalse(Community.objects.filter(pk=self.community.pk).exists())
+        self.assertEqual(Message.objects.filter(community_id=self.community.pk).count(), 1)
+        self.assertEqual(self.client.get(reverse('community:detail', args=[self.community.id])).status_code, 404)
+        self.client.login(username="member", password="pass123")
+        self.assertEqual(self.client.get(reverse('community:unread_counts')).json()['total'], 0)
+        self.assertEqual(list(self.client.get(reverse('community:my_list')).context['memberships']), [])
+
+        self.assertEqual(tasks.run_pending(), (1, 0))
+        self.assertFalse(Community.all_objects.filter(pk=self.community.pk).exists())
+        self.assertFalse(Membership.objects.filter(community_id=self.community.pk).exists())
+        self.assertFalse(Message.objects.filter(community_id=self.community.pk).exists())
+
+    def test_only_owner_can_delete(self):
+        self.client.login(username="member", password="pass123")
+        self.client.post(self.url)
+        self.assertTrue(Community.objects.filter(pk=self.community.pk).exists())
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_name_reserved_until_purged(self):
+        self.community.soft_delete()
+        form = CommunityCreateForm(data={'name': 'Futsal', 'short_description': 's', 'full_description': 'f'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('name', form.errors)
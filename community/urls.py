@@ -9,11 +9,15 @@ urlpatterns = [
     path('create/', views.community_create, name='create'),
     path('join/<int:id>/', views.join_community, name='join'),
     path('leave/<int:id>/', views.leave_community, name='leave'),
+    path('delete/<int:id>/', views.delete_community, name='delete'),
     path('my/', views.my_community_list, name='my_list'),
     path('my/<int:id>/', views.my_community_group, name='my_group'),
+    path('unread/', views.unread_counts, name='unread_counts'),
+    path('my/<int:id>/read/', views.mark_read, name='mark_read'),
 
     # AJAX untuk message 
     path('my/<int:id>/message/<int:msg_id>/edit/', views.edit_message, name='edit_message'),
     path('my/<int:id>/message/<int:msg_id>/delete/', views.delete_message, name='delete_message'),
     path('my/<int:id>/send_message_ajax/', views.send_message_ajax, name='send_message_ajax'),
+    path('my/<int:id>/messages/', views.message_history, name='message_history'),
 ]
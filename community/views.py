@@ -1,47 +1,90 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from django.shortcuts import get_object_or_404, redirect, render
 from .forms import CommunityCreateForm, MessageForm
 from .models import Community, Membership, Message
 from django.http import JsonResponse
+from django.views.decorators.http import require_POST
 import json
 from django.urls import reverse
 from django.core.paginator import Paginator
+from main.cache import cache_public_page
+from .signals import message_payload
 
 
 # COMMUNITY MAIN PAGE
-def community_home(request):
-    q = request.GET.get('q', '').strip()
+COMMUNITIES_PER_PAGE = 6
+# ?sort= -> ordering direktori (id sebagai tie-breaker supaya pagination stabil)
+DIRECTORY_SORTS = {
+    'popular': ('-members_count', '-id'),
+    'newest': ('-created_at', '-id'),
+    'name': ('name',),
+}
+DEFAULT_SORT = 'popular'
+
+
+def _directory(request, q, sort):
+    """Komunitas yang belum dijoin user (anti-join, bukan daftar id dari Python) + pencarian."""
     communities = Community.objects.all()
-
-    # Filter komunitas yang belum dijoin
     if request.user.is_authenticated:
-        joined_ids = set(
-            Membership.objects.filter(user=request.user).values_list('community_id', flat=True)
+        communities = communities.filter(
+            ~Exists(Membership.objects.filter(community=OuterRef('pk'), user=request.user))
         )
-        communities = communities.exclude(id__in=joined_ids)
-    else:
-        joined_ids = set()
-
-    # Pencarian
     if q:
         communities = communities.filter(
             Q(name__icontains=q) |
             Q(short_description__icontains=q) |
             Q(full_description__icontains=q)
         )
+    return communities.order_by(*DIRECTORY_SORTS[sort])
+
+
+def _community_card(c):
+    return {
+        'id': c.id,
+        'name': c.name,
+        'short_description': c.short_description,
+        'profile_image_url': c.profile_image_url,
+        'members_count': c.members_count,
+        'created_at': c.created_at.isoformat(),
+        'url': reverse('community:detail', args=[c.id]),
+    }
+
+
+@cache_public_page('communities')
+def community_home(request):
+    """
+    Direktori komunitas: ?q=&sort=popular|newest|name&page=.
+    Versi AJAX (X-Requested-With) = JSON satu halaman. Jumlah query tetap,
+    berapa pun komunitas yang sudah dijoin user.
+    """
+    q = request.GET.get('q', '').strip()
+    sort = request.GET.get('sort') or DEFAULT_SORT
+    if sort not in DIRECTORY_SORTS:
+        if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return JsonResponse({'error': f"Unknown sort '{sort}'"}, status=400)
+        sort = DEFAULT_SORT
 
     # Pagination — tampil 6 per halaman
-    paginator = Paginator(communities, 6)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = Paginator(_directory(request, q, sort), COMMUNITIES_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({
+            'communities': [_community_card(c) for c in page_obj],
+            'page': page_obj.number,
+            'num_pages': paginator.num_pages,
+            'count': paginator.count,
+            'has_next': page_obj.has_next(),
+        })
 
     return render(request, 'community/main_community.html', {
         'communities': page_obj,
         'q': q,
-        'joined_ids': joined_ids,
+        'sort': sort,
+        'sorts': DIRECTORY_SORTS,
     })
 
 
@@ -81,7 +124,8 @@ def community_detail(request, id):
     return render(request, 'community/detail.html', {
         'community': c,
         'is_member': is_member,
-        'members_count': c.members_count(),
+        'is_owner': c.created_by_id == request.user.id,
+        'members_count': c.members_count,
     })
 
 
@@ -90,7 +134,11 @@ def community_detail(request, id):
 @login_required
 def join_community(request, id):
     c = get_object_or_404(Community, id=id)
-    mem, created = Membership.objects.get_or_create(community=c, user=request.user, defaults={'role': 'user'})
+    # Riwayat sebelum join tidak dihitung sebagai unread
+    latest_id = c.messages.order_by('-id').values_list('id', flat=True).first() or 0
+    mem, created = Membership.objects.get_or_create(
+        community=c, user=request.user, defaults={'role': 'user', 'last_read_message_id': latest_id}
+    )
     if created:
         messages.success(request, f'You have joined {c.name}.')
     else:
@@ -102,7 +150,7 @@ def join_community(request, id):
 @login_required
 def my_community_list(request):
     memberships = Membership.objects.filter(
-        user=request.user
+        user=request.user, community__deleted_at__isnull=True
     ).select_related('community').order_by('joined_at')
 
     # aktifkan pagination
@@ -110,9 +158,57 @@ def my_community_list(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
+    # Unread untuk komunitas di halaman ini saja: satu query GROUP BY
+    unread = Membership.unread_counts(request.user, [m.community_id for m in page_obj])
+    for m in page_obj:
+        m.unread_count = unread.get(m.community_id, 0)
+
     return render(request, 'community/my_list.html', {'memberships': page_obj})
 
 
+@login_required
+def unread_counts(request):
+    """Badge navbar: GET /community/unread/ -> {"unread": {community_id: n}, "total": n}."""
+    unread = Membership.unread_counts(request.user)
+    return JsonResponse({
+        'unread': {str(community_id): n for community_id, n in unread.items()},
+        'total': sum(unread.values()),
+    })
+
+
+@login_required
+@require_POST
+def mark_read(request, id):
+    """Majukan last-read marker (dipanggil group.html saat pesan realtime masuk). Body: message_id."""
+    membership = Membership.objects.filter(
+        user=request.user, community_id=id, community__deleted_at__isnull=True
+    ).first()
+    if membership is None:
+        return JsonResponse({'error': 'Not a member'}, status=403)
+    try:
+        message_id = int(request.POST['message_id'])
+    except (KeyError, ValueError):
+        return JsonResponse({'error': 'Invalid parameter'}, status=400)
+    # Tidak boleh lompat melewati pesan yang belum ada
+    if not Message.objects.filter(community_id=id, id=message_id).exists():
+        return JsonResponse({'error': 'Message not found'}, status=404)
+    membership.mark_read(message_id)
+    return JsonResponse({'last_read_message_id': membership.last_read_message_id})
+
+
+
+# DELETE (pembuat komunitas saja): disembunyikan sekarang, cascade dihapus worker
+@login_required
+@require_POST
+def delete_community(request, id):
+    c = get_object_or_404(Community, id=id)
+    if c.created_by_id != request.user.id:
+        messages.error(request, 'Hanya pembuat komunitas yang bisa menghapusnya.')
+        return redirect('community:detail', id=id)
+    c.soft_delete()
+    messages.success(request, f'{c.name} has been deleted.')
+    return redirect('community:my_list')
+
 
 # LEAVE (hapus membership, balikin ke Community main)
 @login_required
@@ -127,7 +223,8 @@ def leave_community(request, id):
 @login_required
 def my_community_group(request, id):
     c = get_object_or_404(Community, id=id)
-    if not Membership.objects.filter(user=request.user, community=c).exists():
+    membership = Membership.objects.filter(user=request.user, community=c).first()
+    if membership is None:
         messages.error(request, 'Kamu harus bergabung terlebih dahulu.')
         return redirect('community:detail', id=id)
 
@@ -143,11 +240,64 @@ def my_community_group(request, id):
     else:
         form = MessageForm()
 
-    messages_qs = c.messages.select_related('sender')
+    chat_messages, has_more = _message_window(c.messages.all(), GROUP_WINDOW)
+    if chat_messages:
+        membership.mark_read(chat_messages[-1].id)
     return render(request, 'community/group.html', {
         'community': c,
         'form': form,
-        'messages': messages_qs,
+        'messages': chat_messages,
+        'has_more': has_more,
+        'history_chunk': HISTORY_CHUNK,
+    })
+
+
+# Jumlah pesan terbaru yang dirender di halaman group; sisanya lewat message_history
+GROUP_WINDOW = 50
+HISTORY_CHUNK = 50
+HISTORY_MAX_CHUNK = 200
+
+
+def _message_window(qs, limit):
+    """
+    `limit` pesan terakhir dari qs, urut lama -> baru.
+    Return (messages, has_more). Range scan terbalik di community_message_window_idx.
+    """
+    newest_first = list(qs.select_related('sender').order_by('-created_at', '-id')[:limit + 1])
+    has_more = len(newest_first) > limit
+    return newest_first[:limit][::-1], has_more
+
+
+@login_required
+def message_history(request, id):
+    """
+    Scroll-back chat: pesan sebelum `?before=<message id>` per chunk.
+    GET /community/my/<id>/messages/?before=123&limit=50
+    """
+    c = get_object_or_404(Community, id=id)
+    if not Membership.objects.filter(user=request.user, community=c).exists():
+        return JsonResponse({'error': 'Not a member'}, status=403)
+    try:
+        before = int(request.GET['before']) if request.GET.get('before') else None
+        limit = int(request.GET.get('limit') or HISTORY_CHUNK)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid parameter'}, status=400)
+    limit = min(max(limit, 1), HISTORY_MAX_CHUNK)
+
+    qs = c.messages.all()
+    if before is not None:
+        anchor = c.messages.filter(id=before).values_list('created_at', flat=True).first()
+        if anchor is None:
+            # Pesan anchor sudah dihapus (mis. saat user scroll): id naik monoton, cukup id < before
+            qs = qs.filter(id__lt=before)
+        else:
+            qs = qs.filter(Q(created_at__lt=anchor) | Q(created_at=anchor, id__lt=before))
+
+    chunk, has_more = _message_window(qs, limit)
+    return JsonResponse({
+        'messages': [message_payload(m) for m in chunk],
+        'has_more': has_more,
+        'before': chunk[0].id if chunk else None,
     })
 
 
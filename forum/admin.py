@@ -1,6 +1,6 @@
 # forum/admin.py
 from django.contrib import admin
-from django.db.models import Count, Sum
+from django.db.models import Count
 from .models import ForumPost, Vote, Comment
 
 
@@ -41,10 +41,7 @@ class ForumPostAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        return qs.annotate(
-            comments_total=Count("comments", distinct=True),
-            score_sum=Sum("votes__value"),
-        )
+        return qs.annotate(comments_total=Count("comments"))
 
     @admin.display(description="Content")
     def short_content(self, obj):
@@ -54,9 +51,9 @@ class ForumPostAdmin(admin.ModelAdmin):
     def comments_total(self, obj):
         return getattr(obj, "comments_total", 0)
 
-    @admin.display(description="Score")
+    @admin.display(description="Score", ordering="score")
     def score_total(self, obj):
-        return getattr(obj, "score_sum", 0) or 0
+        return obj.score
 
     # READ-ONLY
     def has_add_permission(self, request): return False
@@ -0,0 +1,72 @@
+"""
+Keyset (cursor) pagination untuk feed ForumPost.
+
+Urutan feed selalu (-created_at, -id). Cursor = posisi post terakhir di halaman
+sebelumnya, jadi halaman berikutnya cukup `WHERE (created_at, id) < (ts, id)
+ORDER BY ... LIMIT n` yang langsung jalan di index forum_post_feed_idx, berapa
+pun dalamnya halaman (tidak ada OFFSET dan tidak ada COUNT).
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db import connection
+from django.db.models import Q
+
+FEED_ORDERING = ("-created_at", "-id")
+# Batas COUNT untuk estimasi di database yang tidak punya statistik planner
+ESTIMATE_CAP = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(post):
+    raw = f"{post.created_at.isoformat()}|{post.pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Cursor -> (created_at, id). Raise InvalidCursor kalau formatnya rusak."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_iso, pk = base64.urlsafe_b64decode(padded.encode()).decode().rsplit("|", 1)
+        return datetime.fromisoformat(created_iso), int(pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def keyset_page(queryset, cursor=None, limit=10):
+    """
+    Satu halaman feed setelah `cursor`.
+    Return (items, next_cursor); next_cursor None kalau sudah halaman terakhir.
+    """
+    qs = queryset.order_by(*FEED_ORDERING)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    # Ambil 1 ekstra untuk tahu masih ada halaman berikutnya tanpa COUNT
+    items = list(qs[: limit + 1])
+    if len(items) > limit:
+        items = items[:limit]
+        return items, encode_cursor(items[-1])
+    return items, None
+
+
+def estimate_count(queryset):
+    """
+    Perkiraan jumlah baris tanpa COUNT(*) penuh.
+    Return (count, exact): PostgreSQL pakai estimasi planner (EXPLAIN),
+    database lain pakai COUNT yang dibatasi ESTIMATE_CAP.
+    """
+    qs = queryset.order_by()
+    if connection.vendor == "postgresql":
+        plan = json.loads(qs.explain(format="json"))
+        if isinstance(plan, list):
+            plan = plan[0]
+        return int(plan["Plan"]["Plan Rows"]), False
+    count = qs[: ESTIMATE_CAP + 1].count()
+    if count > ESTIMATE_CAP:
+        return ESTIMATE_CAP, False
+    return count, True
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from forum.models import Comment
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang path, depth & replies_count Comment (materialized path)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--post", type=int, action="append", dest="post_ids",
+            help="Hanya rebuild komentar di post dengan id ini (boleh diulang).",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = Comment.rebuild_tree(options["post_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt comment tree for {updated} comment(s)."))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from forum.models import ForumPost, Vote
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang score, upvotes & downvotes ForumPost dari tabel Vote."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--post", type=int, action="append", dest="post_ids",
+            help="Hanya rebuild post dengan id ini (boleh diulang).",
+        )
+
+    def handle(self, *args, **options):
+        totals = (
+            Vote.objects.filter(post=OuterRef("pk"))
+            .order_by()
+            .values("post")
+            .annotate(
+                total=Sum("value"),
+                up=Count("id", filter=Q(value=Vote.UP)),
+                down=Count("id", filter=Q(value=Vote.DOWN)),
+            )
+        )
+
+        def counter(name):
+            return Coalesce(Subquery(totals.values(name)), Value(0), output_field=IntegerField())
+
+        posts = ForumPost.objects.all()
+        if options["post_ids"]:
+            posts = posts.filter(id__in=options["post_ids"])
+
+        with transaction.atomic():
+            updated = posts.update(
+                score=counter("total"),
+                upvotes=counter("up"),
+                downvotes=counter("down"),
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt vote counters for {updated} post(s)."))
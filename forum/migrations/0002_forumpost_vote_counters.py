@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:05
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_vote_counters(apps, schema_editor):
+    ForumPost = apps.get_model('forum', 'ForumPost')
+    Vote = apps.get_model('forum', 'Vote')
+
+    totals = (
+        Vote.objects.filter(post=OuterRef('pk'))
+        .order_by()
+        .values('post')
+        .annotate(
+            score=Sum('value'),
+            up=Count('id', filter=Q(value=1)),
+            down=Count('id', filter=Q(value=-1)),
+        )
+    )
+    ForumPost.objects.update(
+        score=Coalesce(Subquery(totals.values('score')), Value(0), output_field=IntegerField()),
+        upvotes=Coalesce(Subquery(totals.values('up')), Value(0), output_field=IntegerField()),
+        downvotes=Coalesce(Subquery(totals.values('down')), Value(0), output_field=IntegerField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forumpost',
+            name='downvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='forumpost',
+            name='score',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='forumpost',
+            name='upvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_vote_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0002_forumpost_vote_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='forumpost',
+            index=models.Index(fields=['-created_at', '-id'], name='forum_post_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='forumpost',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='forum_post_author_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:16
+
+from django.conf import settings
+from django.db import migrations, models
+
+PATH_DIGITS = 10
+
+
+def backfill_comment_tree(apps, schema_editor):
+    Comment = apps.get_model('forum', 'Comment')
+    comments = {c.pk: c for c in Comment.objects.only('id', 'parent_id', 'is_active')}
+
+    paths = {}
+    for pk in comments:
+        chain = []
+        node = pk
+        while node is not None and node not in paths:
+            chain.append(node)
+            node = comments[node].parent_id
+        prefix = paths[node] if node is not None else ''
+        for item in reversed(chain):
+            prefix = f'{prefix}{item:0{PATH_DIGITS}d}/'
+            paths[item] = prefix
+
+    counts = dict.fromkeys(comments, 0)
+    for pk, c in comments.items():
+        c.path = paths[pk]
+        c.depth = c.path.count('/') - 1
+        if c.is_active:
+            for ancestor in c.path.split('/')[:-2]:
+                counts[int(ancestor)] += 1
+    for pk, c in comments.items():
+        c.replies_count = counts[pk]
+    Comment.objects.bulk_update(comments.values(), ['path', 'depth', 'replies_count'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0003_forumpost_feed_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=1100),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='replies_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'parent', 'id'], name='forum_comment_children_idx'),
+        ),
+        migrations.RunPython(backfill_comment_tree, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,6 @@
 from django.conf import settings
-from django.db import models
-from django.db.models import Sum
+from django.db import models, transaction
+from django.db.models import F
 from django.utils import timezone
 
 
@@ -11,16 +11,23 @@ class ForumPost(models.Model):
     content = models.TextField()
     created_at = models.DateTimeField(default=timezone.now)
 
+    # Counter vote yang disimpan (di-update oleh view upvote/downvote pakai F()),
+    # supaya list post tidak perlu SUM(value) per post.
+    score = models.IntegerField(default=0)
+    upvotes = models.PositiveIntegerField(default=0)
+    downvotes = models.PositiveIntegerField(default=0)
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset feed (forum.feed): ORDER BY created_at DESC, id DESC
+            models.Index(fields=["-created_at", "-id"], name="forum_post_feed_idx"),
+            models.Index(fields=["author", "-created_at", "-id"], name="forum_post_author_feed_idx"),
+        ]
 
     def __str__(self):
         return f"{self.author} · {self.content[:30]}"
 
-    @property
-    def score(self) -> int:
-        return self.votes.aggregate(total=Sum("value"))["total"] or 0
-
 
 class Vote(models.Model):
     UP, DOWN = 1, -1
@@ -57,8 +64,78 @@ class Comment(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Materialized path: id leluhur + id sendiri (masing-masing PATH_DIGITS digit + "/").
+    # Subtree = path__startswith, leluhur = parse path, tanpa rekursi di Python / SQL.
+    path = models.CharField(max_length=1100, blank=True, default="", editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Jumlah balasan aktif di seluruh subtree (bukan cuma anak langsung)
+    replies_count = models.PositiveIntegerField(default=0, editable=False)
+
+    PATH_DIGITS = 10
+    MAX_DEPTH = 100  # 100 * 11 karakter = max_length path
+
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["post", "parent", "id"], name="forum_comment_children_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        # path butuh id, jadi diisi setelah INSERT; counter leluhur di transaksi yang sama
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            parent = self.parent if self.parent_id else None
+            self.path = self.make_path(parent.path if parent else "", self.pk)
+            self.depth = parent.depth + 1 if parent else 0
+            Comment.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
+            if self.is_active and parent:
+                Comment.objects.filter(pk__in=self.ancestor_ids()).update(
+                    replies_count=F("replies_count") + 1
+                )
+
+    @classmethod
+    def make_path(cls, parent_path, pk):
+        return f"{parent_path}{pk:0{cls.PATH_DIGITS}d}/"
+
+    def ancestor_ids(self):
+        return [int(seg) for seg in self.path.split("/")[:-2]]
+
+    @classmethod
+    def rebuild_tree(cls, post_ids=None):
+        """
+        Hitung ulang path, depth & replies_count (mis. setelah is_active diubah manual).
+        Iteratif (tanpa rekursi), return jumlah komentar yang diperbarui.
+        """
+        qs = cls.objects.all()
+        if post_ids is not None:
+            qs = qs.filter(post_id__in=post_ids)
+        comments = {c.pk: c for c in qs.only("id", "parent_id", "is_active", "path", "depth", "replies_count")}
+
+        paths = {}
+        for pk in comments:
+            chain = []
+            node = pk
+            while node is not None and node not in paths:
+                chain.append(node)
+                node = comments[node].parent_id
+            prefix = paths[node] if node is not None else ""
+            for item in reversed(chain):
+                prefix = cls.make_path(prefix, item)
+                paths[item] = prefix
+
+        counts = dict.fromkeys(comments, 0)
+        for pk, c in comments.items():
+            c.path = paths[pk]
+            c.depth = c.path.count("/") - 1
+            if c.is_active:
+                for ancestor in c.ancestor_ids():
+                    counts[ancestor] += 1
+        for pk, c in comments.items():
+            c.replies_count = counts[pk]
+        cls.objects.bulk_update(comments.values(), ["path", "depth", "replies_count"], batch_size=1000)
+        return len(comments)
 
     def display_name(self):
         return (self.author.get_username() if self.author else None) or (self.name or "Anon")
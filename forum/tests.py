@@ -1,15 +1,23 @@
 # forum/tests.py
 from __future__ import annotations
 
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
+from django.core.management import call_command
 from django.test import Client, TestCase
 from django.urls import reverse
 
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
+from main.testing import QueryBudgetMixin, bulk_users
+
 from .models import ForumPost, Vote, Comment
+from .views import _apply_vote
 
 User = get_user_model()
 
@@ -52,11 +60,26 @@ class ForumModelTests(BaseSetup):
             with transaction.atomic():
                 Vote.objects.create(post=self.post, user=self.bob, value=Vote.DOWN)
 
-        # ubah suara (hapus & buat lagi) mempengaruhi agregasi score
+        # ubah suara (hapus & buat lagi) lewat ORM langsung -> score disinkron ulang
+        # dengan command rebuild_forum_scores
         Vote.objects.filter(post=self.post, user=self.bob).delete()
         Vote.objects.create(post=self.post, user=self.bob, value=Vote.DOWN)
+        call_command("rebuild_forum_scores", stdout=StringIO())
         self.post.refresh_from_db()
         self.assertEqual(self.post.score, -1)
+        self.assertEqual((self.post.upvotes, self.post.downvotes), (0, 1))
+
+    def test_rebuild_forum_scores_only_selected_posts(self):
+        other = ForumPost.objects.create(author=self.bob, content="Lain")
+        Vote.objects.create(post=self.post, user=self.bob, value=Vote.UP)
+        Vote.objects.create(post=self.post, user=self.staff, value=Vote.UP)
+        Vote.objects.create(post=other, user=self.alice, value=Vote.DOWN)
+
+        call_command("rebuild_forum_scores", "--post", str(self.post.id), stdout=StringIO())
+        self.post.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.post.score, self.post.upvotes, self.post.downvotes), (2, 2, 0))
+        self.assertEqual(other.score, 0)
 
     def test_comment_relations_and_str(self):
         # parent/child link + ordering created_at asc
@@ -131,6 +154,72 @@ class ForumViewTests(BaseSetup):
         self.assertEqual(r3.status_code, 200)
         self.assertEqual(r3.json().get("user_vote"), -1)
 
+    def test_vote_endpoints_keep_stored_counters_in_sync(self):
+        up_url = reverse("forum:upvote", args=[self.post.pk])
+        down_url = reverse("forum:downvote", args=[self.post.pk])
+
+        self.client.login(username="bob", password="pass")
+        self.client.post(up_url, **ajax_headers())
+        self.client.login(username="staff", password="pass")
+        self.client.post(up_url, **ajax_headers())
+        # staff pindah dari upvote ke downvote
+        r = self.client.post(down_url, **ajax_headers())
+        data = r.json()
+        self.assertEqual((data["score"], data["upvotes"], data["downvotes"]), (0, 1, 1))
+
+        # bob cabut upvote-nya
+        self.client.login(username="bob", password="pass")
+        data = self.client.post(up_url, **ajax_headers()).json()
+        self.assertEqual((data["score"], data["upvotes"], data["downvotes"]), (-1, 0, 1))
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.score, -1)
+        self.assertEqual(self.post.votes.count(), 1)
+
+    def _race_with_stale_vote(self, concurrent_value, value):
+        """
+        Jalankan _apply_vote(value) untuk bob, tapi vote yang dibaca request ini basi:
+        tepat setelah dibaca, request lain sudah menjalankan _apply_vote(concurrent_value).
+        """
+        real_get_or_create = Vote.objects.get_or_create
+        raced = []
+
+        def stale_get_or_create(**kwargs):
+            if raced:
+                return real_get_or_create(**kwargs)
+            raced.append(True)
+            stale = Vote.objects.get(post=self.post, user=self.bob)
+            with mock.patch.object(Vote.objects, "get_or_create", real_get_or_create):
+                _apply_vote(self.post, self.bob, concurrent_value)
+            return stale, False
+
+        with mock.patch.object(Vote.objects, "get_or_create", side_effect=stale_get_or_create):
+            return _apply_vote(self.post, self.bob, value)
+
+    def _assert_counters_match_votes(self):
+        self.post.refresh_from_db()
+        ups = self.post.votes.filter(value=Vote.UP).count()
+        downs = self.post.votes.filter(value=Vote.DOWN).count()
+        self.assertEqual(
+            (self.post.score, self.post.upvotes, self.post.downvotes), (ups - downs, ups, downs)
+        )
+
+    def test_double_toggle_with_stale_vote_keeps_counters_exact(self):
+        _apply_vote(self.post, self.bob, Vote.UP)
+        # Dua toggle-off identik bersamaan: yang kalah tidak boleh mengurangi counter lagi
+        user_vote = self._race_with_stale_vote(Vote.UP, Vote.UP)
+        self.assertEqual(user_vote, Vote.UP)
+        self.assertEqual(self.post.votes.count(), 1)
+        self._assert_counters_match_votes()
+
+    def test_switch_with_stale_vote_keeps_counters_exact(self):
+        _apply_vote(self.post, self.bob, Vote.UP)
+        # Vote dicabut request lain sebelum UPDATE up -> down jalan
+        user_vote = self._race_with_stale_vote(Vote.UP, Vote.DOWN)
+        self.assertEqual(user_vote, Vote.DOWN)
+        self._assert_counters_match_votes()
+        self.assertEqual((self.post.upvotes, self.post.downvotes), (0, 1))
+
     def test_delete_post_method_guard_and_author_only(self):
         url = reverse("forum:delete_post", args=[self.post.pk])
 
@@ -212,6 +301,165 @@ class ForumViewTests(BaseSetup):
         self.assertEqual(r4.status_code, 404)
 
 
+# =========================
+# Comment tree (materialized path, lazy API)
+# =========================
+class CommentTreeTests(BaseSetup):
+    def list_url(self):
+        return reverse("forum:comment_list", args=[self.post.pk])
+
+    def test_path_depth_and_replies_count_on_create(self):
+        c3 = Comment.objects.create(post=self.post, author=self.bob, content="Deep", parent=self.c2)
+        self.c1.refresh_from_db()
+        self.c2.refresh_from_db()
+        self.assertEqual(c3.depth, 2)
+        self.assertEqual(c3.ancestor_ids(), [self.c1.id, self.c2.id])
+        self.assertTrue(c3.path.startswith(self.c2.path))
+        self.assertEqual((self.c1.replies_count, self.c2.replies_count, c3.replies_count), (2, 1, 0))
+
+    def test_rebuild_matches_incremental_counters(self):
+        parent = self.c2
+        for i in range(30):
+            parent = Comment.objects.create(post=self.post, content=f"chain {i}", parent=parent)
+        Comment.objects.create(post=self.post, content="hidden", parent=self.c1, is_active=False)
+        before = dict(Comment.objects.values_list("id", "replies_count"))
+
+        Comment.objects.update(path="", depth=0, replies_count=0)
+        call_command("rebuild_comment_tree", stdout=StringIO())
+        self.assertEqual(dict(Comment.objects.values_list("id", "replies_count")), before)
+        self.assertEqual(Comment.objects.get(pk=parent.pk).depth, 31)
+        self.assertEqual(before[self.c1.id], 31)
+
+    def test_roots_are_paged_and_replies_expand_lazily(self):
+        roots = [Comment.objects.create(post=self.post, content=f"root {i}") for i in range(4)]
+        data = self.client.get(self.list_url(), {"limit": 3}).json()
+        self.assertEqual([c["id"] for c in data["items"]], [self.c1.id] + [r.id for r in roots[:2]])
+        self.assertEqual(data["items"][0]["replies"], [])
+        self.assertEqual(data["items"][0]["replies_count"], 1)
+        self.assertTrue(data["has_more"])
+        self.assertEqual(data["count"], 6)
+
+        data2 = self.client.get(self.list_url(), {"limit": 3, "cursor": data["next_cursor"]}).json()
+        self.assertEqual([c["id"] for c in data2["items"]], [r.id for r in roots[2:]])
+        self.assertFalse(data2["has_more"])
+
+        replies = self.client.get(self.list_url(), {"parent": self.c1.id}).json()
+        self.assertEqual([c["id"] for c in replies["items"]], [self.c2.id])
+        self.assertEqual(replies["items"][0]["depth"], 1)
+
+    def test_since_returns_only_new_comments(self):
+        last_id = self.client.get(self.list_url()).json()["last_id"]
+        self.assertEqual(last_id, self.c2.id)
+        new_reply = Comment.objects.create(post=self.post, content="baru", parent=self.c2)
+        data = self.client.get(self.list_url(), {"since": last_id}).json()
+        self.assertEqual([c["id"] for c in data["items"]], [new_reply.id])
+        self.assertEqual(data["items"][0]["parent"], self.c2.id)
+        self.assertEqual(data["last_id"], new_reply.id)
+
+        bad = self.client.get(self.list_url(), {"since": "abc"})
+        self.assertEqual(bad.status_code, 400)
+
+    def test_comment_list_conditional_get(self):
+        res = self.client.get(self.list_url())
+        etag = res["ETag"]
+        self.assertNotIn("no-store", res["Cache-Control"])
+        self.assertEqual(self.client.get(self.list_url(), HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Comment.objects.create(post=self.post, content="baru")
+        self.assertEqual(self.client.get(self.list_url(), HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # ETag per user (is_owner ikut berubah)
+        anon_etag = self.client.get(self.list_url())["ETag"]
+        self.client.login(username="bob", password="pass")
+        self.assertNotEqual(self.client.get(self.list_url())["ETag"], anon_etag)
+
+    def test_comment_add_rejects_too_deep_thread(self):
+        Comment.objects.filter(pk=self.c2.pk).update(depth=Comment.MAX_DEPTH - 1)
+        self.client.login(username="bob", password="pass")
+        add_url = reverse("forum:comment_add", args=[self.post.pk])
+        r = self.client.post(add_url, {"content": "x", "parent": self.c2.id}, **ajax_headers())
+        self.assertEqual(r.status_code, 400)
+
+
+# =========================
+# Keyset feed (cursor pagination)
+# =========================
+class ForumFeedTests(BaseSetup):
+    def setUp(self):
+        super().setUp()
+        # 24 post total; sebagian created_at sama supaya tie-break id ikut dites
+        base = timezone.now()
+        for i in range(23):
+            ForumPost.objects.create(
+                author=self.bob if i % 2 else self.alice,
+                content=f"Feed {i}",
+                created_at=base - timezone.timedelta(minutes=i // 3),
+            )
+        self.expected = list(
+            ForumPost.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def test_json_feed_walks_all_posts_without_gaps(self):
+        url = reverse("forum:post_feed")
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 5}
+            if cursor:
+                params["cursor"] = cursor
+            data = self.client.get(url, params).json()
+            self.assertTrue(data["ok"])
+            self.assertNotIn("count", data)
+            seen.extend(item["id"] for item in data["items"])
+            cursor = data["next_cursor"]
+            self.assertEqual(data["has_more"], cursor is not None)
+            if not cursor:
+                break
+        self.assertEqual(seen, self.expected)
+
+    def test_json_feed_item_fields_and_counts(self):
+        url = reverse("forum:post_feed")
+        self.client.login(username="alice", password="pass")
+        data = self.client.get(url, {"q": "Halo", "count": "exact"}).json()
+        self.assertEqual(data["count"], 1)
+        self.assertTrue(data["count_exact"])
+        item = data["items"][0]
+        self.assertEqual(item["id"], self.post.id)
+        self.assertEqual(item["comments"], 2)
+        self.assertTrue(item["can_edit"])
+
+        est = self.client.get(url, {"mine": "1", "count": "estimate"}).json()
+        self.assertEqual(est["count"], ForumPost.objects.filter(author=self.alice).count())
+
+    def test_html_list_ignores_count_param(self):
+        url = reverse("forum:post_list")
+        self.client.get(url)  # pemanasan cache
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as counted:
+            response = self.client.get(url, {"count": "exact"})
+        self.assertEqual(len(counted), len(plain))  # tidak ada COUNT(*) tambahan
+        self.assertNotIn("count", response.context)
+
+    def test_json_feed_rejects_bad_cursor(self):
+        res = self.client.get(reverse("forum:post_feed"), {"cursor": "!!nope"})
+        self.assertEqual(res.status_code, 400)
+
+    def test_html_cursor_mode_and_legacy_page(self):
+        url = reverse("forum:post_list")
+        res = self.client.get(url)
+        first = [p.id for p in res.context["posts"]]
+        self.assertEqual(first, self.expected[:10])
+        self.assertContains(res, "js-more")
+
+        res2 = self.client.get(url, {"cursor": res.context["next_cursor"]})
+        self.assertEqual([p.id for p in res2.context["posts"]], self.expected[10:20])
+
+        # Link lama ?page= tetap jalan
+        res3 = self.client.get(url, {"page": 2})
+        self.assertEqual([p.id for p in res3.context["posts"]], self.expected[10:20])
+        self.assertEqual(res3.context["filtered_count"], len(self.expected))
+
+
 # =========================
 # Admin coverage (read-only)
 # =========================
@@ -277,3 +525,16 @@ class ForumAdminTests(BaseSetup):
         self.assertIn(b"UP", res.content)
         # tidak ada "Add"
         self.assertNotIn(b">Add ", res.content)
+
+
+class ForumQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def seed(self, n):
+        authors = bulk_users(n, prefix="author")
+        posts = ForumPost.objects.bulk_create(ForumPost(author=a, content=f"Post {a.pk}") for a in authors)
+        Comment.objects.bulk_create(Comment(post=p, author=p.author, content="komentar") for p in posts)
+
+    def test_post_list(self):
+        User = get_user_model()
+        User.objects.create_user(username="reader", password="pass123")
+        self.client.login(username="reader", password="pass123")
+        self.assertQueryBudget(reverse("forum:post_list"), budget=5)
@@ -6,6 +6,7 @@ app_name = "forum"
 
 urlpatterns = [
     path("", views.post_list, name="post_list"),
+    path("feed/", views.post_feed, name="post_feed"),
     path("create/", views.create_post, name="create_post"),
     path("<int:post_id>/upvote/", views.upvote, name="upvote"),
     path("<int:post_id>/downvote/", views.downvote, name="downvote"),
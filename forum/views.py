@@ -1,6 +1,8 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q, Sum
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
@@ -8,6 +10,9 @@ from django.views.decorators.cache import never_cache
 from django.views.decorators.http import require_POST
 from django.core.paginator import Paginator
 
+from main.http import conditional_json
+
+from .feed import FEED_ORDERING, InvalidCursor, estimate_count, keyset_page
 from .models import ForumPost, Vote, Comment
 
 
@@ -16,17 +21,62 @@ def _is_ajax(request):
     return request.headers.get("X-Requested-With") == "XMLHttpRequest"
 
 
-def _vote_payload(post, user):
-    score = post.votes.aggregate(total=Sum("value"))["total"] or 0
-    user_vote = 0
-    if user.is_authenticated:
-        user_vote = (
-            post.votes.filter(user=user)
-            .values_list("value", flat=True)
-            .first()
-            or 0
+def _vote_payload(post, user_vote):
+    return {
+        "ok": True,
+        "score": post.score,
+        "upvotes": post.upvotes,
+        "downvotes": post.downvotes,
+        "user_vote": user_vote,
+    }
+
+
+def _counter_delta(value, step):
+    """Perubahan (upvotes, downvotes) kalau vote `value` ditambah (+1) / dihapus (-1)."""
+    return (step, 0) if value == Vote.UP else (0, step)
+
+
+def _apply_vote(post, user, value):
+    """
+    Toggle / ganti vote user lalu update counter ForumPost pakai F() di transaksi
+    yang sama dengan perubahan Vote. Return nilai vote user setelahnya (1, -1, 0).
+
+    DELETE / UPDATE Vote dikondisikan ke nilai yang tadi dibaca; counter hanya
+    digeser kalau statement itu benar-benar mengubah satu baris. Kalau 0 baris
+    (vote sudah diubah / dihapus request lain), keputusan diulang dari state terbaru.
+    """
+    with transaction.atomic():
+        while True:
+            vote, created = Vote.objects.get_or_create(
+                post=post, user=user, defaults={"value": value}
+            )
+            if created:
+                up, down = _counter_delta(value, 1)
+                score_delta, user_vote = value, value
+                break
+
+            current = Vote.objects.filter(pk=vote.pk, value=vote.value)
+            if vote.value == value:
+                if not current.delete()[0]:
+                    continue
+                up, down = _counter_delta(value, -1)
+                score_delta, user_vote = -value, 0
+            else:
+                if not current.update(value=value):
+                    continue
+                old_up, old_down = _counter_delta(vote.value, -1)
+                new_up, new_down = _counter_delta(value, 1)
+                up, down = old_up + new_up, old_down + new_down
+                score_delta, user_vote = value - vote.value, value
+            break
+
+        ForumPost.objects.filter(pk=post.pk).update(
+            score=F("score") + score_delta,
+            upvotes=F("upvotes") + up,
+            downvotes=F("downvotes") + down,
         )
-    return {"ok": True, "score": score, "user_vote": user_vote}
+    post.refresh_from_db(fields=["score", "upvotes", "downvotes"])
+    return user_vote
 
 
 def _node_from_comment(c, user_id=None):
@@ -38,85 +88,138 @@ def _node_from_comment(c, user_id=None):
         "created_iso": timezone.localtime(c.created_at).isoformat(),
         "created": timezone.localtime(c.created_at).strftime("%d %b %Y %H:%M"),
         "parent": c.parent_id,
+        "depth": c.depth,
+        # balasan di-load lazy lewat ?parent=<id>; replies_count = total subtree
         "replies": [],
-        "replies_count": 0,
+        "replies_count": c.replies_count,
         "is_owner": bool(user_id and c.author_id == user_id),
     }
 
 
-def _build_comment_tree(post, user):
-    all_comments = list(
-        Comment.objects.filter(post=post, is_active=True)
-        .select_related("author")
-        .order_by("created_at")
-    )
-    nodes = {
-        c.id: _node_from_comment(c, user.id if user.is_authenticated else None)
-        for c in all_comments
-    }
-    roots = []
-    for c in all_comments:
-        node = nodes[c.id]
-        if c.parent_id and c.parent_id in nodes:
-            nodes[c.parent_id]["replies"].append(node)
-        else:
-            roots.append(node)
-
-    def dfs_count(n):
-        total = 0
-        for ch in n["replies"]:
-            total += 1 + dfs_count(ch)
-        n["replies_count"] = total
-        return total
-
-    for r in roots:
-        dfs_count(r)
-    return roots, len(all_comments)
+def _int_param(request, name):
+    """Query param integer opsional. Raise ValueError kalau bukan angka."""
+    raw = request.GET.get(name)
+    return int(raw) if raw not in (None, "") else None
 
 
 # ================== Posts ==================
-def post_list(request):
-    """List post + filter (q & mine) + pagination (10 per halaman)."""
-    q = (request.GET.get("q") or "").strip()
-    mine = request.GET.get("mine") == "1"
-
-    qs = (
-        ForumPost.objects.select_related("author")
-        .prefetch_related("votes")
-        .annotate(active_comments=Count("comments", filter=Q(comments__is_active=True)))
-        .order_by("-created_at")
+POSTS_PER_PAGE = 10
+FEED_MAX_LIMIT = 50
+
+
+def _post_queryset(request, q, mine):
+    """Queryset feed + filter q & mine. Jumlah komentar aktif via subquery (tanpa GROUP BY)."""
+    active_comments = (
+        Comment.objects.filter(post=OuterRef("pk"), is_active=True)
+        .order_by()
+        .values("post")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    qs = ForumPost.objects.select_related("author").annotate(
+        active_comments=Coalesce(Subquery(active_comments, output_field=IntegerField()), 0)
     )
-
     if q:
         qs = qs.filter(Q(content__icontains=q) | Q(author__username__icontains=q))
     if mine and request.user.is_authenticated:
         qs = qs.filter(author=request.user)
+    return qs
 
-    filtered_count = qs.count()
-    is_filtered = bool(q or (mine and request.user.is_authenticated))
 
-    paginator = Paginator(qs, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+def _feed_counts(qs, mode):
+    """
+    Untuk post_feed (JSON): ?count=exact -> COUNT(*), ?count=estimate -> perkiraan murah,
+    selain itu tidak dihitung. Halaman HTML tidak menampilkan jumlah, jadi tidak memanggil ini.
+    """
+    if mode == "exact":
+        return {"count": qs.count(), "count_exact": True}
+    if mode == "estimate":
+        count, exact = estimate_count(qs)
+        return {"count": count, "count_exact": exact}
+    return {}
+
+
+def post_list(request):
+    """
+    List post + filter (q & mine).
+    Default pakai cursor (?cursor=, tombol "Load more"); ?page=N tetap didukung
+    untuk link lama (Paginator / OFFSET).
+    """
+    q = (request.GET.get("q") or "").strip()
+    mine = request.GET.get("mine") == "1"
+    is_filtered = bool(q or (mine and request.user.is_authenticated))
+    qs = _post_queryset(request, q, mine)
+
+    context = {"q": q, "mine": mine, "is_filtered": is_filtered}
+    if request.GET.get("page"):
+        paginator = Paginator(qs.order_by(*FEED_ORDERING), POSTS_PER_PAGE)
+        page_obj = paginator.get_page(request.GET.get("page"))
+        posts = list(page_obj.object_list)
+        context.update(
+            page_obj=page_obj,
+            is_paginated=page_obj.has_other_pages(),
+            paginator=paginator,
+            filtered_count=paginator.count,
+        )
+    else:
+        try:
+            posts, next_cursor = keyset_page(qs, request.GET.get("cursor"), POSTS_PER_PAGE)
+        except InvalidCursor:
+            posts, next_cursor = keyset_page(qs, None, POSTS_PER_PAGE)
+        context.update(next_cursor=next_cursor, cursor=request.GET.get("cursor") or "")
 
-    posts = list(page_obj.object_list)
     for p in posts:
         p.local_created = timezone.localtime(p.created_at)
+    context["posts"] = posts
 
-    return render(
-        request,
-        "forum/post_list.html",
-        {
-            "posts": posts,
-            "page_obj": page_obj,
-            "is_paginated": page_obj.has_other_pages(),
-            "paginator": paginator,
-            "q": q,
-            "mine": mine,
-            "is_filtered": is_filtered,
-            "filtered_count": filtered_count,
-        },
-    )
+    return render(request, "forum/post_list.html", context)
+
+
+def _feed_item(post, user_id):
+    return {
+        "id": post.id,
+        "author": post.author.username,
+        "author_id": post.author_id,
+        "content": post.content,
+        "created_iso": timezone.localtime(post.created_at).isoformat(),
+        "score": post.score,
+        "upvotes": post.upvotes,
+        "downvotes": post.downvotes,
+        "comments": post.active_comments,
+        "can_edit": bool(user_id and post.author_id == user_id),
+    }
+
+
+@never_cache
+def post_feed(request):
+    """
+    JSON feed untuk infinite scroll.
+    GET ?cursor=&limit=&q=&mine=1&count=exact|estimate
+    """
+    if request.method != "GET":
+        return HttpResponseBadRequest("GET only")
+    q = (request.GET.get("q") or "").strip()
+    mine = request.GET.get("mine") == "1"
+    try:
+        limit = min(max(int(request.GET.get("limit") or POSTS_PER_PAGE), 1), FEED_MAX_LIMIT)
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "invalid limit"}, status=400)
+
+    qs = _post_queryset(request, q, mine)
+    try:
+        posts, next_cursor = keyset_page(qs, request.GET.get("cursor"), limit)
+    except InvalidCursor:
+        return JsonResponse({"ok": False, "error": "invalid cursor"}, status=400)
+
+    user_id = request.user.id if request.user.is_authenticated else None
+    payload = {
+        "ok": True,
+        "items": [_feed_item(p, user_id) for p in posts],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
+    payload.update(_feed_counts(qs, request.GET.get("count")))
+    return JsonResponse(payload)
 
 
 @login_required
@@ -154,17 +257,9 @@ def create_post(request):
 @require_POST
 def upvote(request, post_id):
     post = get_object_or_404(ForumPost, id=post_id)
-    vote, created = Vote.objects.get_or_create(
-        post=post, user=request.user, defaults={"value": Vote.UP}
-    )
-    if not created:
-        if vote.value == Vote.UP:
-            vote.delete()
-        else:
-            vote.value = Vote.UP
-            vote.save(update_fields=["value"])
+    user_vote = _apply_vote(post, request.user, Vote.UP)
     if _is_ajax(request):
-        return JsonResponse(_vote_payload(post, request.user))
+        return JsonResponse(_vote_payload(post, user_vote))
     return redirect("forum:post_list")
 
 
@@ -172,17 +267,9 @@ def upvote(request, post_id):
 @require_POST
 def downvote(request, post_id):
     post = get_object_or_404(ForumPost, id=post_id)
-    vote, created = Vote.objects.get_or_create(
-        post=post, user=request.user, defaults={"value": Vote.DOWN}
-    )
-    if not created:
-        if vote.value == Vote.DOWN:
-            vote.delete()
-        else:
-            vote.value = Vote.DOWN
-            vote.save(update_fields=["value"])
+    user_vote = _apply_vote(post, request.user, Vote.DOWN)
     if _is_ajax(request):
-        return JsonResponse(_vote_payload(post, request.user))
+        return JsonResponse(_vote_payload(post, user_vote))
     return redirect("forum:post_list")
 
 
@@ -212,16 +299,64 @@ def edit_post(request, post_id):
 
 
 # ================== Comments ==================
-@never_cache
+COMMENTS_PER_PAGE = 20
+COMMENTS_MAX_LIMIT = 100
+
+
+def _comments_version(request, post_id):
+    # Komentar tidak bisa diedit: komentar baru menaikkan MAX(id), toggle is_active mengubah COUNT
+    return Comment.objects.filter(post_id=post_id).aggregate(
+        active=Count("id", filter=Q(is_active=True)), last=Max("id")
+    )
+
+
+@conditional_json(_comments_version)
 def comment_list(request, post_id):
+    """
+    Komentar per halaman (JSON), tanpa membangun seluruh tree:
+    - default: komentar top-level, ?cursor=<id terakhir>&limit=
+    - ?parent=<id>: balasan langsung dari satu komentar (expand lazy)
+    - ?since=<id>: semua komentar baru (id > since), urut id -> parent selalu lebih dulu
+    """
     if request.method != "GET":
         return HttpResponseBadRequest("GET only")
     post = get_object_or_404(ForumPost, id=post_id)
-    roots, total = _build_comment_tree(post, request.user)
-    resp = JsonResponse({"ok": True, "items": roots, "count": total})
-    resp["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-    resp["Pragma"] = "no-cache"
-    return resp
+    try:
+        parent_id = _int_param(request, "parent")
+        cursor = _int_param(request, "cursor")
+        since = _int_param(request, "since")
+        limit = _int_param(request, "limit") or COMMENTS_PER_PAGE
+    except ValueError:
+        return JsonResponse({"ok": False, "error": "invalid parameter"}, status=400)
+    limit = min(max(limit, 1), COMMENTS_MAX_LIMIT)
+
+    active = Comment.objects.filter(post=post, is_active=True)
+    qs = active.select_related("author").order_by("id")
+    if since is not None:
+        qs = qs.filter(id__gt=since)
+    elif parent_id is not None:
+        qs = qs.filter(parent_id=parent_id)
+    else:
+        qs = qs.filter(parent__isnull=True)
+    if cursor is not None:
+        qs = qs.filter(id__gt=cursor)
+
+    page = list(qs[: limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    user_id = request.user.id if request.user.is_authenticated else None
+
+    return JsonResponse(
+        {
+            "ok": True,
+            "items": [_node_from_comment(c, user_id) for c in page],
+            "count": active.count(),
+            "next_cursor": page[-1].id if has_more else None,
+            "has_more": has_more,
+            # baseline untuk polling ?since= berikutnya
+            "last_id": active.aggregate(last=Max("id"))["last"] or 0,
+        }
+    )
 
 
 @login_required
@@ -235,6 +370,8 @@ def comment_add(request, post_id):
     parent = None
     if parent_id:
         parent = get_object_or_404(Comment, id=parent_id, post=post, is_active=True)
+        if parent.depth + 1 >= Comment.MAX_DEPTH:
+            return JsonResponse({"ok": False, "error": "thread too deep"}, status=400)
     c = Comment.objects.create(
         post=post,
         author=request.user,
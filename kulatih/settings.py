@@ -12,8 +12,13 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+import importlib.util
 import os
+import sys
 from dotenv import load_dotenv
+
+from django.core.exceptions import ImproperlyConfigured
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -54,11 +59,13 @@ INSTALLED_APPS = [
     'community',
     'reviews',
     'booking',
+    'api',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'main.middleware.PerfMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -71,7 +78,8 @@ ROOT_URLCONF = 'kulatih.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates + pencatatan waktu render (main/perf.py)
+        'BACKEND': 'main.perf.InstrumentedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -116,6 +124,87 @@ else:
     }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# CACHE_BACKEND: locmem (default, per proses) | file | redis (dipakai bersama antar worker)
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+if CACHE_BACKEND == 'redis' and not TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+            'KEY_PREFIX': 'kulatih',
+        }
+    }
+elif CACHE_BACKEND == 'file' and not TESTING:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_DIR', str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    # Test selalu pakai locmem (tidak butuh Redis / folder cache)
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'kulatih-test' if TESTING else 'kulatih',
+        }
+    }
+
+# Cache halaman publik untuk pengunjung anonim (main.cache.cache_public_page), detik
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '300'))
+
+
+# Instrumentasi query / latency per view (main/perf.py, main/middleware.py).
+# Default mati: setiap query ikut membayar fingerprint + tulis statistik ke cache.
+# Header Server-Timing (jumlah query, waktu DB) hanya dikirim ke user staff.
+PERF_INSTRUMENTATION = os.getenv('PERF_INSTRUMENTATION', 'false').lower() == 'true'
+PERF_SERVER_TIMING = os.getenv('PERF_SERVER_TIMING', 'false').lower() == 'true'
+PERF_WINDOW = 500  # sampel terakhir per URL name untuk p50/p95/p99
+PERF_N_PLUS_ONE_WARNING = 10  # log warning kalau satu query terulang >= N kali dalam satu request
+
+
+# Community chat realtime (WebSocket via kulatih.asgi)
+# COMMUNITY_CHAT_BROKER: memory (default, satu worker) | redis (antar worker)
+COMMUNITY_CHAT_BROKER = os.getenv('COMMUNITY_CHAT_BROKER', 'memory')
+COMMUNITY_CHAT_REDIS_URL = os.getenv('REDIS_URL', 'redis://127.0.0.1:6379/0')
+COMMUNITY_CHAT_MAX_CONNECTIONS = int(os.getenv('COMMUNITY_CHAT_MAX_CONNECTIONS', '1000'))  # per worker
+COMMUNITY_CHAT_QUEUE_SIZE = 100  # event tertunda per socket sebelum diputus
+
+
+# Password hashing (lihat users/passwords.py)
+# Hasher pertama dipakai untuk hash baru; hash lama (mis. PBKDF2) tetap valid
+# dan otomatis di-upgrade ke hasher pertama saat user login.
+# PASSWORD_HASHER: argon2 (butuh paket argon2-cffi) | scrypt | pbkdf2
+_PASSWORD_HASHERS = {
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHER = os.getenv(
+    'PASSWORD_HASHER', 'argon2' if importlib.util.find_spec('argon2') else 'scrypt'
+)
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER={PASSWORD_HASHER!r} tidak dikenal; pilih salah satu: {', '.join(_PASSWORD_HASHERS)}"
+    )
+if PASSWORD_HASHER == 'argon2' and importlib.util.find_spec('argon2') is None:
+    # Tanpa argon2-cffi semua hash baru (dan login) gagal
+    raise ImproperlyConfigured("PASSWORD_HASHER=argon2 butuh paket argon2-cffi (pip install argon2-cffi)")
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+# Maks. hash yang jalan bersamaan per proses (pool bersama, lihat users/passwords.py)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(os.cpu_count() or 1)))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -165,3 +254,38 @@ else:
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Booking sweeper: tandai booking yang sudah lewat jadi 'completed'.
+# 0 = scheduler in-process mati (pakai `manage.py complete_bookings` dari cron).
+BOOKING_SWEEPER_INTERVAL = int(os.getenv('BOOKING_SWEEPER_INTERVAL', '0'))
+BOOKING_SWEEPER_BATCH_SIZE = int(os.getenv('BOOKING_SWEEPER_BATCH_SIZE', '500'))
+# Cache slot kosong per (coach, tanggal) di booking/slots.py
+BOOKING_SLOTS_CACHE_TIMEOUT = 3600
+BOOKING_SLOTS_MAX_DAYS = 31
+
+
+# Task queue di database (main/tasks.py, worker: `manage.py run_worker`)
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_BACKOFF = 10  # detik, dikali 2 setiap percobaan gagal
+TASKS_RETRY_MAX_DELAY = 3600
+TASKS_LEASE_SECONDS = 600  # task 'running' lebih lama dari ini dianggap worker-nya mati
+TASKS_POLL_INTERVAL = float(os.getenv('TASKS_POLL_INTERVAL', '1'))
+TASKS_KEEP_DONE_DAYS = 7
+
+
+# Logging
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'booking': {'handlers': ['console'], 'level': 'INFO'},
+        'main.perf': {'handlers': ['console'], 'level': 'WARNING'},
+        'main.tasks': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
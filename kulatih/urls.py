@@ -26,4 +26,5 @@ urlpatterns = [
     path('tournament/', include('tournaments.urls')),
     path('community/', include('community.urls')),
     path('booking/', include('booking.urls')),
+    path('api/v1/', include('api.urls')),
     ]
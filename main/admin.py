@@ -1,3 +1,27 @@
 from django.contrib import admin
+from django.utils import timezone
 
-# Register your models here.
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'priority', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'key')
+    ordering = ('-id',)
+    readonly_fields = (
+        'name', 'args', 'kwargs', 'priority', 'status', 'key', 'attempts', 'max_attempts', 'run_at',
+        'locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at',
+    )
+    actions = ['retry_tasks']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Retry selected failed tasks')
+    def retry_tasks(self, request, queryset):
+        updated = queryset.filter(status=Task.FAILED).update(
+            status=Task.QUEUED, attempts=0, run_at=timezone.now(), finished_at=None,
+        )
+        self.message_user(request, f'{updated} task(s) queued again.')
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        from django.utils.module_loading import autodiscover_modules
+
+        from .signals import connect_signals
+
+        connect_signals()
+        # Registrasi @task di <app>/tasks.py
+        autodiscover_modules('tasks')
@@ -0,0 +1,106 @@
+"""
+Cache-aside untuk halaman publik (pengunjung anonim).
+
+Setiap halaman masuk ke satu namespace (mis. "coaches"). Key cache memuat
+nomor versi namespace, jadi invalidasi cukup menaikkan versinya
+(`invalidate("coaches")`) -- entry lama tidak terjangkau lagi dan habis
+sendiri oleh timeout. Cara ini jalan sama di locmem, file, maupun Redis
+(tidak perlu delete by pattern).
+
+Invalidasi dipicu signals model di main/signals.py.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+KEY_PREFIX = 'pagecache'
+# Namespace yang terdaftar lewat @cache_public_page (untuk stats)
+NAMESPACES = set()
+
+
+def _incr(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # key ter-evict di antara add & incr
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def namespace_version(namespace):
+    return cache.get_or_set(f'{KEY_PREFIX}:ns:{namespace}', 1, timeout=None)
+
+
+def invalidate(*namespaces):
+    for namespace in namespaces:
+        _incr(f'{KEY_PREFIX}:ns:{namespace}')
+
+
+def _record(namespace, outcome):
+    _incr(f'{KEY_PREFIX}:stats:{namespace}:{outcome}')
+
+
+def stats():
+    """Hit/miss per namespace (counter ada di cache, jadi dipakai bersama kalau backend Redis)."""
+    result = {}
+    for namespace in sorted(NAMESPACES):
+        hits = cache.get(f'{KEY_PREFIX}:stats:{namespace}:hits', 0)
+        misses = cache.get(f'{KEY_PREFIX}:stats:{namespace}:misses', 0)
+        total = hits + misses
+        result[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 3) if total else None,
+            'version': namespace_version(namespace),
+        }
+    return result
+
+
+def _page_key(request, namespace):
+    # X-Requested-With ikut di key: beberapa view mengembalikan JSON untuk AJAX di URL yang sama
+    variant = f"{request.get_full_path()}|{request.headers.get('X-Requested-With', '')}"
+    digest = hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()
+    return f'{KEY_PREFIX}:{namespace}:{namespace_version(namespace)}:{digest}'
+
+
+def cache_public_page(namespace, timeout=None):
+    """
+    Cache response GET untuk user anonim. User login selalu lewat view
+    (konten per user). Response yang memakai CSRF token tidak disimpan.
+    """
+    NAMESPACES.add(namespace)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            key = _page_key(request, namespace)
+            cached = cache.get(key)
+            if cached is not None:
+                _record(namespace, 'hits')
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _record(namespace, 'misses')
+            response = view(request, *args, **kwargs)
+            if (
+                response.status_code == 200
+                and not response.streaming
+                and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+            ):
+                ttl = settings.PAGE_CACHE_TIMEOUT if timeout is None else timeout
+                cache.set(key, (response.content, response['Content-Type']), ttl)
+            response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
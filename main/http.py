@@ -0,0 +1,94 @@
+import hashlib
+import re
+from functools import wraps
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.text import compress_string
+from django.views.decorators.http import condition
+
+try:
+    import brotli  # opsional: Content-Encoding br kalau terpasang
+except ImportError:
+    brotli = None
+
+_ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+_ACCEPTS_BR = re.compile(r"\bbr\b")
+# Body lebih kecil dari ini tidak sebanding dengan overhead kompresi
+COMPRESS_MIN_LENGTH = 200
+
+
+def conditional_json(version_func, per_user=True):
+    """
+    Conditional GET (ETag / If-None-Match) untuk endpoint JSON yang di-poll.
+
+    `version_func(request, *args, **kwargs)` dipanggil sebelum view dan harus
+    murah (satu query ber-index), mis. (COUNT, MAX(updated_at)) atau counter
+    versi. Kalau ETag klien masih sama -> 304 tanpa menjalankan view.
+    Return None dari version_func = tidak pakai ETag untuk request itu.
+
+    per_user: ikutkan id user di ETag untuk payload yang punya field per user
+    (is_owner, can_edit, dll).
+    """
+    def etag_func(request, *args, **kwargs):
+        version = version_func(request, *args, **kwargs)
+        if version is None:
+            return None
+        user_id = request.user.pk if per_user and request.user.is_authenticated else ""
+        raw = f"{version!r}|{user_id}".encode()
+        return hashlib.md5(raw, usedforsecurity=False).hexdigest()
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header("ETag") or response.status_code == 304:
+                # Boleh disimpan browser, tapi selalu revalidate (If-None-Match)
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ["Cookie", "X-Requested-With"])
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def compress_response(view):
+    """
+    Kompres response view: brotli kalau paket `brotli` terpasang dan client
+    menerima `br`, selain itu gzip. Sama seperti GZipMiddleware tapi per view
+    (mis. hanya untuk API JSON).
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < COMPRESS_MIN_LENGTH
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        accept = request.headers.get("Accept-Encoding", "")
+        if brotli is not None and _ACCEPTS_BR.search(accept):
+            encoding, compressed = "br", brotli.compress(response.content, quality=5)
+        elif _ACCEPTS_GZIP.search(accept):
+            encoding, compressed = "gzip", compress_string(response.content)
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        if response.has_header("ETag"):
+            # Body berubah -> ETag jadi weak (sama seperti GZipMiddleware)
+            response["ETag"] = re.sub(r"^(?!W/)", "W/", response["ETag"])
+        return response
+
+    return wrapper
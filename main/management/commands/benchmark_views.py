@@ -0,0 +1,173 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from community.models import Membership
+from forum.models import ForumPost
+from main.management.commands.seed_benchmark import USERNAME_PREFIX
+from main.perf import RequestStats, percentile
+from tournaments.models import Tournament
+from users.models import Coach
+
+XHR = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+def scenarios():
+    """(nama, role, url, header) untuk view utama, pakai objek dari data seed_benchmark."""
+    membership = (
+        Membership.objects.filter(user__username__startswith=f'{USERNAME_PREFIX}m', user__member__isnull=False)
+        .select_related('user', 'community')
+        .order_by('id')
+        .first()
+    )
+    coach = Coach.objects.filter(user__username__startswith=USERNAME_PREFIX).order_by('-rating_count').first()
+    post = ForumPost.objects.filter(author__username__startswith=USERNAME_PREFIX).order_by('-created_at').first()
+    tournament = Tournament.objects.filter(flagTournaments=True, pembuatTournaments=coach).first() or \
+        Tournament.objects.filter(flagTournaments=True).first()
+    if not (membership and coach and post and tournament):
+        raise CommandError('Belum ada data benchmark; jalankan `manage.py seed_benchmark` dulu.')
+
+    users = {'guest': None, 'member': membership.user, 'coach': coach.user}
+    community = membership.community.pk
+    return users, [
+        ('main', 'guest', reverse('main:show_main'), {}),
+        ('forum list', 'member', reverse('forum:post_list'), {}),
+        ('forum feed json', 'guest', reverse('forum:post_feed'), {}),
+        ('forum comments json', 'guest', reverse('forum:comment_list', args=[post.pk]), {}),
+        ('coach list', 'guest', reverse('users:coach_list'), {}),
+        ('coach search', 'guest', reverse('users:coach_list') + '?q=budi', {}),
+        ('coach detail', 'guest', reverse('users:coach_detail', args=[coach.pk]), {}),
+        ('profile member', 'member', reverse('users:show_profile'), {}),
+        ('profile coach', 'coach', reverse('users:show_profile'), {}),
+        ('booking list member', 'member', reverse('booking:list'), {}),
+        ('booking list coach', 'coach', reverse('booking:list'), {}),
+        ('booking slots json', 'guest', reverse('booking:slots', args=[coach.pk]), {}),
+        ('community home', 'member', reverse('community:home'), {}),
+        ('community my list', 'member', reverse('community:my_list'), {}),
+        ('community group', 'member', reverse('community:my_group', args=[community]), {}),
+        ('community history', 'member', reverse('community:message_history', args=[community]), {}),
+        ('community unread json', 'member', reverse('community:unread_counts'), {}),
+        ('tournament list', 'member', reverse('tournaments:tournament_view'), {}),
+        ('tournament list json', 'member', reverse('tournaments:tournament_view'), XHR),
+        ('tournament detail', 'member', reverse('tournaments:tournament_show', args=[tournament.pk]), {}),
+        ('coach reviews json', 'guest', reverse('reviews:coach_reviews_json', args=[coach.pk]), {}),
+        ('api coaches', 'guest', reverse('api:coach_list') + '?include=reviews', {}),
+        ('api posts', 'guest', reverse('api:post_list') + '?include=author', {}),
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test view utama lewat test client (data dari seed_benchmark): throughput & "
+        "persentil latency per view. --save / --compare untuk membandingkan dengan baseline sebelum deploy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Request per view.')
+        parser.add_argument('--warmup', type=int, default=3, help='Request pemanasan per view (tidak dihitung).')
+        parser.add_argument('--only', nargs='+', default=[], help='Hanya view yang namanya mengandung teks ini.')
+        parser.add_argument('--cold', action='store_true', help='Kosongkan cache sebelum setiap request.')
+        parser.add_argument('--save', metavar='FILE', help='Simpan hasil sebagai baseline JSON.')
+        parser.add_argument('--compare', metavar='FILE', help='Bandingkan dengan baseline JSON.')
+        parser.add_argument(
+            '--threshold', type=float, default=20.0,
+            help='Gagal kalau p95 lebih lambat dari baseline lebih dari persen ini (default 20).',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests harus >= 1.')
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as fh:
+                baseline = json.load(fh)
+
+        # Test client pakai host "testserver"
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            users, plan = scenarios()
+            clients = {}
+            for role, user in users.items():
+                clients[role] = Client(raise_request_exception=False)
+                if user is not None:
+                    clients[role].force_login(user)
+
+            results = {}
+            self.stdout.write(
+                f"{'view':<24}{'n':>5}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'queries':>9}{'errors':>8}"
+            )
+            for name, role, url, headers in plan:
+                if options['only'] and not any(part in name for part in options['only']):
+                    continue
+                result = self._run(clients[role], url, headers, options)
+                results[name] = result
+                self.stdout.write(
+                    f"{name:<24}{result['requests']:>5}{result['rps']:>9.1f}{result['p50_ms']:>9.1f}"
+                    f"{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}{result['max_ms']:>9.1f}"
+                    f"{result['queries']:>9}{result['errors']:>8}"
+                )
+
+        if options['save']:
+            with open(options['save'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"\nHasil disimpan ke {options['save']}.")
+        if baseline is not None:
+            self._compare(results, baseline, options['threshold'])
+
+    def _run(self, client, url, headers, options):
+        def get():
+            if options['cold']:
+                cache.clear()
+            started = time.perf_counter()
+            response = client.get(url, **headers)
+            return response, (time.perf_counter() - started) * 1000
+
+        # Jumlah query dihitung dari request pertama (cold) saja
+        cache.clear()
+        stats = RequestStats()
+        with connection.execute_wrapper(stats):
+            get()
+        for _ in range(options['warmup']):
+            get()
+
+        timings, errors = [], 0
+        for _ in range(options['requests']):
+            response, elapsed = get()
+            timings.append(elapsed)
+            errors += response.status_code >= 400
+        timings.sort()
+        return {
+            'requests': len(timings),
+            'rps': round(len(timings) / (sum(timings) / 1000), 1),
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'max_ms': round(timings[-1], 2),
+            'queries': stats.queries,
+            'errors': errors,
+        }
+
+    def _compare(self, results, baseline, threshold):
+        self.stdout.write(f"\n{'view':<24}{'p95 lama':>10}{'p95 baru':>10}{'selisih':>10}{'queries':>12}")
+        regressions = []
+        for name, result in results.items():
+            old = baseline.get(name)
+            if old is None:
+                continue
+            change = (result['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100 if old['p95_ms'] else 0.0
+            queries = f"{old['queries']}->{result['queries']}"
+            flag = ''
+            if change > threshold or result['queries'] > old['queries']:
+                regressions.append(name)
+                flag = '  REGRESI'
+            self.stdout.write(
+                f"{name:<24}{old['p95_ms']:>10.1f}{result['p95_ms']:>10.1f}{change:>+9.0f}%{queries:>12}{flag}"
+            )
+        if regressions:
+            raise CommandError(f"Regresi dibanding baseline: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS('Tidak ada regresi dibanding baseline.'))
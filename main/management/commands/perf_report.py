@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from main import perf
+
+SORT_KEYS = {
+    'p95': 'p95_ms',
+    'p99': 'p99_ms',
+    'db': 'db_p95_ms',
+    'queries': 'queries_avg',
+    'duplicates': 'duplicates_avg',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "View paling lambat / paling boros query dari sampel PerfMiddleware. "
+        "Data diambil dari cache Django (pakai CACHE_BACKEND file/redis untuk data semua worker)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='p95')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--reset', action='store_true', help='Hapus semua sampel.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            perf.reset()
+            self.stdout.write(self.style.SUCCESS('Sampel perf dihapus.'))
+            return
+
+        rows = sorted(perf.report(), key=lambda r: r[SORT_KEYS[options['sort']]], reverse=True)
+        if not rows:
+            self.stdout.write('Belum ada sampel.')
+            return
+
+        self.stdout.write(
+            f"{'view':<40}{'n':>6}{'p50':>9}{'p95':>9}{'p99':>9}{'db p95':>9}"
+            f"{'render':>9}{'q avg':>8}{'q max':>7}{'dup':>7}"
+        )
+        for r in rows[:options['limit']]:
+            self.stdout.write(
+                f"{r['view'][:39]:<40}{r['requests']:>6}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+                f"{r['p99_ms']:>9.1f}{r['db_p95_ms']:>9.1f}{r['render_avg_ms']:>9.1f}"
+                f"{r['queries_avg']:>8.1f}{r['queries_max']:>7}{r['duplicates_avg']:>7.1f}"
+            )
+        self.stdout.write('\nQuery paling sering terulang dalam satu request (kandidat N+1):')
+        for r in sorted(rows, key=lambda r: r['top_duplicate_count'], reverse=True)[:options['limit']]:
+            if r['top_duplicate_count'] > 1:
+                self.stdout.write(f"  {r['view']}: {r['top_duplicate_count']}x  {r['top_duplicate'][:160]}")
@@ -0,0 +1,75 @@
+import os
+import signal
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from main import tasks
+
+# Housekeeping (lease habis, prune task lama) paling sering sekali per interval ini
+MAINTENANCE_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker task queue database (main/tasks.py): ambil task sesuai priority, jalankan, "
+        "retry dengan backoff kalau gagal. Bisa dijalankan beberapa proses sekaligus."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Proses antrian sampai kosong lalu keluar.')
+        parser.add_argument('--max-tasks', type=int, default=0, help='Keluar setelah N task (0 = tanpa batas).')
+        parser.add_argument(
+            '--sleep', type=float, default=settings.TASKS_POLL_INTERVAL,
+            help='Jeda polling (detik) saat antrian kosong.',
+        )
+        parser.add_argument('--name', default=f'{socket.gethostname()}:{os.getpid()}', help='Nama worker.')
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        previous = {sig: signal.signal(sig, self._stop) for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            self._run(options)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+    def _run(self, options):
+        worker = options['name']
+        max_tasks = options['max_tasks']
+        done = failed = 0
+        next_maintenance = 0.0
+        self.stdout.write(f'Worker {worker} mulai ({len(tasks.REGISTRY)} task terdaftar).')
+
+        while not self.stopping and not (max_tasks and done + failed >= max_tasks):
+            close_old_connections()
+            if time.monotonic() >= next_maintenance:
+                self._maintenance()
+                next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+
+            job = tasks.claim(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+            if tasks.execute(job):
+                done += 1
+            else:
+                failed += 1
+
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker} berhenti: {done} sukses, {failed} gagal.'))
+
+    def _maintenance(self):
+        requeued = tasks.requeue_stale()
+        pruned = tasks.prune(settings.TASKS_KEEP_DONE_DAYS)
+        if requeued or pruned:
+            self.stdout.write(f'{requeued} task lease habis dikembalikan, {pruned} task lama dihapus.')
+
+    def _stop(self, signum, frame):
+        # Task yang sedang jalan diselesaikan dulu
+        self.stopping = True
@@ -0,0 +1,293 @@
+import random
+import time
+from datetime import datetime, time as dtime, timedelta
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from booking.models import Booking, CoachAvailability
+from community.models import Community, Membership, Message
+from forum.models import Comment, ForumPost, Vote
+from main.cache import invalidate
+from reviews.models import Review, rebuild_coach_ratings
+from tournaments.models import Tournament
+from users.models import Coach, Member
+from users.search import get_search_backend
+
+# Semua user sintetis pakai prefix ini; --clear menghapus user-nya dan CASCADE
+# ke semua data turunannya (profil, booking, review, post, komunitas, ...).
+USERNAME_PREFIX = 'bench-'
+BATCH_SIZE = 2000
+
+# Jumlah baris untuk --scale 1
+VOLUMES = {
+    'members': 1000,
+    'coaches': 100,
+    'bookings': 3000,
+    'reviews': 1500,
+    'posts': 1000,
+    'votes': 5000,
+    'comments': 3000,
+    'communities': 50,
+    'memberships': 1500,
+    'messages': 10000,
+    'tournaments': 100,
+    'participants': 1000,
+}
+
+FIRST_NAMES = ['Budi', 'Siti', 'Agus', 'Dewi', 'Rina', 'Andi', 'Putri', 'Joko', 'Wulan', 'Rizky', 'Fajar', 'Intan']
+LAST_NAMES = ['Santoso', 'Rahayu', 'Wijaya', 'Pratama', 'Saputra', 'Lestari', 'Hidayat', 'Kusuma', 'Nugroho']
+CITIES = ['Jakarta', 'Bandung', 'Surabaya', 'Depok', 'Bogor', 'Medan', 'Makassar', 'Yogyakarta', 'Semarang', 'Bali']
+WORDS = (
+    'latihan pagi tenis bulutangkis renang lari sore lapangan coach jadwal turnamen teknik servis '
+    'pukulan stamina pemanasan tim seru minggu depan kota bareng ikut daftar skor menang kalah'
+).split()
+
+
+def _text(rng, lo, hi):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(lo, hi))).capitalize()
+
+
+def _pairs(rng, left, right, k):
+    """k pasangan (left, right) unik secara acak, tanpa rejection sampling."""
+    total = len(left) * len(right)
+    return [divmod(i, len(right)) for i in rng.sample(range(total), min(k, total))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Isi database dengan data sintetis untuk load test: user, coach, member, booking, review, "
+        "post forum + vote + komentar bertingkat, komunitas + pesan, tournament + peserta. "
+        "Semua lewat bulk_create; agregat (rating, score, comment tree, jumlah anggota & peserta, search index) di-rebuild di akhir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', type=float, default=1,
+            help=f"Pengali volume (--scale 1 = {VOLUMES['members']} member, {VOLUMES['coaches']} coach, ...).",
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--password', default='benchmark', help='Password semua user sintetis.')
+        parser.add_argument('--clear', action='store_true', help='Hapus data benchmark lama dulu.')
+
+    def handle(self, *args, **options):
+        bench_users = User.objects.filter(username__startswith=USERNAME_PREFIX)
+        if options['clear']:
+            started = time.perf_counter()
+            deleted, _ = bench_users.delete()
+            self.stdout.write(f'Dihapus {deleted} baris data benchmark lama ({time.perf_counter() - started:.1f}s).')
+        elif bench_users.exists():
+            raise CommandError('Data benchmark sudah ada; pakai --clear untuk mengisi ulang.')
+        if options['scale'] <= 0:
+            raise CommandError('--scale harus > 0.')
+
+        self.rng = random.Random(options['seed'])
+        self.volumes = {name: max(1, round(n * options['scale'])) for name, n in VOLUMES.items()}
+        # Satu hash untuk semua user: hashing per user (~0.5s) akan mendominasi waktu seed
+        self.password = make_password(options['password'])
+        self.now = timezone.now()
+
+        started = time.perf_counter()
+        with transaction.atomic():
+            members, coaches = self._seed_profiles()
+            self._seed_bookings(members, coaches)
+            self._seed_reviews(members, coaches)
+            users = [m.user for m in members] + [c.user for c in coaches]
+            self._seed_forum(users)
+            self._seed_communities(users)
+            self._seed_tournaments(members, coaches)
+            self._step('agregat & index', self._rebuild)
+        transaction.on_commit(lambda: invalidate('main', 'coaches', 'communities', 'tournaments'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Selesai dalam {time.perf_counter() - started:.1f}s. Login: {USERNAME_PREFIX}m0 / '
+            f"{USERNAME_PREFIX}c0, password '{options['password']}'."
+        ))
+
+    def _step(self, label, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        count = f'{len(result):>8} baris' if isinstance(result, list) else ' ' * 14
+        self.stdout.write(f'  {label:<16} {count}  {time.perf_counter() - started:6.2f}s')
+        return result
+
+    def _bulk(self, model, objs):
+        return model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+
+    def _past(self, days):
+        return self.now - timedelta(days=self.rng.uniform(0, days))
+
+    # ---------- profil ----------
+    def _users(self, kind, n):
+        rng = self.rng
+        return self._bulk(User, [
+            User(
+                username=f'{USERNAME_PREFIX}{kind}{i}',
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                email=f'{USERNAME_PREFIX}{kind}{i}@example.com',
+                password=self.password,
+                date_joined=self._past(365),
+            )
+            for i in range(n)
+        ])
+
+    def _seed_profiles(self):
+        rng = self.rng
+        sports = [key for key, _ in Coach.SPORT_CHOICES]
+
+        def members():
+            users = self._users('m', self.volumes['members'])
+            return self._bulk(Member, [
+                Member(user=u, city=rng.choice(CITIES), phone=f'08{rng.randrange(10**9):09d}') for u in users
+            ])
+
+        def coaches():
+            users = self._users('c', self.volumes['coaches'])
+            return self._bulk(Coach, [
+                Coach(
+                    user=u, sport=rng.choice(sports), city=rng.choice(CITIES),
+                    phone=f'08{rng.randrange(10**9):09d}', hourly_fee=rng.randrange(50, 500) * 1000,
+                    description=_text(rng, 8, 30),
+                )
+                for u in users
+            ])
+
+        return self._step('members', members), self._step('coaches', coaches)
+
+    # ---------- booking & review ----------
+    def _seed_bookings(self, members, coaches):
+        rng = self.rng
+        today = timezone.localdate()
+        statuses = ['pending', 'confirmed', 'confirmed', 'cancelled', 'completed', 'rescheduled']
+
+        def build():
+            # (coach, hari, jam) unik supaya tidak ada slot bentrok per coach
+            days, hours = 90, 14
+            total = len(coaches) * days * hours
+            slots = rng.sample(range(total), min(self.volumes['bookings'], total))
+            objs = []
+            for slot in slots:
+                coach_idx, rest = divmod(slot, days * hours)
+                day, hour = divmod(rest, hours)
+                date = today + timedelta(days=day - 60)
+                objs.append(Booking(
+                    coach=coaches[coach_idx], member=rng.choice(members), location=rng.choice(CITIES),
+                    date=date, start_time=dtime(7 + hour), end_time=dtime(8 + hour),
+                    status=rng.choice(statuses),
+                    created_at=timezone.make_aware(datetime.combine(date, dtime(0))) - timedelta(days=rng.randint(1, 14)),
+                ))
+            return self._bulk(Booking, objs)
+
+        self._step('bookings', build)
+        # Jadwal mingguan mencakup jam booking di atas (07:00-21:00), Minggu libur
+        return self._step('availability', lambda: self._bulk(CoachAvailability, [
+            CoachAvailability(coach=coach, weekday=weekday, start_time=start, end_time=end)
+            for coach in coaches
+            for weekday in range(6)
+            for start, end in ((dtime(7), dtime(12)), (dtime(13), dtime(21)))
+        ]))
+
+    def _seed_reviews(self, members, coaches):
+        rng = self.rng
+        return self._step('reviews', lambda: self._bulk(Review, [
+            Review(
+                coach=coaches[c], reviewer=members[m], rating=rng.choices(range(1, 6), weights=[1, 1, 3, 6, 8])[0],
+                comment=_text(rng, 3, 25), created_at=self._past(365),
+            )
+            for c, m in _pairs(rng, coaches, members, self.volumes['reviews'])
+        ]))
+
+    # ---------- forum ----------
+    def _seed_forum(self, users):
+        rng = self.rng
+        posts = self._step('posts', lambda: self._bulk(ForumPost, [
+            ForumPost(author=rng.choice(users), content=_text(rng, 5, 60), created_at=self._past(180))
+            for _ in range(self.volumes['posts'])
+        ]))
+        self._step('votes', lambda: self._bulk(Vote, [
+            Vote(post=posts[p], user=users[u], value=rng.choice([Vote.UP, Vote.UP, Vote.UP, Vote.DOWN]))
+            for p, u in _pairs(rng, posts, users, self.volumes['votes'])
+        ]))
+
+        def comments():
+            # Komentar bertingkat per level: parent harus sudah punya pk sebelum balasannya dibuat.
+            # path/depth/replies_count diisi Comment.rebuild_tree() di _rebuild.
+            remaining = self.volumes['comments']
+            level = self._bulk(Comment, [
+                Comment(post=rng.choice(posts), author=rng.choice(users), content=_text(rng, 2, 30))
+                for _ in range(max(1, remaining // 2))
+            ])
+            created = list(level)
+            remaining -= len(level)
+            while remaining > 0 and level:
+                size = min(remaining, max(1, len(level) // 2))
+                parents = [rng.choice(level) for _ in range(size)]
+                level = self._bulk(Comment, [
+                    Comment(post_id=p.post_id, parent=p, author=rng.choice(users), content=_text(rng, 2, 20))
+                    for p in parents
+                ])
+                created += level
+                remaining -= len(level)
+            return created
+
+        self._step('comments', comments)
+
+    # ---------- komunitas ----------
+    def _seed_communities(self, users):
+        rng = self.rng
+        communities = self._step('communities', lambda: self._bulk(Community, [
+            Community(
+                name=f'Bench {rng.choice(CITIES)} {i}', short_description=_text(rng, 3, 10),
+                full_description=_text(rng, 10, 60), created_by=rng.choice(users),
+            )
+            for i in range(self.volumes['communities'])
+        ]))
+
+        def memberships():
+            admins = {(c.pk, c.created_by_id) for c in communities}
+            objs = [Membership(community=c, user_id=c.created_by_id, role='admin') for c in communities]
+            for c, u in _pairs(rng, communities, users, self.volumes['memberships']):
+                if (communities[c].pk, users[u].pk) not in admins:
+                    objs.append(Membership(community=communities[c], user=users[u]))
+            return self._bulk(Membership, objs)
+
+        memberships = self._step('memberships', memberships)
+        self._step('messages', lambda: self._bulk(Message, [
+            Message(community_id=m.community_id, sender_id=m.user_id, text=_text(rng, 1, 25))
+            for m in rng.choices(memberships, k=self.volumes['messages'])
+        ]))
+
+    # ---------- tournament ----------
+    def _seed_tournaments(self, members, coaches):
+        rng = self.rng
+        today = timezone.localdate()
+        categories = [key for key, _ in Tournament._meta.get_field('tipeTournaments').choices]
+        tournaments = self._step('tournaments', lambda: self._bulk(Tournament, [
+            Tournament(
+                pembuatTournaments=rng.choice(coaches), tipeTournaments=rng.choice(categories),
+                namaTournaments=f'{rng.choice(CITIES)} Open {i}', tanggalTournaments=today + timedelta(days=rng.randint(-30, 90)),
+                lokasiTournaments=f'GOR {rng.choice(CITIES)}', deskripsiTournaments=_text(rng, 10, 50),
+                posterTournaments=f'https://picsum.photos/seed/bench{i}/600/400', flagTournaments=rng.random() > 0.1,
+            )
+            for i in range(self.volumes['tournaments'])
+        ]))
+        through = Tournament.pesertaTournaments.through
+        self._step('participants', lambda: self._bulk(through, [
+            through(tournament_id=tournaments[t].pk, member_id=members[m].pk)
+            for t, m in _pairs(rng, tournaments, members, self.volumes['participants'])
+        ]))
+
+    def _rebuild(self):
+        # bulk_create tidak mengirim signals / tidak menjalankan save()
+        rebuild_coach_ratings()
+        call_command('rebuild_forum_scores', stdout=StringIO())
+        Comment.rebuild_tree()
+        Tournament.rebuild_participant_counts()
+        Community.rebuild_members_count()
+        get_search_backend().rebuild()
@@ -0,0 +1,52 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import perf
+
+logger = logging.getLogger('main.perf')
+
+
+class PerfMiddleware:
+    """
+    Ukur query SQL, waktu DB, render template & total latency per request
+    (lihat main/perf.py). Simpan sampel per URL name; header Server-Timing hanya
+    untuk user staff (angka query / waktu DB tidak dibuka ke publik).
+    """
+
+    def __init__(self, get_response):
+        if not settings.PERF_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats, token = perf.start_request()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            perf.end_request(token)
+
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        sample = stats.sample()
+        perf.record(view_name, sample)
+
+        if sample['top_duplicate_count'] >= settings.PERF_N_PLUS_ONE_WARNING:
+            logger.warning(
+                'Possible N+1 in %s (%s): query repeated %d times: %s',
+                view_name, request.path, sample['top_duplicate_count'], sample['top_duplicate'][:200],
+            )
+        user = getattr(request, 'user', None)
+        if settings.PERF_SERVER_TIMING and user is not None and user.is_staff:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={sample["db_ms"]};desc="{sample["queries"]} queries, {sample["duplicates"]} dup"',
+                f'render;dur={sample["render_ms"]}',
+                f'total;dur={sample["total_ms"]}',
+            ])
+        return response
@@ -0,0 +1,208 @@
+"""
+Instrumentasi per request: jumlah query SQL, waktu DB, query duplikat
+(indikasi N+1), waktu render template dan total latency.
+
+- main.middleware.PerfMiddleware mengumpulkan angka per request dan
+  mengirim header Server-Timing.
+- Template dihitung lewat backend InstrumentedDjangoTemplates (settings
+  TEMPLATES). Query lazy yang jalan di template ikut terhitung di db *dan*
+  render.
+- Sampel terakhir (PERF_WINDOW) per URL name disimpan di cache Django, jadi
+  `manage.py perf_report` / halaman staff /perf-report/ bisa membaca data
+  semua worker kalau CACHE_BACKEND file / redis (locmem = per proses).
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.backends.django import DjangoTemplates
+
+KEY_PREFIX = 'perf'
+# Sampel lokal dikirim ke cache paling lambat setiap FLUSH_INTERVAL detik
+FLUSH_INTERVAL = 5
+FLUSH_SIZE = 100
+
+_current = ContextVar('perf_request', default=None)
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def fingerprint(sql):
+    """SQL tanpa nilai literal: query yang sama dengan parameter beda -> fingerprint sama."""
+    sql = _IN_LIST.sub('(...)', sql)
+    sql = _STRING.sub('?', sql)
+    return _NUMBER.sub('?', sql)
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self.rendering = False
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper: hitung query & waktu DB."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        return sum(n - 1 for n in self.fingerprints.values() if n > 1)
+
+    def top_duplicate(self):
+        if not self.fingerprints:
+            return None, 0
+        sql, n = self.fingerprints.most_common(1)[0]
+        return (sql, n) if n > 1 else (None, 0)
+
+    def sample(self):
+        total = time.perf_counter() - self.started
+        top_sql, top_count = self.top_duplicate()
+        return {
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(self.db_time * 1000, 2),
+            'render_ms': round(self.render_time * 1000, 2),
+            'queries': self.queries,
+            'duplicates': self.duplicates,
+            'top_duplicate': top_sql[:500] if top_sql else None,
+            'top_duplicate_count': top_count,
+        }
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+# ================== Template render time ==================
+class _TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        stats = _current.get()
+        if stats is None or stats.rendering:
+            return self.template.render(context, request)
+        stats.rendering = True
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            stats.render_time += time.perf_counter() - started
+            stats.rendering = False
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates yang mencatat waktu render ke request yang sedang diukur."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
+
+
+# ================== Penyimpanan sampel ==================
+class _Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(list)
+        self.pending_count = 0
+        self.last_flush = time.monotonic()
+
+    def record(self, view_name, sample):
+        with self.lock:
+            self.pending[view_name].append(sample)
+            self.pending_count += 1
+            due = self.pending_count >= FLUSH_SIZE or time.monotonic() - self.last_flush >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(list)
+            self.pending_count = 0
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+        window = settings.PERF_WINDOW
+        views = cache.get(f'{KEY_PREFIX}:views', set())
+        for view_name, samples in pending.items():
+            key = f'{KEY_PREFIX}:samples:{view_name}'
+            # Read-modify-write tanpa lock: antar worker bisa kehilangan beberapa
+            # sampel, tidak masalah untuk statistik persentil.
+            cache.set(key, (cache.get(key, []) + samples)[-window:], None)
+            views.add(view_name)
+        cache.set(f'{KEY_PREFIX}:views', views, None)
+
+
+_store = _Store()
+
+
+def record(view_name, sample):
+    _store.record(view_name, sample)
+
+
+def reset():
+    _store.flush()
+    for view_name in cache.get(f'{KEY_PREFIX}:views', set()):
+        cache.delete(f'{KEY_PREFIX}:samples:{view_name}')
+    cache.delete(f'{KEY_PREFIX}:views')
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile dari list yang sudah terurut."""
+    if not sorted_values:
+        return None
+    index = max(math.ceil(p / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def report():
+    """Ringkasan per URL name: p50/p95/p99 latency, query, duplikat, query N+1 terburuk."""
+    _store.flush()
+    rows = []
+    for view_name in cache.get(f'{KEY_PREFIX}:views', set()):
+        samples = cache.get(f'{KEY_PREFIX}:samples:{view_name}', [])
+        if not samples:
+            continue
+        totals = sorted(s['total_ms'] for s in samples)
+        db = sorted(s['db_ms'] for s in samples)
+        worst = max(samples, key=lambda s: s['top_duplicate_count'])
+        rows.append({
+            'view': view_name,
+            'requests': len(samples),
+            'p50_ms': percentile(totals, 50),
+            'p95_ms': percentile(totals, 95),
+            'p99_ms': percentile(totals, 99),
+            'db_p95_ms': percentile(db, 95),
+            'render_avg_ms': round(sum(s['render_ms'] for s in samples) / len(samples), 2),
+            'queries_avg': round(sum(s['queries'] for s in samples) / len(samples), 1),
+            'queries_max': max(s['queries'] for s in samples),
+            'duplicates_avg': round(sum(s['duplicates'] for s in samples) / len(samples), 1),
+            'top_duplicate': worst['top_duplicate'],
+            'top_duplicate_count': worst['top_duplicate_count'],
+        })
+    return rows
@@ -0,0 +1,55 @@
+"""
+Cache objek per request untuk lookup yang berulang di banyak view
+(Coach by pk, Member by user, ...).
+
+Aktif hanya di dalam `request_cache()` -- dipakai /api/v1/batch/ supaya
+sub-request dalam satu batch berbagi hasil lookup yang sama. Di luar itu
+`cached_get` sama dengan `Model.objects.get`.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.http import Http404
+
+_store = ContextVar('request_cache', default=None)
+_MISSING = object()
+
+
+@contextmanager
+def request_cache():
+    token = _store.set({})
+    try:
+        yield
+    finally:
+        _store.reset(token)
+
+
+def _key(model, lookup):
+    # Instance model di lookup (mis. user=request.user) di-key pakai pk-nya
+    items = tuple(sorted((name, getattr(value, 'pk', value)) for name, value in lookup.items()))
+    return model._meta.label, items
+
+
+def cached_get(model, **lookup):
+    """Model.objects.get(**lookup), di-memo selama request_cache() aktif. Raise Model.DoesNotExist."""
+    store = _store.get()
+    if store is None:
+        return model._default_manager.get(**lookup)
+    key = _key(model, lookup)
+    obj = store.get(key, _MISSING)
+    if obj is _MISSING:
+        try:
+            obj = model._default_manager.get(**lookup)
+        except model.DoesNotExist:
+            obj = None
+        store[key] = obj
+    if obj is None:
+        raise model.DoesNotExist(f'{model.__name__} matching {lookup} does not exist.')
+    return obj
+
+
+def cached_get_or_404(model, **lookup):
+    try:
+        return cached_get(model, **lookup)
+    except model.DoesNotExist:
+        raise Http404(f'No {model._meta.object_name} matches the given query.')
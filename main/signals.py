@@ -0,0 +1,45 @@
+from functools import partial
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .cache import invalidate
+
+# Model -> namespace halaman publik yang menampilkannya (lihat @cache_public_page)
+INVALIDATIONS = {
+    'users.Coach': ('coaches',),
+    'reviews.Review': ('coaches',),
+    'community.Community': ('communities',),
+    'community.Membership': ('communities',),
+    'tournaments.Tournament': ('tournaments',),
+}
+
+# Field User yang tampil di kartu / detail coach
+_USER_PUBLIC_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+def _invalidate(namespaces, sender=None, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate(*namespaces)
+    # Sekali lagi setelah commit: request lain bisa saja mengisi cache dengan
+    # data lama selama transaksi ini belum commit.
+    transaction.on_commit(lambda: invalidate(*namespaces))
+
+
+def _invalidate_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Login hanya menyimpan last_login -> halaman publik tidak berubah
+    if update_fields is not None and not _USER_PUBLIC_FIELDS & set(update_fields):
+        return
+    _invalidate(('coaches',), sender, raw=raw)
+
+
+def connect_signals():
+    for label, namespaces in INVALIDATIONS.items():
+        model = apps.get_model(label)
+        handler = partial(_invalidate, namespaces)
+        post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'pagecache-save-{label}')
+        post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'pagecache-delete-{label}')
+    post_save.connect(_invalidate_user, sender=get_user_model(), dispatch_uid='pagecache-save-user')
@@ -0,0 +1,182 @@
+"""
+Task queue ringan di database yang sudah ada (SQLite / PostgreSQL), tanpa broker.
+
+Daftarkan fungsi di modul `<app>/tasks.py` (di-import otomatis saat startup):
+
+    @task('booking.complete_expired', max_attempts=3)
+    def complete_expired(batch_size=500):
+        ...
+
+lalu dari view / command:
+
+    enqueue('booking.complete_expired', kwargs={'batch_size': 200}, key='sweep:2026-10-17T10:00')
+
+dan jalankan worker: `python manage.py run_worker`.
+
+- args / kwargs disimpan sebagai JSON, jadi harus JSON-serializable (kirim pk, bukan objek model).
+- Priority lebih besar diambil lebih dulu, lalu run_at paling awal.
+- Task yang raise exception dijadwalkan ulang dengan backoff eksponensial
+  (TASKS_RETRY_BACKOFF * 2^(attempt-1), maks TASKS_RETRY_MAX_DELAY detik)
+  sampai max_attempts, setelah itu status 'failed' (retry manual lewat admin).
+- Idempotency key unik: enqueue kedua dengan key yang sama mengembalikan task
+  yang sudah ada, apa pun statusnya.
+- Task diklaim dengan UPDATE bersyarat (status='queued' -> 'running'), jadi
+  beberapa worker aman berjalan bersamaan tanpa SELECT ... FOR UPDATE.
+  Task 'running' yang worker-nya mati dikembalikan ke antrian setelah
+  TASKS_LEASE_SECONDS. Task bisa jalan lebih dari sekali: buat idempotent.
+"""
+import logging
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+# Kandidat yang dicoba diklaim per putaran (sisanya kalah balapan dengan worker lain)
+CLAIM_BATCH = 10
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    fn: Callable
+    max_attempts: int
+    priority: int
+
+
+REGISTRY = {}
+
+
+def task(name, *, max_attempts=None, priority=0):
+    """Decorator: daftarkan fungsi sebagai task dengan nama `name`."""
+    def decorator(fn):
+        if name in REGISTRY and REGISTRY[name].fn is not fn:
+            raise ValueError(f"Task '{name}' is already registered")
+        REGISTRY[name] = TaskSpec(fn, max_attempts or settings.TASKS_MAX_ATTEMPTS, priority)
+        return fn
+    return decorator
+
+
+def enqueue(name, args=(), kwargs=None, *, priority=None, key=None, run_at=None, max_attempts=None):
+    """
+    Masukkan task ke antrian; return (Task, created).
+    created False kalau key sudah pernah dipakai (task lama dikembalikan).
+    """
+    spec = REGISTRY.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown task '{name}'")
+    if key is not None:
+        existing = Task.objects.filter(key=key).first()
+        if existing is not None:
+            return existing, False
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=name,
+                args=list(args),
+                kwargs=kwargs or {},
+                priority=spec.priority if priority is None else priority,
+                key=key,
+                run_at=run_at or timezone.now(),
+                max_attempts=max_attempts or spec.max_attempts,
+            ), True
+    except IntegrityError:
+        # Balapan dengan enqueue lain yang memakai key sama
+        return Task.objects.get(key=key), False
+
+
+def enqueue_on_commit(name, args=(), kwargs=None, **options):
+    """enqueue setelah transaksi aktif commit (task tidak melihat data yang belum ada / di-rollback)."""
+    transaction.on_commit(lambda: enqueue(name, args, kwargs, **options))
+
+
+def retry_delay(attempts):
+    return min(settings.TASKS_RETRY_BACKOFF * 2 ** max(attempts - 1, 0), settings.TASKS_RETRY_MAX_DELAY)
+
+
+def claim(worker):
+    """Ambil satu task yang siap jalan untuk `worker`; None kalau antrian kosong."""
+    now = timezone.now()
+    candidates = list(
+        Task.objects.filter(status=Task.QUEUED, run_at__lte=now)
+        .order_by('-priority', 'run_at', 'id')
+        .values_list('pk', flat=True)[:CLAIM_BATCH]
+    )
+    for pk in candidates:
+        claimed = Task.objects.filter(pk=pk, status=Task.QUEUED).update(
+            status=Task.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def execute(job):
+    """Jalankan task yang sudah diklaim dan simpan hasilnya. Return True kalau sukses."""
+    spec = REGISTRY.get(job.name)
+    try:
+        if spec is None:
+            raise LookupError(f"Unknown task '{job.name}'")
+        spec.fn(*job.args, **job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if job.attempts < job.max_attempts:
+            delay = retry_delay(job.attempts)
+            Task.objects.filter(pk=job.pk).update(
+                status=Task.QUEUED, run_at=now + timedelta(seconds=delay), locked_by='', locked_at=None,
+                last_error=error,
+            )
+            logger.warning('Task %s failed (attempt %d/%d), retry in %ss', job, job.attempts, job.max_attempts, delay)
+        else:
+            Task.objects.filter(pk=job.pk).update(
+                status=Task.FAILED, finished_at=now, locked_by='', locked_at=None, last_error=error,
+            )
+            logger.error('Task %s failed permanently after %d attempt(s)', job, job.attempts)
+        return False
+
+    Task.objects.filter(pk=job.pk).update(status=Task.DONE, finished_at=timezone.now(), last_error='')
+    logger.debug('Task %s done', job)
+    return True
+
+
+def requeue_stale():
+    """Task 'running' yang lease-nya habis (worker mati) -> kembali ke antrian, atau 'failed' kalau jatah habis."""
+    expired = Task.objects.filter(
+        status=Task.RUNNING, locked_at__lt=timezone.now() - timedelta(seconds=settings.TASKS_LEASE_SECONDS),
+    )
+    failed = expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished_at=timezone.now(), locked_by='', locked_at=None,
+        last_error='Worker lease expired',
+    )
+    requeued = expired.update(status=Task.QUEUED, locked_by='', locked_at=None)
+    return requeued + failed
+
+
+def prune(days):
+    """Hapus task 'done' yang selesai lebih dari `days` hari lalu. Return jumlah baris."""
+    deleted, _ = Task.objects.filter(
+        status=Task.DONE, finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
+
+
+def run_pending(worker='inline', limit=None):
+    """Proses task yang siap jalan sampai antrian kosong (atau `limit`). Return (sukses, gagal)."""
+    done = failed = 0
+    while limit is None or done + failed < limit:
+        job = claim(worker)
+        if job is None:
+            break
+        if execute(job):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
@@ -0,0 +1,67 @@
+"""
+Harness test regresi N+1: budget jumlah query per view.
+
+    class PostListQueryBudgetTest(QueryBudgetMixin, TestCase):
+        def seed(self, n):
+            ...  # tambah n baris data untuk view ini
+
+        def test_post_list(self):
+            self.assertQueryBudget(reverse('forum:post_list'), budget=8)
+
+assertQueryBudget() mengisi data sampai 100 baris, hitung query view, isi
+lagi sampai 1.000 baris, hitung lagi. Test gagal kalau jumlah query lebih dari
+budget *atau* bertambah seiring jumlah baris (query per baris di view /
+template). Cache Django dikosongkan sebelum setiap pengukuran supaya yang
+diukur selalu jalur cold.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+QUERY_BUDGET_SCALES = (100, 1000)
+
+
+def bulk_users(n, prefix='user'):
+    """n User tanpa password (bulk_create, tanpa hashing). Return list User dengan pk."""
+    start = User.objects.filter(username__startswith=f'{prefix}-').count()
+    return User.objects.bulk_create(
+        User(username=f'{prefix}-{start + i}', password='!', first_name=prefix.title(), last_name=str(start + i))
+        for i in range(n)
+    )
+
+
+class QueryBudgetMixin:
+    scales = QUERY_BUDGET_SCALES
+
+    def seed(self, n):
+        """Tambah n baris data yang dirender view yang diuji."""
+        raise NotImplementedError
+
+    def count_queries(self, url, data=None, **extra):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, data, **extra)
+        self.assertEqual(response.status_code, 200, f'GET {url} -> {response.status_code}')
+        return [q['sql'] for q in ctx.captured_queries]
+
+    def assertQueryBudget(self, url, budget, data=None, **extra):
+        seeded = 0
+        counts = {}
+        for scale in self.scales:
+            self.seed(scale - seeded)
+            seeded = scale
+            queries = self.count_queries(url, data, **extra)
+            counts[scale] = len(queries)
+            if len(queries) > budget:
+                self.fail(
+                    f'GET {url} with {scale} rows: {len(queries)} queries, budget {budget}:\n'
+                    + '\n'.join(f'  {i}. {sql}' for i, sql in enumerate(queries, 1))
+                )
+        smallest, largest = counts[self.scales[0]], counts[self.scales[-1]]
+        if largest > smallest:
+            self.fail(
+                f'GET {url}: query count grows with the data '
+                f'({", ".join(f"{n} rows: {c}" for n, c in counts.items())}); per-row queries?'
+            )
+        return counts
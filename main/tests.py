@@ -1,3 +1,321 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.models import Booking
+from forum.models import Comment, ForumPost
+from main import perf, tasks
+from main.cache import stats
+from main.middleware import PerfMiddleware
+from main.models import Task
+from main.testing import QueryBudgetMixin
+from reviews.models import Review
+from tournaments.models import Tournament
+from users.models import Coach, Member
+
+
+class PublicPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='coachy', password='pass123', first_name='Coachy')
+        self.coach = Coach.objects.create(user=user, sport='tennis', hourly_fee=Decimal('100000'), city='Depok')
+
+    def test_anonymous_page_is_cached_and_counted(self):
+        url = reverse('users:coach_list')
+        first = self.client.get(url)
+        second = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(stats()['coaches']['hits'], 1)
+        self.assertEqual(stats()['coaches']['misses'], 1)
+
+    def test_model_signals_invalidate_namespace(self):
+        url = reverse('users:coach_list')
+        self.client.get(url)
+        self.coach.city = 'Surabaya'
+        self.coach.save()
+        res = self.client.get(url)
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertContains(res, 'Surabaya')
+
+        # List tournament di-render dari JSON (AJAX)
+        ajax = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+        tournaments_url = reverse('tournaments:tournament_view')
+        self.client.get(tournaments_url, **ajax)
+        Tournament.objects.create(
+            pembuatTournaments=self.coach, tipeTournaments='tennis', namaTournaments='Open Depok',
+            tanggalTournaments=date.today(), lokasiTournaments='GOR', deskripsiTournaments='-',
+            posterTournaments='https://example.com/p.png',
+        )
+        self.assertContains(self.client.get(tournaments_url, **ajax), 'Open Depok')
+
+    def test_authenticated_and_ajax_variants_bypass_or_split(self):
+        url = reverse('tournaments:tournament_view')
+        html = self.client.get(url)
+        ajax = self.client.get(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(ajax['X-Cache'], 'MISS')
+        self.assertEqual(ajax['Content-Type'], 'application/json')
+        self.assertNotEqual(html.content, ajax.content)
+
+        self.client.login(username='coachy', password='pass123')
+        self.assertFalse(self.client.get(url).has_header('X-Cache'))
+
+    def test_cache_stats_requires_staff(self):
+        url = reverse('main:cache_stats')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        User.objects.create_user(username='admin', password='pass123', is_staff=True)
+        self.client.login(username='admin', password='pass123')
+        data = self.client.get(url).json()
+        self.assertIn('coaches', data['namespaces'])
+
+
+@override_settings(PERF_INSTRUMENTATION=True, PERF_SERVER_TIMING=True)
+class PerfInstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(username='staff', password='pass123', is_staff=True)
+        for i in range(3):
+            user = User.objects.create_user(username=f'coach{i}', password='pass123')
+            Coach.objects.create(user=user, sport='tennis', hourly_fee=Decimal('100000'), city='Depok')
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            perf.fingerprint('SELECT * FROM t WHERE id = 12 AND name = \'x\' AND k IN (%s, %s, %s)'),
+            perf.fingerprint('SELECT * FROM t WHERE id = 7 AND name = \'yy\' AND k IN (%s, %s)'),
+        )
+
+    def test_server_timing_and_per_view_report(self):
+        url = reverse('users:coach_list')
+        self.assertFalse(self.client.get(url).has_header('Server-Timing'))  # anonim
+
+        self.client.force_login(self.staff)
+        response = self.client.get(url)
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('total;dur=', timing)
+        self.assertRegex(timing, r'render;dur=(?!0\b)[\d.]+')
+
+        self.client.get(url)
+        rows = {r['view']: r for r in perf.report()}
+        row = rows['users:coach_list']
+        self.assertEqual(row['requests'], 3)
+        self.assertGreater(row['queries_avg'], 0)
+        self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+
+    @override_settings(PERF_N_PLUS_ONE_WARNING=3)
+    def test_repeated_queries_are_flagged(self):
+        def n_plus_one_view(request):
+            for user in User.objects.all():
+                User.objects.filter(pk=user.pk).exists()
+            return HttpResponse('ok')
+
+        with self.assertLogs('main.perf', level='WARNING') as logs:
+            request = RequestFactory().get('/x/')
+            request.user = self.staff
+            response = PerfMiddleware(n_plus_one_view)(request)
+        self.assertIn('5 queries, 3 dup', response['Server-Timing'])
+        self.assertIn('repeated 4 times', logs.output[0])
+
+        out = StringIO()
+        call_command('perf_report', '--sort', 'duplicates', stdout=out)
+        self.assertIn('unresolved', out.getvalue())
+        self.assertIn('4x', out.getvalue())
+
+        call_command('perf_report', '--reset', stdout=StringIO())
+        self.assertEqual(perf.report(), [])
+
+    def test_perf_report_view_requires_staff(self):
+        url = reverse('main:perf_report')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        User.objects.create_user(username='admin', password='pass123', is_staff=True)
+        self.client.login(username='admin', password='pass123')
+        self.assertIn('views', self.client.get(url).json())
+
+
+class QueryBudgetHarnessTests(QueryBudgetMixin, TestCase):
+    """count_queries palsu: 3 query tetap + `per_row` query per 100 baris."""
+    rows = 0
+    per_row = 0
+
+    def seed(self, n):
+        self.rows += n
+
+    def count_queries(self, url, data=None, **extra):
+        return ['SELECT 1'] * (3 + self.per_row * (self.rows // 100))
+
+    def test_constant_query_count_passes(self):
+        self.assertEqual(self.assertQueryBudget('/x/', budget=3), {100: 3, 1000: 3})
+
+    def test_growing_query_count_fails(self):
+        self.per_row = 1
+        with self.assertRaisesMessage(AssertionError, 'query count grows with the data'):
+            self.assertQueryBudget('/x/', budget=20)
+
+    def test_over_budget_fails(self):
+        with self.assertRaisesMessage(AssertionError, '3 queries, budget 2'):
+            self.assertQueryBudget('/x/', budget=2)
+
+
+class SeedBenchmarkTests(TestCase):
+    def seed(self, *args):
+        call_command('seed_benchmark', '--scale', '0.02', *args, stdout=StringIO())
+
+    def test_seed_volumes_and_aggregates(self):
+        self.seed()
+        self.assertEqual(Member.objects.filter(user__username__startswith='bench-').count(), 20)
+        self.assertEqual(Coach.objects.filter(user__username__startswith='bench-').count(), 2)
+        self.assertEqual(Booking.objects.count(), 60)
+        self.assertEqual(ForumPost.objects.count(), 20)
+        self.assertTrue(self.client.login(username='bench-m0', password='benchmark'))
+
+        # Agregat yang biasanya diisi signals / save() sudah di-rebuild
+        for coach in Coach.objects.all():
+            self.assertEqual(coach.rating_count, Review.objects.filter(coach=coach).count())
+        for post in ForumPost.objects.all():
+            self.assertEqual(post.score, post.votes.aggregate(s=Sum('value'))['s'] or 0)
+        self.assertTrue(Comment.objects.filter(depth__gt=0).exists())
+        self.assertFalse(Comment.objects.filter(path='').exists())
+
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed('--clear')
+        self.assertEqual(Member.objects.filter(user__username__startswith='bench-').count(), 20)
+
+    def test_benchmark_views_save_and_compare(self):
+        self.seed()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            out = StringIO()
+            call_command('benchmark_views', '--requests', '2', '--warmup', '0', '--save', path, stdout=out)
+            with open(path) as fh:
+                results = json.load(fh)
+            self.assertIn('forum list', results)
+            self.assertIn('tournament list json', out.getvalue())
+            self.assertEqual({name: r['errors'] for name, r in results.items() if r['errors']}, {})
+
+            call_command(
+                'benchmark_views', '--requests', '2', '--warmup', '0', '--only', 'forum',
+                '--compare', path, '--threshold', '100000', stdout=out,
+            )
+            self.assertIn('Tidak ada regresi', out.getvalue())
+
+            # Baseline dengan query lebih sedikit -> dianggap regresi
+            results['forum list']['queries'] -= 1
+            with open(path, 'w') as fh:
+                json.dump(results, fh)
+            with self.assertRaisesMessage(CommandError, 'forum list'):
+                call_command(
+                    'benchmark_views', '--requests', '2', '--warmup', '0', '--only', 'forum list',
+                    '--compare', path, '--threshold', '100000', stdout=StringIO(),
+                )
+
+
+CALLS = []
+
+
+@tasks.task('main.tests.record')
+def record_task(value, fail_times=0):
+    CALLS.append(value)
+    if CALLS.count(value) <= fail_times:
+        raise RuntimeError(f'gagal {value}')
+
+
+@override_settings(TASKS_RETRY_BACKOFF=10, TASKS_RETRY_MAX_DELAY=25, TASKS_LEASE_SECONDS=60)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_enqueue_and_run_by_priority(self):
+        tasks.enqueue('main.tests.record', ['low'])
+        tasks.enqueue('main.tests.record', ['high'], priority=5)
+        tasks.enqueue('main.tests.record', ['later'], run_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(tasks.run_pending(), (2, 0))
+        self.assertEqual(CALLS, ['high', 'low'])
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 2)
+        self.assertEqual(Task.objects.get(args=['later']).status, Task.QUEUED)
+
+    def test_idempotency_key(self):
+        first, created = tasks.enqueue('main.tests.record', ['a'], key='once')
+        self.assertTrue(created)
+        tasks.run_pending()
+        again, created = tasks.enqueue('main.tests.record', ['b'], key='once')
+        self.assertFalse(created)
+        self.assertEqual(again.pk, first.pk)
+        self.assertEqual(tasks.run_pending(), (0, 0))
+        self.assertEqual(CALLS, ['a'])
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(ValueError):
+            tasks.enqueue('main.tests.missing')
+
+    def test_retry_with_backoff_then_fail(self):
+        job, _ = tasks.enqueue('main.tests.record', ['x'], kwargs={'fail_times': 5}, max_attempts=3)
+        with self.assertLogs('main.tasks', 'WARNING'):
+            self.assertEqual(tasks.run_pending(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Task.QUEUED, 1))
+        self.assertIn('RuntimeError: gagal x', job.last_error)
+        self.assertAlmostEqual((job.run_at - timezone.now()).total_seconds(), 10, delta=2)
+
+        delays = []
+        for _ in range(2):
+            Task.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            with self.assertLogs('main.tasks', 'WARNING'):
+                tasks.run_pending()
+            job.refresh_from_db()
+            delays.append(round((job.run_at - timezone.now()).total_seconds()))
+        self.assertEqual(job.status, Task.FAILED)
+        self.assertEqual(job.attempts, 3)
+        self.assertEqual(delays[0], 20)
+        self.assertEqual(tasks.retry_delay(4), 25)
+
+    def test_retry_succeeds(self):
+        tasks.enqueue('main.tests.record', ['y'], kwargs={'fail_times': 1})
+        with self.assertLogs('main.tasks', 'WARNING'):
+            tasks.run_pending()
+        Task.objects.update(run_at=timezone.now())
+        self.assertEqual(tasks.run_pending(), (1, 0))
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_claim_is_exclusive_and_stale_tasks_are_requeued(self):
+        tasks.enqueue('main.tests.record', ['z'])
+        job = tasks.claim('w1')
+        self.assertEqual((job.status, job.locked_by, job.attempts), (Task.RUNNING, 'w1', 1))
+        self.assertIsNone(tasks.claim('w2'))
+
+        self.assertEqual(tasks.requeue_stale(), 0)
+        Task.objects.update(locked_at=timezone.now() - timedelta(minutes=5))
+        self.assertEqual(tasks.requeue_stale(), 1)
+        self.assertEqual(tasks.claim('w2').locked_by, 'w2')
+
+    def test_run_worker_once(self):
+        tasks.enqueue('main.tests.record', ['cmd'])
+        Task.objects.create(name='main.tests.record', status=Task.DONE, finished_at=timezone.now() - timedelta(days=30))
+        out = StringIO()
+        call_command('run_worker', '--once', '--name', 'test', stdout=out)
+        self.assertIn('1 sukses, 0 gagal', out.getvalue())
+        self.assertIn('1 task lama dihapus', out.getvalue())
+        self.assertEqual(CALLS, ['cmd'])
+
+    def test_booking_sweep_can_be_enqueued(self):
+        call_command('complete_bookings', '--enqueue', stdout=StringIO())
+        out = StringIO()
+        call_command('complete_bookings', '--enqueue', stdout=out)
+        self.assertIn('already enqueued', out.getvalue())
+        self.assertEqual(Task.objects.filter(name='booking.complete_expired').count(), 1)
+        with self.assertLogs('booking.sweeper', 'INFO'):
+            self.assertEqual(tasks.run_pending(), (1, 0))
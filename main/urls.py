@@ -1,8 +1,10 @@
 from django.urls import path
-from main.views import show_main
+from main.views import cache_stats, perf_report, show_main
 
 app_name = 'main'
 
 urlpatterns = [
     path('', show_main, name='show_main'),
+    path('cache-stats/', cache_stats, name='cache_stats'),
+    path('perf-report/', perf_report, name='perf_report'),
 ]
\ No newline at end of file
@@ -1,5 +1,25 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
 
+from . import perf
+from .cache import cache_public_page, stats
+
+
 # Create your views here.
+@cache_public_page('main')
 def show_main(request):
-    return render(request, 'main.html')
\ No newline at end of file
+    return render(request, 'main.html')
+
+
+@staff_member_required
+def cache_stats(request):
+    """Hit/miss counter cache halaman publik per namespace."""
+    return JsonResponse({'namespaces': stats()})
+
+
+@staff_member_required
+def perf_report(request):
+    """Latency p50/p95/p99, jumlah query & query duplikat per URL name (PerfMiddleware)."""
+    rows = sorted(perf.report(), key=lambda r: r['p95_ms'], reverse=True)
+    return JsonResponse({'views': rows})
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import rebuild_coach_ratings
+from users.models import Coach
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang rating_avg, rating_count & histogram bintang Coach dari tabel Review."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--coach", action="append", dest="coach_ids",
+            help="Hanya rebuild coach dengan id (UUID) ini (boleh diulang).",
+        )
+
+    def handle(self, *args, **options):
+        coaches = Coach.objects.all()
+        if options["coach_ids"]:
+            coaches = coaches.filter(id__in=options["coach_ids"])
+
+        with transaction.atomic():
+            updated = rebuild_coach_ratings(coaches)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating aggregates for {updated} coach(es)."))
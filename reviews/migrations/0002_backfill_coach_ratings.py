@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:40
+
+from django.db import migrations
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_coach_ratings(apps, schema_editor):
+    Coach = apps.get_model('users', 'Coach')
+    Review = apps.get_model('reviews', 'Review')
+
+    per_coach = Review.objects.filter(coach=OuterRef('pk')).order_by().values('coach')
+
+    def count(star=None):
+        rows = per_coach.annotate(
+            n=Count('id', filter=Q(rating=star)) if star else Count('id')
+        ).values('n')
+        return Coalesce(Subquery(rows), Value(0), output_field=IntegerField())
+
+    Coach.objects.update(
+        rating_count=count(),
+        **{f'rating_{star}_count': count(star) for star in range(1, 6)},
+    )
+    weighted = (
+        F('rating_1_count')
+        + F('rating_2_count') * 2
+        + F('rating_3_count') * 3
+        + F('rating_4_count') * 4
+        + F('rating_5_count') * 5
+    )
+    Coach.objects.update(
+        rating_avg=Case(
+            When(rating_count=0, then=Value(0.0)),
+            default=Cast(weighted, FloatField()) / F('rating_count'),
+            output_field=FloatField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+        ('users', '0002_coach_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_coach_ratings, migrations.RunPython.noop),
+    ]
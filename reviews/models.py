@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.db.models import Case, Count, F, FloatField, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce
 from django.utils import timezone
 from users.models import Coach, Member
 
@@ -12,6 +14,8 @@ class Review(models.Model):
     rating = models.PositiveSmallIntegerField(validators=[MinValueValidator(1), MaxValueValidator(5)])
     comment = models.TextField(max_length=1000, blank=True)
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    # Dipakai sebagai token versi untuk conditional GET (ETag) endpoint JSON
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
@@ -21,3 +25,71 @@ class Review(models.Model):
 
     def __str__(self):
         return f"r{self.id} {self.reviewer_id}->{self.coach_id} ★{self.rating}"
+
+
+# ---------- Agregat rating di Coach ----------
+def apply_rating_change(coach_id, added=None, removed=None):
+    """
+    Update counter rating Coach secara incremental (F() expressions).
+    `added` / `removed` = bintang review yang dibuat / dihapus; untuk edit rating
+    isi keduanya. Panggil di transaksi yang sama, setelah perubahan Review.
+    """
+    if added == removed:
+        return
+    deltas = {}
+    if added:
+        deltas[f"rating_{added}_count"] = 1
+    if removed:
+        deltas[f"rating_{removed}_count"] = -1
+    count_step = sum(deltas.values())
+    if count_step:
+        deltas["rating_count"] = count_step
+
+    coaches = Coach.objects.filter(pk=coach_id)
+    # Counter yang dikurangi harus masih >= 1. Kalau tidak, counter sudah tidak
+    # sinkron (review dibuat / dihapus di luar view lewat admin / ORM): jangan
+    # di-clamp, hitung ulang coach ini dari tabel Review supaya tetap exact.
+    in_sync = coaches.filter(**{f"{field}__gte": 1 for field, step in deltas.items() if step < 0})
+    if in_sync.update(**{field: F(field) + step for field, step in deltas.items()}):
+        coaches.update(rating_avg=_rating_avg_expression())
+    else:
+        rebuild_coach_ratings(coaches)
+
+
+def rebuild_coach_ratings(coaches=None):
+    """Hitung ulang semua agregat rating dari tabel Review. Return jumlah coach."""
+    per_coach = (
+        Review.objects.filter(coach=OuterRef("pk"))
+        .order_by()
+        .values("coach")
+    )
+
+    def count(star=None):
+        rows = per_coach.annotate(
+            n=Count("id", filter=Q(rating=star)) if star else Count("id")
+        ).values("n")
+        return Coalesce(Subquery(rows), Value(0), output_field=IntegerField())
+
+    coaches = Coach.objects.all() if coaches is None else coaches
+    updated = coaches.update(
+        rating_count=count(),
+        **{f"rating_{star}_count": count(star) for star in range(1, 6)},
+    )
+    coaches.update(rating_avg=_rating_avg_expression())
+    return updated
+
+
+def _rating_avg_expression():
+    """Rata-rata rating dari counter per bintang yang sudah tersimpan di Coach."""
+    weighted = (
+        F("rating_1_count")
+        + F("rating_2_count") * 2
+        + F("rating_3_count") * 3
+        + F("rating_4_count") * 4
+        + F("rating_5_count") * 5
+    )
+    return Case(
+        When(rating_count=0, then=Value(0.0)),
+        default=Cast(weighted, FloatField()) / F("rating_count"),
+        output_field=FloatField(),
+    )
@@ -1,13 +1,18 @@
 # reviews/tests.py
 import json
 import uuid
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
 from django.test import TestCase, Client
+from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
 from users.models import Coach, Member
-from reviews.models import Review
+from main.testing import QueryBudgetMixin, bulk_users
+from reviews.models import Review, apply_rating_change
 
 User = get_user_model()
 
@@ -269,4 +274,123 @@ class ReviewsViewsTests(TestCase):
         self.assertIn("items", res.json())  
 
 
-    
\ No newline at end of file
+    
+    # AGREGAT RATING DI COACH
+    def test_rating_aggregates_follow_create_update_delete(self):
+        # review di setUp dibuat lewat ORM -> sinkronkan dulu counter-nya
+        call_command("rebuild_coach_ratings", stdout=StringIO())
+        self.coach.refresh_from_db()
+        self.assertEqual((self.coach.rating_count, self.coach.rating_avg), (1, 4.0))
+
+        self.client.login(username="other", password="pass12345")
+        url = reverse("reviews:create_review_json", args=[self.coach.id])
+        res = self.client.post(url, data=json.dumps({"rating": 2}), content_type="application/json")
+        self.assertEqual(res.status_code, 201)
+        self.assertEqual(res.json()["coach_rating"]["average"], 3.0)
+        new_id = res.json()["id"]
+
+        url = reverse("reviews:update_review_json", args=[new_id])
+        res = self.client.post(url, data=json.dumps({"rating": 5}), content_type="application/json")
+        self.assertEqual(res.json()["coach_rating"]["histogram"], {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1})
+        self.assertEqual(res.json()["coach_rating"]["average"], 4.5)
+
+        url = reverse("reviews:delete_review_json", args=[new_id])
+        res = self.client.post(url)
+        self.assertEqual(res.json()["coach_rating"]["count"], 1)
+
+        self.coach.refresh_from_db()
+        self.assertEqual(self.coach.rating_avg, 4.0)
+        self.assertEqual(self.coach.rating_histogram, {1: 0, 2: 0, 3: 0, 4: 1, 5: 0})
+
+        res = self.client.get(reverse("reviews:coach_reviews_json", args=[self.coach.id]))
+        self.assertEqual(res.json()["coach"]["rating"]["count"], 1)
+
+    def _assert_coach_histogram_exact(self):
+        self.coach.refresh_from_db()
+        stars = list(Review.objects.filter(coach=self.coach).values_list("rating", flat=True))
+        self.assertEqual(self.coach.rating_count, len(stars))
+        self.assertEqual(self.coach.rating_histogram, {s: stars.count(s) for s in range(1, 6)})
+        self.assertEqual(self.coach.rating_avg, sum(stars) / len(stars) if stars else 0.0)
+
+    def test_update_rereads_rating_under_lock(self):
+        call_command("rebuild_coach_ratings", stdout=StringIO())
+        real_get_object_or_404 = get_object_or_404
+        raced = []
+
+        def racing_get_object_or_404(*args, **kwargs):
+            obj = real_get_object_or_404(*args, **kwargs)
+            if not raced:
+                # Edit lain (4 -> 2) commit tepat setelah view membaca review tanpa lock
+                raced.append(True)
+                Review.objects.filter(pk=self.review.pk).update(rating=2)
+                apply_rating_change(self.coach.pk, added=2, removed=4)
+            return obj
+
+        self.client.login(username="member1", password="pass12345")
+        url = reverse("reviews:update_review_json", args=[self.review.id])
+        with mock.patch("reviews.views.get_object_or_404", side_effect=racing_get_object_or_404):
+            res = self.client.post(url, data=json.dumps({"rating": 5}), content_type="application/json")
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["coach_rating"]["histogram"], {"1": 0, "2": 0, "3": 0, "4": 0, "5": 1})
+        self._assert_coach_histogram_exact()
+
+    def test_out_of_sync_counters_are_rebuilt_not_clamped(self):
+        # Review di setUp dibuat lewat ORM -> counter coach masih 0 semua
+        Review.objects.create(coach=self.coach, reviewer=self.other_member, rating=2)
+        self.client.login(username="member1", password="pass12345")
+        url = reverse("reviews:update_review_json", args=[self.review.id])
+        res = self.client.post(url, data=json.dumps({"rating": 5}), content_type="application/json")
+        self.assertEqual(res.json()["coach_rating"]["count"], 2)
+        self._assert_coach_histogram_exact()
+
+        res = self.client.post(reverse("reviews:delete_review_json", args=[self.review.id]))
+        self.assertEqual(res.json()["coach_rating"]["count"], 1)
+        self._assert_coach_histogram_exact()
+
+    def test_rebuild_coach_ratings_resets_coach_without_reviews(self):
+        Coach.objects.filter(pk=self.other_coach.pk).update(rating_count=3, rating_avg=2.0, rating_2_count=3)
+        call_command("rebuild_coach_ratings", "--coach", str(self.other_coach.pk), stdout=StringIO())
+        self.other_coach.refresh_from_db()
+        self.assertEqual((self.other_coach.rating_count, self.other_coach.rating_avg), (0, 0.0))
+        self.assertEqual(self.other_coach.rating_2_count, 0)
+
+    def test_list_and_detail_support_conditional_get(self):
+        list_url = reverse("reviews:coach_reviews_json", args=[self.coach.id])
+        detail_url = reverse("reviews:review_detail_json", args=[self.review.id])
+        for url in (list_url, detail_url):
+            res = self.client.get(url)
+            etag = res["ETag"]
+            self.assertIn("no-cache", res["Cache-Control"])
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        list_etag = self.client.get(list_url)["ETag"]
+        detail_etag = self.client.get(detail_url)["ETag"]
+
+        # Edit review -> updated_at berubah -> ETag baru
+        self.client.login(username="member1", password="pass12345")
+        update_url = reverse("reviews:update_review_json", args=[self.review.id])
+        self.client.post(update_url, data=json.dumps({"comment": "edited"}), content_type="application/json")
+        res = self.client.get(list_url, HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["items"][0]["comment"], "edited")
+        self.assertEqual(self.client.get(detail_url, HTTP_IF_NONE_MATCH=detail_etag).status_code, 200)
+
+
+class ReviewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        coach_user = User.objects.create_user(username="coach", password="pass12345")
+        self.coach = Coach.objects.create(user=coach_user, sport="tennis", city="Depok")
+        User.objects.create_user(username="reader", password="pass12345")
+        self.client.login(username="reader", password="pass12345")
+
+    def seed(self, n):
+        members = Member.objects.bulk_create(
+            Member(user=user, city="Depok", phone="1") for user in bulk_users(n, prefix="reviewer")
+        )
+        Review.objects.bulk_create(
+            Review(coach=self.coach, reviewer=member, rating=i % 5 + 1, comment="ok")
+            for i, member in enumerate(members)
+        )
+
+    def test_coach_reviews_json(self):
+        self.assertQueryBudget(reverse("reviews:coach_reviews_json", args=[self.coach.id]), budget=8)
@@ -3,23 +3,44 @@ import json
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from django.core.paginator import Paginator, EmptyPage
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
 from django.http import JsonResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404
 from django.views.decorators.http import require_GET, require_POST, require_http_methods
 from django.shortcuts import render
 
 
-from .models import Review
+from .models import Review, apply_rating_change
+from main.http import conditional_json
+from main.request_cache import cached_get, cached_get_or_404
 from users.models import Coach, Member
 
 User = get_user_model()
 
 
+def _rating_summary(coach):
+    """Agregat rating yang tersimpan di Coach (tanpa scan tabel Review)."""
+    return {
+        "average": round(coach.rating_avg, 2),
+        "count": coach.rating_count,
+        "histogram": {str(star): n for star, n in coach.rating_histogram.items()},
+    }
+
+
+def _coach_reviews_version(request, coach_id):
+    return Review.objects.filter(coach_id=coach_id).aggregate(n=Count("id"), last=Max("updated_at"))
+
+
+def _review_version(request, review_id):
+    return Review.objects.filter(pk=review_id).values_list("updated_at", flat=True).first()
+
+
 # READ
 @require_GET
+@conditional_json(_coach_reviews_version)
 def coach_reviews_json(request, coach_id):
-    coach = get_object_or_404(Coach, pk=coach_id)
+    coach = cached_get_or_404(Coach, pk=coach_id)
 
     try:
         rating_filter = int(request.GET.get("rating", "") or 0)
@@ -40,7 +61,7 @@ def coach_reviews_json(request, coach_id):
 
     # flag owner
     try:
-        me_member_id = Member.objects.get(user=request.user).id
+        me_member_id = cached_get(Member, user=request.user).id
     except Exception:
         me_member_id = None
 
@@ -90,7 +111,7 @@ def coach_reviews_json(request, coach_id):
 
     coach_username = getattr(getattr(coach, "user", None), "username", str(coach.id))
     data = {
-        "coach": {"id": str(coach.id), "username": coach_username},
+        "coach": {"id": str(coach.id), "username": coach_username, "rating": _rating_summary(coach)},
         "filter": {"rating": rating_filter if rating_filter in (1,2,3,4,5) else None},
         "pagination": {
             "page": page_number,
@@ -105,6 +126,7 @@ def coach_reviews_json(request, coach_id):
     return JsonResponse(data, status=200)
 
 @require_GET
+@conditional_json(_review_version)
 def review_detail_json(request, review_id: int) -> JsonResponse:
     r = get_object_or_404(
         Review.objects.select_related("reviewer__user", "coach__user"),
@@ -113,7 +135,7 @@ def review_detail_json(request, review_id: int) -> JsonResponse:
 
     # flag owner
     try:
-        me_member_id = Member.objects.get(user=request.user).id
+        me_member_id = cached_get(Member, user=request.user).id
     except Exception:
         me_member_id = None
 
@@ -160,14 +182,17 @@ def create_review_json(request, coach_id):
         return JsonResponse({"error": "rating_must_be_int_1_5"}, status=400)
 
     try:
-        obj = Review.objects.create(
-            coach=coach,
-            reviewer=member,
-            rating=rating,
-            comment=comment[:1000],
-        )
+        with transaction.atomic():
+            obj = Review.objects.create(
+                coach=coach,
+                reviewer=member,
+                rating=rating,
+                comment=comment[:1000],
+            )
+            apply_rating_change(coach.pk, added=obj.rating)
     except IntegrityError:
         return JsonResponse({"error": "already_reviewed"}, status=400)
+    coach.refresh_from_db()
 
     return JsonResponse({
         "message": "created",
@@ -177,6 +202,7 @@ def create_review_json(request, coach_id):
         "rating": obj.rating,
         "comment": obj.comment,
         "created_at": obj.created_at.isoformat(),
+        "coach_rating": _rating_summary(coach),
     }, status=201)
 
 
@@ -206,28 +232,35 @@ def update_review_json(request, review_id: int) -> JsonResponse:
     rating = payload.get("rating", None)
     comment = payload.get("comment", None)
 
-    changed_fields = []
+    changes = {}
 
     if rating is not None:
         if isinstance(rating, str) and rating.isdigit():
             rating = int(rating)
         if not isinstance(rating, int) or not (1 <= rating <= 5):
             return JsonResponse({"error": "rating_must_be_int_1_5"}, status=400)
-        review.rating = rating
-        changed_fields.append("rating")
+        changes["rating"] = rating
 
     if comment is not None:
-        review.comment = (comment or "").strip()[:1000]
-        changed_fields.append("comment")
-
-    if changed_fields:
-        review.save(update_fields=changed_fields)
+        changes["comment"] = (comment or "").strip()[:1000]
+
+    if changes:
+        with transaction.atomic():
+            # Rating lama dibaca ulang di bawah row lock: dua edit bersamaan tidak
+            # boleh sama-sama mengurangi bucket bintang lama yang sama.
+            review = get_object_or_404(Review.objects.select_for_update(), pk=review.pk)
+            old_rating = review.rating
+            for field, value in changes.items():
+                setattr(review, field, value)
+            review.save(update_fields=list(changes) + ["updated_at"])
+            apply_rating_change(review.coach_id, added=review.rating, removed=old_rating)
 
     return JsonResponse({
         "message": "updated",
         "id": str(review.id),
         "rating": review.rating,
         "comment": review.comment,
+        "coach_rating": _rating_summary(Coach.objects.get(pk=review.coach_id)),
     }, status=200)
 
 
@@ -248,8 +281,18 @@ def delete_review_json(request, review_id: int) -> JsonResponse:
     if not (is_admin or owner_ok):
         return JsonResponse({"error": "forbidden"}, status=403)
 
-    review.delete()
-    return JsonResponse({"message": "deleted", "id": str(review_id)}, status=200)
+    with transaction.atomic():
+        # Sama seperti update: bintang yang dikurangi dibaca di bawah row lock, delete
+        # kedua yang bersamaan menunggu lock lalu 404 (tidak mengurangi counter lagi).
+        review = get_object_or_404(Review.objects.select_for_update(), pk=review.pk)
+        review.delete()
+        apply_rating_change(review.coach_id, removed=review.rating)
+
+    return JsonResponse({
+        "message": "deleted",
+        "id": str(review_id),
+        "coach_rating": _rating_summary(Coach.objects.get(pk=review.coach_id)),
+    }, status=200)
 
 @require_GET
 def review_detail_page(request, review_id: int):
@@ -9,6 +9,8 @@ class TournamentAdmin(admin.ModelAdmin):
         'tanggalTournaments',
         'lokasiTournaments',
         'pembuatTournaments',
+        'jumlahPesertaTournaments',
+        'kapasitasTournaments',
         'flagTournaments'
     )
     search_fields = (
@@ -32,6 +34,8 @@ class TournamentAdmin(admin.ModelAdmin):
         'posterTournaments',
         'pembuatTournaments',
         'pesertaTournaments',
+        'jumlahPesertaTournaments',
+        'kapasitasTournaments',
         'flagTournaments',
         'idTournaments',
     )
@@ -12,6 +12,7 @@ class TournamentForm(forms.ModelForm):
             'lokasiTournaments',
             'deskripsiTournaments',
             'posterTournaments',
+            'kapasitasTournaments',
         ]
         widgets = {
             'namaTournaments': forms.TextInput(attrs={
@@ -31,6 +32,10 @@ class TournamentForm(forms.ModelForm):
             'posterTournaments': forms.URLInput(attrs={
                 'placeholder': 'Enter poster URL'
             }),
+            'kapasitasTournaments': forms.NumberInput(attrs={
+                'min': 1,
+                'placeholder': 'Max participants (optional)'
+            }),
         }
 
     def clean_tanggalTournaments(self):
@@ -38,3 +43,9 @@ class TournamentForm(forms.ModelForm):
         if tanggal and tanggal < timezone.now().date():
             raise forms.ValidationError("Tanggal turnamen tidak boleh di masa lalu.")
         return tanggal
+
+    def clean_kapasitasTournaments(self):
+        kapasitas = self.cleaned_data.get('kapasitasTournaments')
+        if kapasitas is not None and kapasitas < 1:
+            raise forms.ValidationError("Kapasitas minimal 1 peserta (kosongkan untuk tanpa batas).")
+        return kapasitas
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tournaments.models import Tournament
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang jumlahPesertaTournaments dari tabel peserta tournament."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tournament", action="append", dest="tournament_ids",
+            help="Hanya rebuild tournament dengan id (UUID) ini (boleh diulang).",
+        )
+
+    def handle(self, *args, **options):
+        tournaments = Tournament.objects.all()
+        if options["tournament_ids"]:
+            tournaments = tournaments.filter(idTournaments__in=options["tournament_ids"])
+
+        with transaction.atomic():
+            updated = Tournament.rebuild_participant_counts(tournaments)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt participant counts for {updated} tournament(s)."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0002_tournament_updated_at'),
+        ('users', '0003_coach_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tournament',
+            index=models.Index(fields=['flagTournaments', 'tanggalTournaments', 'idTournaments'], name='tournament_list_idx'),
+        ),
+    ]
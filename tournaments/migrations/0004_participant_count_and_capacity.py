@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:45
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_participant_counts(apps, schema_editor):
+    Tournament = apps.get_model('tournaments', 'Tournament')
+    Participant = Tournament.pesertaTournaments.through
+
+    per_tournament = (
+        Participant.objects.filter(tournament_id=OuterRef('pk'))
+        .order_by()
+        .values('tournament_id')
+        .annotate(n=Count('id'))
+        .values('n')
+    )
+    Tournament.objects.update(jumlahPesertaTournaments=Coalesce(Subquery(per_tournament), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0003_tournament_list_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='jumlahPesertaTournaments',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tournament',
+            name='kapasitasTournaments',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_participant_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0004_participant_count_and_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
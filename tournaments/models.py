@@ -1,8 +1,23 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
 import uuid
 from datetime import date
+from django.utils import timezone
+from main.tasks import enqueue_on_commit
 from users.models import Coach, Member
 
+
+class RegistrationError(Exception):
+    """Pendaftaran / pembatalan ditolak (turnamen penuh atau ditutup). Pesan untuk user."""
+
+class TournamentManager(models.Manager):
+    """Tournament yang belum dihapus (lihat Tournament.soft_delete)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Tournament(models.Model):
     CATEGORY_CHOICES = [
         ('gym', 'Gym & Fitness'),
@@ -29,7 +44,24 @@ class Tournament(models.Model):
     deskripsiTournaments = models.TextField()
     posterTournaments = models.URLField(max_length=200)
     flagTournaments = models.BooleanField(default=True)
+    # Batas peserta (kosong = tanpa batas)
+    kapasitasTournaments = models.PositiveIntegerField(null=True, blank=True)
+    # Jumlah peserta yang disimpan, di-update atomik oleh add_participant / remove_participant
+    jumlahPesertaTournaments = models.PositiveIntegerField(default=0, editable=False)
     idTournaments = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Token versi untuk conditional GET (ETag) list tournament
+    updated_at = models.DateTimeField(auto_now=True)
+    # Diisi saat dihapus: baris disembunyikan, DELETE + cascade jalan di task 'tournaments.purge'
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = TournamentManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # List tournament aktif: filter flag + keyset (tanggal, id), lihat views.tournament_view
+            models.Index(fields=['flagTournaments', 'tanggalTournaments', 'idTournaments'], name='tournament_list_idx'),
+        ]
 
     def __str__(self):
         return self.namaTournaments
@@ -44,3 +76,76 @@ class Tournament(models.Model):
         else:
             self.flagTournaments = True
         super().save(*args, **kwargs)
+
+    def soft_delete(self):
+        """
+        Sembunyikan tournament sekarang (semua query lewat `objects` tidak melihatnya lagi);
+        baris + peserta dihapus worker setelah commit, bukan di request.
+        """
+        self.deleted_at = timezone.now()
+        # super().save: flag tidak dihitung ulang dari tanggal
+        super().save(update_fields=['deleted_at', 'updated_at'])
+        enqueue_on_commit('tournaments.purge', args=[str(self.pk)], key=f'tournaments.purge:{self.pk}')
+
+    @property
+    def is_full(self):
+        return self.kapasitasTournaments is not None and self.jumlahPesertaTournaments >= self.kapasitasTournaments
+
+    # ---------- Peserta ----------
+    def add_participant(self, member):
+        """
+        Daftarkan member. Return False kalau sudah terdaftar.
+        Kursi diklaim dengan satu UPDATE bersyarat (jumlah < kapasitas), jadi dua
+        pendaftar terakhir yang bersamaan tidak bisa melewati kapasitas.
+        Raise RegistrationError kalau turnamen ditutup / penuh.
+        """
+        through = Tournament.pesertaTournaments.through
+        try:
+            with transaction.atomic():
+                if through.objects.filter(tournament_id=self.pk, member_id=member.pk).exists():
+                    return False
+                claimed = (
+                    Tournament.objects.filter(pk=self.pk, flagTournaments=True)
+                    .filter(Q(kapasitasTournaments__isnull=True) | Q(jumlahPesertaTournaments__lt=F('kapasitasTournaments')))
+                    .update(jumlahPesertaTournaments=F('jumlahPesertaTournaments') + 1)
+                )
+                if not claimed:
+                    self.refresh_from_db(fields=['flagTournaments', 'jumlahPesertaTournaments', 'kapasitasTournaments'])
+                    if not self.flagTournaments:
+                        raise RegistrationError('Pendaftaran turnamen ini sudah ditutup.')
+                    raise RegistrationError('Kuota peserta turnamen ini sudah penuh.')
+                through.objects.create(tournament_id=self.pk, member_id=member.pk)
+        except IntegrityError:
+            # Member yang sama mendaftar dua kali bersamaan: klaim kursi ikut di-rollback
+            return False
+        self.refresh_from_db(fields=['jumlahPesertaTournaments'])
+        return True
+
+    def remove_participant(self, member):
+        """Batalkan pendaftaran member. Return False kalau memang tidak terdaftar."""
+        if not self.flagTournaments:
+            raise RegistrationError('Turnamen ini sudah ditutup.')
+        through = Tournament.pesertaTournaments.through
+        with transaction.atomic():
+            deleted, _ = through.objects.filter(tournament_id=self.pk, member_id=member.pk).delete()
+            if deleted:
+                Tournament.objects.filter(pk=self.pk).update(
+                    jumlahPesertaTournaments=Greatest(F('jumlahPesertaTournaments') - 1, Value(0))
+                )
+        self.refresh_from_db(fields=['jumlahPesertaTournaments'])
+        return bool(deleted)
+
+    @staticmethod
+    def rebuild_participant_counts(tournaments=None):
+        """Hitung ulang jumlahPesertaTournaments dari tabel peserta. Return jumlah tournament."""
+        through = Tournament.pesertaTournaments.through
+        per_tournament = (
+            through.objects.filter(tournament_id=OuterRef('pk'))
+            .order_by()
+            .values('tournament_id')
+            .annotate(n=Count('id'))
+            .values('n')
+        )
+        if tournaments is None:
+            tournaments = Tournament.objects.all()
+        return tournaments.update(jumlahPesertaTournaments=Coalesce(Subquery(per_tournament), Value(0)))
@@ -0,0 +1,9 @@
+from main.tasks import task
+
+from .models import Tournament
+
+
+@task('tournaments.purge', max_attempts=3, priority=-1)
+def purge_tournament(tournament_id):
+    """DELETE tournament yang sudah di-soft-delete, beserta cascade-nya (peserta)."""
+    Tournament.all_objects.filter(pk=tournament_id, deleted_at__isnull=False).delete()
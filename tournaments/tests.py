@@ -1,11 +1,17 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
-from datetime import date
+from datetime import date, timedelta
 import json
+from io import StringIO
 
+from main import tasks
 from users.models import Coach, Member
-from tournaments.models import Tournament
+from main.testing import QueryBudgetMixin, bulk_users
+from tournaments.models import RegistrationError, Tournament
 
 
 class TournamentModuleTests(TestCase):
@@ -47,7 +53,10 @@ class TournamentModuleTests(TestCase):
         response = self.client.get(reverse("tournaments:tournament_view"))
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "tournament_list.html")
-        self.assertIn("tournaments", response.context)
+        # Kartu dimuat lewat JSON; halaman HTML hanya butuh filter & kategori
+        self.assertNotIn("tournaments", response.context)
+        self.assertIn("filters", response.context)
+        self.assertIn("categories", response.context)
 
     def test_tournament_view_ajax(self):
         response = self.client.get(
@@ -119,11 +128,20 @@ class TournamentModuleTests(TestCase):
 
     def test_delete_tournament_as_coach(self):
         self.client.login(username="coach1", password="test123")
-        response = self.client.post(
-            reverse("tournaments:delete_tournament", args=[self.tournament.idTournaments])
-        )
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("tournaments:delete_tournament", args=[self.tournament.idTournaments])
+            )
         self.assertEqual(response.status_code, 302)
-        self.assertFalse(Tournament.objects.filter(idTournaments=self.tournament.idTournaments).exists())
+        # Langsung tersembunyi; baris + peserta baru dihapus worker
+        pk = self.tournament.idTournaments
+        self.assertFalse(Tournament.objects.filter(idTournaments=pk).exists())
+        self.assertTrue(Tournament.all_objects.filter(idTournaments=pk).exists())
+        self.assertEqual(self.client.get(reverse("tournaments:tournament_show", args=[pk])).status_code, 404)
+
+        self.assertEqual(tasks.run_pending(), (1, 0))
+        self.assertFalse(Tournament.all_objects.filter(idTournaments=pk).exists())
+        self.assertFalse(Tournament.pesertaTournaments.through.objects.filter(tournament_id=pk).exists())
 
     def test_delete_tournament_ajax(self):
         self.client.login(username="coach1", password="test123")
@@ -215,3 +233,233 @@ class TournamentModuleTests(TestCase):
             reverse("tournaments:edit_tournament_ajax", args=[self.tournament.idTournaments])
         )
         self.assertEqual(response.status_code, 405)
+
+    def test_tournament_json_endpoints_support_conditional_get(self):
+        ajax = {"HTTP_X_REQUESTED_WITH": "XMLHttpRequest"}
+        list_url = reverse("tournaments:tournament_view")
+        etag = self.client.get(list_url, **ajax)["ETag"]
+        self.assertEqual(self.client.get(list_url, HTTP_IF_NONE_MATCH=etag, **ajax).status_code, 304)
+        # Halaman HTML tidak pakai ETag
+        self.assertFalse(self.client.get(list_url).has_header("ETag"))
+
+        self.client.login(username="member1", password="test123")
+        my_url = reverse("tournaments:my_tournaments_ajax")
+        res = self.client.get(my_url, **ajax)
+        self.assertEqual(res.json()["tournaments"], [])
+        my_etag = res["ETag"]
+        self.assertEqual(self.client.get(my_url, HTTP_IF_NONE_MATCH=my_etag, **ajax).status_code, 304)
+
+        self.tournament.pesertaTournaments.add(self.member)
+        res = self.client.get(my_url, HTTP_IF_NONE_MATCH=my_etag, **ajax)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()["tournaments"]), 1)
+
+
+class TournamentParticipantTests(TestCase):
+    def setUp(self):
+        coach_user = User.objects.create_user(username="organizer", password="test123")
+        self.coach = Coach.objects.create(user=coach_user, sport="tennis", city="Depok")
+        self.tournament = Tournament.objects.create(
+            pembuatTournaments=self.coach, tipeTournaments="tennis", namaTournaments="Open",
+            tanggalTournaments=date.today() + timedelta(days=7), lokasiTournaments="GOR",
+            deskripsiTournaments="-", posterTournaments="https://example.com/p.png", kapasitasTournaments=2,
+        )
+        self.members = [
+            Member.objects.create(user=User.objects.create_user(username=f"m{i}", password="test123"), city="Depok")
+            for i in range(3)
+        ]
+
+    def join(self, username):
+        self.client.login(username=username, password="test123")
+        return self.client.post(reverse("tournaments:assign_tournament", args=[self.tournament.pk]))
+
+    def test_join_updates_count_and_enforces_capacity(self):
+        self.assertEqual(self.join("m0").status_code, 200)
+        self.assertEqual(self.join("m0").json()["message"], "Anda sudah terdaftar di turnamen ini!")
+        self.assertEqual(self.join("m1").json()["jumlah_peserta"], 2)
+
+        response = self.join("m2")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("penuh", response.json()["error"])
+        self.tournament.refresh_from_db()
+        self.assertEqual(self.tournament.jumlahPesertaTournaments, 2)
+        self.assertTrue(self.tournament.is_full)
+        self.assertFalse(self.tournament.pesertaTournaments.filter(pk=self.members[2].pk).exists())
+
+    def test_leave_frees_a_seat(self):
+        self.join("m0")
+        self.join("m1")
+        response = self.client.post(reverse("tournaments:leave_tournament", args=[self.tournament.pk]))
+        self.assertEqual(response.json()["jumlah_peserta"], 1)
+        self.assertEqual(
+            self.client.post(reverse("tournaments:leave_tournament", args=[self.tournament.pk])).status_code, 400
+        )
+        self.assertEqual(self.join("m2").status_code, 200)
+        self.assertEqual(self.client.get(reverse("tournaments:leave_tournament", args=[self.tournament.pk])).status_code, 405)
+
+    def test_closed_tournament_rejects_join_and_leave(self):
+        self.tournament.add_participant(self.members[0])
+        Tournament.objects.filter(pk=self.tournament.pk).update(flagTournaments=False)
+        self.tournament.refresh_from_db()
+        with self.assertRaises(RegistrationError):
+            self.tournament.add_participant(self.members[1])
+        with self.assertRaises(RegistrationError):
+            self.tournament.remove_participant(self.members[0])
+        self.assertEqual(self.tournament.jumlahPesertaTournaments, 1)
+
+    def test_roster_is_paginated_for_organizer_only(self):
+        self.tournament.kapasitasTournaments = None
+        self.tournament.save()
+        for member in self.members:
+            self.tournament.add_participant(member)
+        url = reverse("tournaments:tournament_participants", args=[self.tournament.pk])
+
+        self.client.login(username="m0", password="test123")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.login(username="organizer", password="test123")
+        first = self.client.get(url, {"limit": 2}).json()
+        self.assertEqual([p["username"] for p in first["participants"]], ["m0", "m1"])
+        self.assertTrue(first["has_more"])
+        self.assertEqual(first["jumlah_peserta"], 3)
+        second = self.client.get(url, {"limit": 2, "after": first["next"]}).json()
+        self.assertEqual([p["username"] for p in second["participants"]], ["m2"])
+        self.assertFalse(second["has_more"])
+        self.assertIsNone(second["next"])
+        self.assertEqual(self.client.get(url, {"limit": 0}).status_code, 400)
+
+    def test_show_page_uses_stored_count(self):
+        self.tournament.add_participant(self.members[0])
+        self.client.login(username="m0", password="test123")
+        response = self.client.get(reverse("tournaments:tournament_show", args=[self.tournament.pk]))
+        self.assertTrue(response.context["is_registered"])
+        self.assertContains(response, 'id="leave-btn"')
+        self.assertContains(response, '<span id="participant-count">1</span> / 2')
+
+    def test_edit_capacity_cannot_go_below_participants(self):
+        self.join("m0")
+        self.join("m1")
+        self.client.login(username="organizer", password="test123")
+        url = reverse("tournaments:edit_tournament_ajax", args=[self.tournament.pk])
+        response = self.client.post(url, json.dumps({"kapasitasTournaments": 1}), content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(url, json.dumps({"kapasitasTournaments": ""}), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.tournament.refresh_from_db()
+        self.assertIsNone(self.tournament.kapasitasTournaments)
+        self.assertEqual(self.tournament.jumlahPesertaTournaments, 2)
+
+    def test_rebuild_command_fixes_drifted_counts(self):
+        self.tournament.pesertaTournaments.add(*self.members[:2])
+        self.assertEqual(Tournament.objects.get(pk=self.tournament.pk).jumlahPesertaTournaments, 0)
+        call_command("rebuild_tournament_counts", stdout=StringIO())
+        self.assertEqual(Tournament.objects.get(pk=self.tournament.pk).jumlahPesertaTournaments, 2)
+
+
+class TournamentListFilterTests(TestCase):
+    def setUp(self):
+        coach_user = User.objects.create_user(username="organizer", password="test123")
+        coach = Coach.objects.create(user=coach_user, sport="tennis", city="Depok")
+        base = date.today() + timedelta(days=1)
+        self.tournaments = [
+            Tournament.objects.create(
+                pembuatTournaments=coach, tipeTournaments=tipe, namaTournaments=f"Cup {i}",
+                tanggalTournaments=base + timedelta(days=i), lokasiTournaments=lokasi,
+                deskripsiTournaments="-", posterTournaments="https://example.com/p.png",
+            )
+            for i, (tipe, lokasi) in enumerate([
+                ("tennis", "GOR Depok"), ("futsal", "GOR Depok"), ("tennis", "Senayan Jakarta"),
+                ("tennis", "GOR Bogor"), ("yoga", "Studio Depok"),
+            ])
+        ]
+        self.base = base
+
+    def get(self, **params):
+        return self.client.get(reverse("tournaments:tournament_view"), params, HTTP_X_REQUESTED_WITH="XMLHttpRequest")
+
+    def names(self, **params):
+        return [t["nama"] for t in self.get(**params).json()["tournaments"]]
+
+    def test_filters(self):
+        self.assertEqual(self.names(category="tennis"), ["Cup 0", "Cup 2", "Cup 3"])
+        self.assertEqual(self.names(location="depok"), ["Cup 0", "Cup 1", "Cup 4"])
+        self.assertEqual(
+            self.names(date_from=(self.base + timedelta(days=1)).isoformat(), date_to=(self.base + timedelta(days=3)).isoformat()),
+            ["Cup 1", "Cup 2", "Cup 3"],
+        )
+        self.assertEqual(self.names(q="organizer", category="yoga"), ["Cup 4"])
+
+    def test_cursor_pagination(self):
+        first = self.get(limit=2, category="tennis").json()
+        self.assertTrue(first["has_more"])
+        second = self.get(limit=2, category="tennis", cursor=first["next_cursor"]).json()
+        self.assertFalse(second["has_more"])
+        self.assertIsNone(second["next_cursor"])
+        self.assertEqual([t["nama"] for t in first["tournaments"] + second["tournaments"]], ["Cup 0", "Cup 2", "Cup 3"])
+
+    def test_invalid_params(self):
+        for params in ({"category": "catur"}, {"date_from": "kemarin"}, {"limit": "0"}, {"limit": "x"}, {"cursor": "!!"}):
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.json())
+
+    def test_anonymous_browsing_creates_no_session(self):
+        self.client.get(reverse("tournaments:tournament_view"))
+        self.get()
+        self.assertEqual(Session.objects.count(), 0)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+
+    def test_html_keeps_filters_and_coach_button(self):
+        response = self.client.get(reverse("tournaments:tournament_view"), {"category": "yoga", "location": "Depok"})
+        self.assertContains(response, '<option value="yoga" selected>')
+        self.assertContains(response, 'value="Depok"')
+        self.assertNotContains(response, reverse("tournaments:create_tournament"))
+
+        self.client.login(username="organizer", password="test123")
+        response = self.client.get(reverse("tournaments:tournament_view"))
+        self.assertContains(response, reverse("tournaments:create_tournament"))
+
+
+class TournamentQueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="member", password="test123")
+        self.member = Member.objects.create(user=self.user, city="Depok", phone="1")
+        coach_user = User.objects.create_user(username="coach", password="test123")
+        self.tournament = Tournament.objects.create(
+            pembuatTournaments=Coach.objects.create(user=coach_user, sport="tennis", city="Depok"),
+            tipeTournaments="tennis", namaTournaments="Open", tanggalTournaments=date(2030, 1, 1),
+            lokasiTournaments="GOR", deskripsiTournaments="-", posterTournaments="https://example.com/p.png",
+        )
+        self.client.login(username="member", password="test123")
+
+    def seed(self, n):
+        users = bulk_users(n, prefix="peserta")
+        coaches = Coach.objects.bulk_create(Coach(user=u, sport="tennis", city="Depok") for u in users)
+        members = Member.objects.bulk_create(Member(user=u, city="Depok", phone="1") for u in users)
+        Tournament.objects.bulk_create(
+            Tournament(
+                pembuatTournaments=coach, tipeTournaments="tennis", namaTournaments=f"T{i}",
+                tanggalTournaments=date(2030, 1, 1), lokasiTournaments="GOR", deskripsiTournaments="-",
+                posterTournaments="https://example.com/p.png",
+            )
+            for i, coach in enumerate(coaches)
+        )
+        self.tournament.pesertaTournaments.add(*members)
+        Tournament.rebuild_participant_counts()
+
+    def test_tournament_view(self):
+        self.assertQueryBudget(reverse("tournaments:tournament_view"), budget=4)
+
+    def test_tournament_view_json(self):
+        self.assertQueryBudget(
+            reverse("tournaments:tournament_view"), budget=4, HTTP_X_REQUESTED_WITH="XMLHttpRequest"
+        )
+
+    def test_tournament_show(self):
+        self.assertQueryBudget(reverse("tournaments:tournament_show", args=[self.tournament.pk]), budget=7)
+
+    def test_tournament_participants(self):
+        self.client.login(username="coach", password="test123")
+        self.assertQueryBudget(
+            reverse("tournaments:tournament_participants", args=[self.tournament.pk]), budget=5, data={"limit": 100}
+        )
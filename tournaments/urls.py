@@ -8,7 +8,9 @@ urlpatterns = [
     path('create/', views.create_tournament, name='create_tournament'),
     path('delete/<uuid:tournament_id>/', views.delete_tournament, name='delete_tournament'),
     path('assign/<uuid:tournament_id>/', views.assign_tournament, name='assign_tournament'),
+    path('leave/<uuid:tournament_id>/', views.leave_tournament, name='leave_tournament'),
     path('<uuid:tournament_id>/', views.tournament_show, name='tournament_show'),
+    path('<uuid:tournament_id>/participants/', views.tournament_participants, name='tournament_participants'),
     path('<uuid:tournament_id>/edit-ajax/', views.edit_tournament_ajax, name='edit_tournament_ajax'),
     path('my/', views.my_tournaments_ajax, name='my_tournaments_ajax'),
 
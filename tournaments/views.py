@@ -2,90 +2,199 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from django.urls import reverse_lazy
+from django.db.models import Count, Max, Q
+import base64
 import json
-from datetime import datetime
-from .models import Tournament
+import uuid
+from datetime import date, datetime
+from main.cache import cache_public_page
+from main.http import conditional_json
+from .models import RegistrationError, Tournament
 from users.models import Coach, Member
 from .forms import TournamentForm
 
 
-def tournament_view(request):
-    tournaments = Tournament.objects.filter(flagTournaments=True)
-    if hasattr(request.user, 'coach'):
-        request.session['role'] = 'coach'
-    elif hasattr(request.user, 'member'):
-        request.session['role'] = 'member'
-    else:
-        request.session['role'] = 'guest'
+def _is_ajax(request):
+    return request.headers.get('x-requested-with') == 'XMLHttpRequest'
 
-    is_coach = request.session.get('role') == 'coach'
 
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        data = []
-        for t in tournaments:
-            pembuat_username = (
-                t.pembuatTournaments.user.username
-                if hasattr(t.pembuatTournaments, 'user')
-                else "Unknown"
+def _tournaments_version(queryset):
+    return queryset.aggregate(n=Count('pk'), last=Max('updated_at'))
+
+
+def _tournament_list_version(request):
+    # Halaman HTML tidak pakai ETag, cuma JSON (AJAX) yang di-poll
+    if not _is_ajax(request):
+        return None
+    return _tournaments_version(Tournament.objects.filter(flagTournaments=True))
+
+
+def _my_tournaments(user):
+    if hasattr(user, 'coach'):
+        return Tournament.objects.filter(pembuatTournaments=user.coach, flagTournaments=True)
+    if hasattr(user, 'member'):
+        return Tournament.objects.filter(pesertaTournaments=user.member, flagTournaments=True)
+    return Tournament.objects.none()
+
+
+def _my_tournaments_version(request):
+    if not _is_ajax(request):
+        return None
+    return _tournaments_version(_my_tournaments(request.user))
+
+
+def _tournament_card(t):
+    """Data kartu tournament untuk list AJAX (dipakai tournament_view & my_tournaments_ajax)."""
+    return {
+        'id': str(t.idTournaments),
+        'nama': t.namaTournaments,
+        'tipe': t.tipeTournaments,
+        'tanggal': t.tanggalTournaments.strftime('%b %d, %Y'),
+        'lokasi': t.lokasiTournaments,
+        'poster': t.posterTournaments or '/static/images/empty.png',
+        'deskripsi': t.deskripsiTournaments,
+        'pembuat': t.pembuatTournaments.user.username,
+    }
+
+
+# ================== List + filter ==================
+TOURNAMENTS_PER_PAGE = 9
+TOURNAMENTS_MAX_LIMIT = 50
+LIST_ORDERING = ('tanggalTournaments', 'idTournaments')
+# Roster peserta per halaman (turnamen besar tidak dirender inline)
+ROSTER_PAGE_SIZE = 30
+ROSTER_MAX_LIMIT = 100
+
+
+def _encode_cursor(t):
+    raw = f"{t.tanggalTournaments.isoformat()}|{t.idTournaments}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """Cursor -> (tanggal, id) tournament terakhir di halaman sebelumnya. Raise ValueError."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        tanggal, pk = base64.urlsafe_b64decode(padded.encode()).decode().split('|')
+        return date.fromisoformat(tanggal), uuid.UUID(pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+
+def _date_param(request, name):
+    raw = request.GET.get(name)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a date (YYYY-MM-DD)")
+
+
+def _filtered_tournaments(request):
+    """
+    Tournament aktif + filter ?category=&date_from=&date_to=&location=&q=.
+    Raise ValueError (pesan untuk response 400) kalau parameter tidak valid.
+    """
+    qs = Tournament.objects.filter(flagTournaments=True)
+
+    category = request.GET.get('category')
+    if category:
+        if category not in dict(Tournament.CATEGORY_CHOICES):
+            raise ValueError(f"Unknown category '{category}'")
+        qs = qs.filter(tipeTournaments=category)
+
+    date_from, date_to = _date_param(request, 'date_from'), _date_param(request, 'date_to')
+    if date_from:
+        qs = qs.filter(tanggalTournaments__gte=date_from)
+    if date_to:
+        qs = qs.filter(tanggalTournaments__lte=date_to)
+
+    location = (request.GET.get('location') or '').strip()
+    if location:
+        qs = qs.filter(lokasiTournaments__icontains=location)
+
+    q = (request.GET.get('q') or '').strip()
+    if q:
+        qs = qs.filter(
+            Q(namaTournaments__icontains=q)
+            | Q(lokasiTournaments__icontains=q)
+            | Q(pembuatTournaments__user__username__icontains=q)
+        )
+    return qs
+
+
+def _tournament_page(qs, cursor, limit):
+    """Keyset page urut (tanggal, id): tanpa OFFSET / COUNT. Return (items, next_cursor)."""
+    qs = qs.select_related('pembuatTournaments__user').order_by(*LIST_ORDERING)
+    if cursor:
+        tanggal, pk = _decode_cursor(cursor)
+        qs = qs.filter(
+            Q(tanggalTournaments__gt=tanggal) | Q(tanggalTournaments=tanggal, idTournaments__gt=pk)
+        )
+    items = list(qs[:limit + 1])
+    if len(items) > limit:
+        items = items[:limit]
+        return items, _encode_cursor(items[-1])
+    return items, None
+
+
+@conditional_json(_tournament_list_version, per_user=False)
+@cache_public_page('tournaments')
+def tournament_view(request):
+    """
+    Halaman list tournament; versi AJAX (X-Requested-With) = JSON satu halaman:
+    ?category=&date_from=&date_to=&location=&q=&cursor=&limit=
+    -> {"tournaments": [...], "next_cursor": ..., "has_more": ...}
+    Role dibaca langsung dari user (tanpa menulis session, jadi pengunjung
+    anonim tidak membuat row session).
+    """
+    if _is_ajax(request):
+        try:
+            limit = int(request.GET.get('limit') or TOURNAMENTS_PER_PAGE)
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= TOURNAMENTS_MAX_LIMIT:
+            return JsonResponse({'error': f"'limit' must be between 1 and {TOURNAMENTS_MAX_LIMIT}"}, status=400)
+        try:
+            tournaments, next_cursor = _tournament_page(
+                _filtered_tournaments(request), request.GET.get('cursor'), limit
             )
-            data.append({
-                'id': str(t.idTournaments),
-                'nama': t.namaTournaments,
-                'tipe': t.tipeTournaments,
-                'tanggal': t.tanggalTournaments.strftime('%b %d, %Y'),
-                'lokasi': t.lokasiTournaments,
-                'poster': t.posterTournaments or '/static/images/empty.png',
-                'deskripsi': t.deskripsiTournaments,
-                'pembuat': pembuat_username,
-            })
-        return JsonResponse({'tournaments': data})
+        except ValueError as exc:
+            return JsonResponse({'error': str(exc)}, status=400)
+        return JsonResponse({
+            'tournaments': [_tournament_card(t) for t in tournaments],
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None,
+        })
 
     return render(request, 'tournament_list.html', {
-        'tournaments': tournaments,
-        'is_coach': is_coach,
+        'is_coach': hasattr(request.user, 'coach'),
+        'categories': Tournament.CATEGORY_CHOICES,
+        'filters': {
+            name: request.GET.get(name, '')
+            for name in ('category', 'date_from', 'date_to', 'location', 'q')
+        },
     })
 
 
-
 @login_required(login_url=reverse_lazy('users:login'))
+@conditional_json(_my_tournaments_version)
 def my_tournaments_ajax(request):
-    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
-        user = request.user
-
-        if hasattr(user, 'coach'):
-            tournaments = Tournament.objects.filter(
-                pembuatTournaments=user.coach,
-                flagTournaments=True
-            )
-        elif hasattr(user, 'member'):
-            tournaments = Tournament.objects.filter(
-                pesertaTournaments=user.member,
-                flagTournaments=True
-            )
-        else:
-            tournaments = Tournament.objects.none()
-
-        data = []
-        for t in tournaments:
-            data.append({
-                'id': str(t.idTournaments),
-                'nama': t.namaTournaments,
-                'tipe': t.tipeTournaments,
-                'tanggal': t.tanggalTournaments.strftime('%b %d, %Y'),
-                'lokasi': t.lokasiTournaments,
-                'poster': t.posterTournaments if hasattr(t, 'posterTournaments') else '',
-                'pembuat': t.pembuatTournaments.user.username,
-            })
-
-        return JsonResponse({'tournaments': data})
+    if _is_ajax(request):
+        tournaments = _my_tournaments(request.user).select_related('pembuatTournaments__user')
+        return JsonResponse({'tournaments': [_tournament_card(t) for t in tournaments]})
 
     return JsonResponse({'error': 'Invalid request'}, status=400)
 
 
 @login_required(login_url=reverse_lazy('users:login'))
 def tournament_show(request, tournament_id):
-    tournament = get_object_or_404(Tournament, idTournaments=tournament_id)
+    tournament = get_object_or_404(
+        Tournament.objects.select_related('pembuatTournaments__user'), idTournaments=tournament_id
+    )
 
     pembuat_username = (
         tournament.pembuatTournaments.user.username
@@ -105,13 +214,18 @@ def tournament_show(request, tournament_id):
             'poster': tournament.posterTournaments,
             'deskripsi': tournament.deskripsiTournaments,
             'pembuat': pembuat_username,
+            'jumlah_peserta': tournament.jumlahPesertaTournaments,
+            'kapasitas': tournament.kapasitasTournaments,
         }
         return JsonResponse({'tournament': data})
 
+    is_registered = is_member and tournament.pesertaTournaments.filter(pk=request.user.member.pk).exists()
     return render(request, 'tournament_show.html', {
         'tournament': tournament,
         'is_coach': is_coach,
         'is_member': is_member,
+        'is_registered': is_registered,
+        'roster_page_size': ROSTER_PAGE_SIZE,
     })
 
 
@@ -149,7 +263,7 @@ def delete_tournament(request, tournament_id):
     if not hasattr(request.user, 'coach') or request.user.coach != tournament.pembuatTournaments:
         return JsonResponse({'error': 'Kamu tidak berhak menghapus tournament ini'}, status=403)
 
-    tournament.delete()
+    tournament.soft_delete()
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         return JsonResponse({'message': 'Tournament berhasil dihapus!'})
 
@@ -171,13 +285,81 @@ def assign_tournament(request, tournament_id):
     if not tournament.flagTournaments:
         return JsonResponse({'error': 'Pendaftaran turnamen ini sudah ditutup.'}, status=400)
 
-    if tournament.pesertaTournaments.filter(pk=member.pk).exists():
+    try:
+        joined = tournament.add_participant(member)
+    except RegistrationError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    if not joined:
         return JsonResponse({'message': 'Anda sudah terdaftar di turnamen ini!'}, status=200)
 
-    tournament.pesertaTournaments.add(member)
-    tournament.save()
+    return JsonResponse({
+        'message': f'{member.user.username} berhasil daftar ke {tournament.namaTournaments}!',
+        'jumlah_peserta': tournament.jumlahPesertaTournaments,
+    }, status=200)
+
+
+@login_required(login_url=reverse_lazy('users:login'))
+@require_POST
+def leave_tournament(request, tournament_id):
+    tournament = get_object_or_404(Tournament, idTournaments=tournament_id)
 
-    return JsonResponse({'message': f'{member.user.username} berhasil daftar ke {tournament.namaTournaments}!'}, status=200)
+    if not hasattr(request.user, 'member'):
+        return JsonResponse({'error': 'Hanya member yang dapat membatalkan pendaftaran.'}, status=403)
+
+    try:
+        left = tournament.remove_participant(request.user.member)
+    except RegistrationError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    if not left:
+        return JsonResponse({'error': 'Anda belum terdaftar di turnamen ini.'}, status=400)
+
+    return JsonResponse({
+        'message': f'Pendaftaran di {tournament.namaTournaments} dibatalkan.',
+        'jumlah_peserta': tournament.jumlahPesertaTournaments,
+    })
+
+
+@login_required(login_url=reverse_lazy('users:login'))
+def tournament_participants(request, tournament_id):
+    """
+    GET ?after=<cursor>&limit= -> satu halaman roster, urut waktu daftar.
+    Cursor = id baris pendaftaran terakhir (keyset, tanpa OFFSET). Hanya pembuat turnamen.
+    """
+    tournament = get_object_or_404(Tournament, idTournaments=tournament_id)
+    if not hasattr(request.user, 'coach') or request.user.coach.pk != tournament.pembuatTournaments_id:
+        return JsonResponse({'error': 'Hanya pembuat turnamen yang dapat melihat peserta.'}, status=403)
+
+    try:
+        after = int(request.GET.get('after') or 0)
+        limit = int(request.GET.get('limit') or ROSTER_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({'error': "'after' and 'limit' must be integers"}, status=400)
+    if not 1 <= limit <= ROSTER_MAX_LIMIT:
+        return JsonResponse({'error': f"'limit' must be between 1 and {ROSTER_MAX_LIMIT}"}, status=400)
+
+    rows = list(
+        Tournament.pesertaTournaments.through.objects
+        .filter(tournament_id=tournament.pk, id__gt=after)
+        .select_related('member__user')
+        .order_by('id')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return JsonResponse({
+        'participants': [
+            {
+                'id': str(row.member_id),
+                'username': row.member.user.username,
+                'city': row.member.city,
+                'profile_photo': row.member.profile_photo,
+            }
+            for row in rows
+        ],
+        'jumlah_peserta': tournament.jumlahPesertaTournaments,
+        'kapasitas': tournament.kapasitasTournaments,
+        'has_more': has_more,
+        'next': rows[-1].id if has_more else None,
+    })
 
 
 @login_required(login_url=reverse_lazy('users:login'))
@@ -192,6 +374,7 @@ def edit_tournament_ajax(request, tournament_id):
             "tanggalTournaments": str(tournament.tanggalTournaments),
             "deskripsiTournaments": tournament.deskripsiTournaments,
             "posterTournaments": tournament.posterTournaments,
+            "kapasitasTournaments": tournament.kapasitasTournaments,
         })
 
     elif request.method == "POST":
@@ -208,8 +391,27 @@ def edit_tournament_ajax(request, tournament_id):
                     tournament.tanggalTournaments = datetime.strptime(tanggal_str, "%Y-%m-%d").date()
                 except ValueError:
                     return JsonResponse({"error": "Format tanggal tidak valid. Gunakan YYYY-MM-DD."}, status=400)
-
-            tournament.save()
+            if "kapasitasTournaments" in data:
+                kapasitas = data["kapasitasTournaments"]
+                if kapasitas in (None, ""):
+                    tournament.kapasitasTournaments = None
+                else:
+                    try:
+                        kapasitas = int(kapasitas)
+                    except (TypeError, ValueError):
+                        return JsonResponse({"error": "Kapasitas harus berupa angka."}, status=400)
+                    if kapasitas < max(tournament.jumlahPesertaTournaments, 1):
+                        return JsonResponse(
+                            {"error": f"Kapasitas minimal {max(tournament.jumlahPesertaTournaments, 1)} (jumlah peserta saat ini)."},
+                            status=400,
+                        )
+                    tournament.kapasitasTournaments = kapasitas
+
+            # Tanpa jumlahPesertaTournaments: jangan menimpa counter yang di-update bersamaan oleh pendaftar
+            tournament.save(update_fields=[
+                "namaTournaments", "lokasiTournaments", "deskripsiTournaments", "posterTournaments",
+                "tanggalTournaments", "kapasitasTournaments", "flagTournaments", "updated_at",
+            ])
             return JsonResponse({"message": "Tournament updated successfully!"})
 
         except json.JSONDecodeError:
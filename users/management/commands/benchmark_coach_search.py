@@ -0,0 +1,102 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from users.models import Coach
+from users.search import IcontainsCoachSearch, get_search_backend
+
+FIRST_NAMES = ["Budi", "Siti", "Agus", "Dewi", "Rina", "Andi", "Putri", "Joko", "Wulan", "Rizky", "Fajar", "Intan"]
+LAST_NAMES = ["Santoso", "Rahayu", "Wijaya", "Pratama", "Saputra", "Lestari", "Hidayat", "Kusuma", "Nugroho"]
+CITIES = ["Jakarta", "Bandung", "Surabaya", "Depok", "Bogor", "Medan", "Makassar", "Yogyakarta", "Semarang", "Bali"]
+QUERIES = ["budi", "santoso", "bandung", "tennis", "martial", "siti jakarta", "zzz"]
+
+
+def legacy_search(queryset, query):
+    """Query coach_list sebelum ada search backend: 4x icontains OR + DISTINCT."""
+    return queryset.filter(
+        Q(user__first_name__icontains=query) |
+        Q(user__last_name__icontains=query) |
+        Q(sport__icontains=query) |
+        Q(city__icontains=query)
+    ).distinct()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Bandingkan search coach (query lama vs search backend) di N coach sintetis. "
+        "Data dibuat di dalam transaksi yang di-rollback setelah benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--page-size", type=int, default=12)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        for size in options["sizes"]:
+            try:
+                with transaction.atomic():
+                    self._seed(size, random.Random(options["seed"]))
+                    self._run(size, options["repeat"], options["page_size"])
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _seed(self, size, rng):
+        started = time.perf_counter()
+        sports = [key for key, _ in Coach.SPORT_CHOICES]
+        users = [
+            User(
+                username=f"bench_{uuid.uuid4().hex[:20]}",
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password="!",
+            )
+            for _ in range(size)
+        ]
+        User.objects.bulk_create(users, batch_size=2000)
+        users = User.objects.filter(username__startswith="bench_").only("id")
+        Coach.objects.bulk_create(
+            [
+                Coach(user_id=u.id, sport=rng.choice(sports), city=rng.choice(CITIES), phone="0")
+                for u in users.iterator(chunk_size=2000)
+            ],
+            batch_size=2000,
+        )
+        # bulk_create tidak mengirim signals -> index manual
+        get_search_backend().rebuild()
+        self.stdout.write(f"\n== {size} coaches (seeded in {time.perf_counter() - started:.1f}s) ==")
+
+    def _run(self, size, repeat, page_size):
+        backend = get_search_backend()
+        strategies = [
+            ("legacy icontains OR + DISTINCT", legacy_search),
+            ("search_document icontains", IcontainsCoachSearch().search),
+            (f"backend: {backend.name}", backend.search),
+        ]
+        header = f"{'query':<14}" + "".join(f"{name[:34]:>36}" for name, _ in strategies)
+        self.stdout.write(header)
+        for query in QUERIES:
+            cells = []
+            for _, search in strategies:
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    qs = search(Coach.objects.all(), query)
+                    # Sama seperti Paginator di coach_list: COUNT + satu halaman
+                    total = qs.count()
+                    list(qs[:page_size])
+                    timings.append((time.perf_counter() - started) * 1000)
+                cells.append(f"{statistics.median(timings):9.1f} ms ({total:>6} hits)")
+            self.stdout.write(f"{query:<14}" + "".join(f"{c:>36}" for c in cells))
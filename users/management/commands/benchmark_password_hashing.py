@@ -0,0 +1,68 @@
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from users.passwords import PasswordHashPool, create_user
+
+HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Registrasi per detik per core untuk tiap hasher (pbkdf2 = sebelum, "
+        "PASSWORD_HASHER = sesudah), serial dan lewat PasswordHashPool. "
+        "User dibuat di dalam transaksi yang di-rollback."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20, help='Registrasi per pengukuran.')
+        parser.add_argument('--workers', type=int, default=settings.PASSWORD_HASH_WORKERS)
+        parser.add_argument('--hashers', nargs='+', choices=list(HASHERS), default=None)
+
+    def handle(self, *args, **options):
+        count, workers = options['count'], max(options['workers'], 1)
+        names = options['hashers'] or list(dict.fromkeys(['pbkdf2', settings.PASSWORD_HASHER]))
+        self.stdout.write(f"{count} registrasi per pengukuran, pool {workers} worker")
+        self.stdout.write(f"{'hasher':<10}{'serial reg/s':>14}{'pool reg/s':>12}{'pool reg/s/core':>17}")
+        for name in names:
+            with override_settings(PASSWORD_HASHERS=[HASHERS[name]]):
+                try:
+                    make_password('warmup')
+                except ValueError as exc:  # mis. argon2-cffi belum terpasang
+                    self.stdout.write(f"{name:<10}  dilewati: {exc}")
+                    continue
+                serial = self._registrations_per_second(count)
+                pooled = self._pooled_per_second(count, workers)
+            self.stdout.write(f"{name:<10}{serial:>14.1f}{pooled:>12.1f}{pooled / workers:>17.1f}")
+
+    def _registrations_per_second(self, count):
+        """Alur view registrasi: hash (pool bersama) + INSERT user."""
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                for _ in range(count):
+                    create_user(username=f'bench_{uuid.uuid4().hex[:20]}', password='Benchmark-pass-123')
+                raise _Rollback
+        except _Rollback:
+            pass
+        return count / (time.perf_counter() - started)
+
+    def _pooled_per_second(self, count, workers):
+        """Alur bulk (import): hash paralel di pool."""
+        with PasswordHashPool(workers) as pool:
+            started = time.perf_counter()
+            pool.hash(['Benchmark-pass-123'] * count)
+            return count / (time.perf_counter() - started)
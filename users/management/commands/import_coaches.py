@@ -0,0 +1,208 @@
+"""
+Import coach dari CSV secara batch.
+
+    python manage.py import_coaches [path.csv] [--batch-size 500] [--workers N] [--upsert]
+
+Kolom CSV: username,email,password,first_name,last_name,sport,hourly_fee,
+city,phone,description,profile_photo (sama dengan users/data/coaches.csv).
+
+- CSV dibaca streaming, diproses per batch: satu query cek username yang
+  sudah ada, hash password paralel (users.passwords.PasswordHashPool), lalu bulk_create
+  User + Coach dalam satu transaksi per batch.
+- Idempotent: username yang sudah ada dilewati, atau di-update dengan
+  --upsert (profil coach + nama/email; password tidak diubah).
+- bulk_create / bulk_update tidak memicu signals, jadi search index dan
+  cache halaman coach di-update langsung di sini.
+"""
+import csv
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from main.cache import invalidate
+from users.models import Coach
+from users.passwords import PasswordHashPool
+from users.search import build_search_document, get_search_backend
+
+DEFAULT_CSV = Path(__file__).resolve().parents[2] / 'data' / 'coaches.csv'
+REQUIRED_COLUMNS = {'username', 'password', 'sport', 'hourly_fee', 'city'}
+USER_FIELDS = ['email', 'first_name', 'last_name']
+COACH_FIELDS = ['sport', 'hourly_fee', 'city', 'phone', 'description', 'profile_photo']
+SPORTS = {key for key, _ in Coach.SPORT_CHOICES}
+
+
+def _clean(row):
+    """Normalisasi satu baris CSV. Raise ValueError kalau tidak valid."""
+    row = {key: (value or '').strip() for key, value in row.items() if key}
+    if not row.get('username'):
+        raise ValueError('username kosong')
+    if not row.get('password'):
+        raise ValueError('password kosong')
+    if row['sport'] not in SPORTS:
+        raise ValueError(f"sport '{row['sport']}' tidak dikenal")
+    try:
+        row['hourly_fee'] = int(row['hourly_fee'] or 0)
+    except ValueError:
+        raise ValueError(f"hourly_fee '{row['hourly_fee']}' bukan angka") from None
+    if row['hourly_fee'] < 0:
+        raise ValueError('hourly_fee negatif')
+    row['profile_photo'] = row.get('profile_photo') or None
+    row['description'] = row.get('description') or None
+    return row
+
+
+def _coach_from_row(coach, user, row):
+    coach.user = user
+    for field in COACH_FIELDS:
+        setattr(coach, field, row.get(field, ''))
+    coach.search_document = build_search_document(coach)
+    return coach
+
+
+class Command(BaseCommand):
+    help = 'Import coach dari CSV (batch, idempotent, hash password paralel).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', nargs='?', default=str(DEFAULT_CSV))
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Jumlah worker hash password (default PASSWORD_HASH_WORKERS, 1 = tanpa pool).',
+        )
+        parser.add_argument(
+            '--processes', action='store_true',
+            help='Hash di pool proses, bukan thread (untuk hasher yang tidak melepas GIL).',
+        )
+        parser.add_argument(
+            '--upsert', action='store_true',
+            help='Update profil coach yang username-nya sudah ada (default: dilewati).',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['csv_path'])
+        batch_size = max(options['batch_size'], 1)
+        self.upsert = options['upsert']
+        self.verbosity = options['verbosity']
+        self.totals = {'created': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
+        if not path.exists():
+            raise CommandError(f"File '{path}' tidak ditemukan.")
+
+        self.pool = PasswordHashPool(options['workers'], processes=options['processes'])
+
+        started = time.perf_counter()
+        rows_read = 0
+        try:
+            with path.open(newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                missing = REQUIRED_COLUMNS - set(reader.fieldnames or ())
+                if missing:
+                    raise CommandError(f"Kolom CSV tidak lengkap: {', '.join(sorted(missing))}")
+                seen = set()
+                for number, batch in enumerate(iter(lambda: list(islice(reader, batch_size)), []), 1):
+                    rows_read += len(batch)
+                    try:
+                        self._import_batch(batch, seen)
+                    except Exception as exc:
+                        raise CommandError(
+                            f'Batch {number} gagal dan di-rollback ({exc}). '
+                            f'Batch sebelumnya sudah tersimpan; jalankan ulang untuk melanjutkan.'
+                        ) from exc
+                    if self.verbosity >= 2:
+                        self.stdout.write(f'batch {number}: {rows_read} baris')
+        finally:
+            self.pool.close()
+            # Signals tidak jalan untuk bulk_create -> buang cache halaman coach manual
+            if self.totals['created'] or self.totals['updated']:
+                invalidate('coaches')
+
+        elapsed = time.perf_counter() - started
+        rate = rows_read / elapsed if elapsed else 0
+        t = self.totals
+        self.stdout.write(self.style.SUCCESS(
+            f"{rows_read} baris dalam {elapsed:.2f}s ({rate:.0f} baris/detik): "
+            f"{t['created']} dibuat, {t['updated']} di-update, "
+            f"{t['skipped']} dilewati, {t['errors']} error."
+        ))
+
+    def _import_batch(self, batch, seen):
+        rows = []
+        for raw in batch:
+            try:
+                row = _clean(raw)
+            except ValueError as exc:
+                self._error(raw.get('username'), exc)
+                continue
+            # Username duplikat di dalam file: baris pertama yang dipakai
+            if row['username'] in seen:
+                self._skip(row['username'], 'duplikat di CSV')
+                continue
+            seen.add(row['username'])
+            rows.append(row)
+        if not rows:
+            return
+
+        existing = {
+            u.username: u
+            for u in User.objects.filter(username__in=[r['username'] for r in rows]).select_related('coach')
+        }
+        new_rows = [r for r in rows if r['username'] not in existing]
+        # Hash di luar transaksi: bagian paling lambat, tidak perlu menahan lock DB
+        hashes = self.pool.hash(r['password'] for r in new_rows)
+
+        with transaction.atomic():
+            indexed = self._create(new_rows, hashes)
+            for row in rows:
+                if row['username'] in existing and not self.upsert:
+                    self._skip(row['username'], 'sudah ada')
+            if self.upsert:
+                indexed += self._update([r for r in rows if r['username'] in existing], existing)
+            get_search_backend().index(indexed)
+
+    def _create(self, rows, hashes):
+        users = [
+            User(username=r['username'], password=h, **{f: r.get(f, '') for f in USER_FIELDS})
+            for r, h in zip(rows, hashes)
+        ]
+        User.objects.bulk_create(users)
+        if users and users[0].pk is None:
+            # Database tanpa RETURNING di bulk insert: ambil id-nya sekali query
+            ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'id'))
+            for user in users:
+                user.pk = ids[user.username]
+        coaches = [_coach_from_row(Coach(), user, row) for user, row in zip(users, rows)]
+        Coach.objects.bulk_create(coaches)
+        self.totals['created'] += len(coaches)
+        if self.verbosity >= 3:
+            for user in users:
+                self.stdout.write(f'created {user.username}')
+        return coaches
+
+    def _update(self, rows, existing):
+        users, coaches = [], []
+        for row in rows:
+            user = existing[row['username']]
+            coach = getattr(user, 'coach', None)
+            if coach is None:
+                self._error(row['username'], 'user sudah ada tapi bukan coach')
+                continue
+            for field in USER_FIELDS:
+                setattr(user, field, row.get(field, ''))
+            users.append(user)
+            coaches.append(_coach_from_row(coach, user, row))
+        User.objects.bulk_update(users, USER_FIELDS)
+        Coach.objects.bulk_update(coaches, COACH_FIELDS + ['search_document'])
+        self.totals['updated'] += len(coaches)
+        return coaches
+
+    def _skip(self, username, reason):
+        self.totals['skipped'] += 1
+        if self.verbosity >= 2:
+            self.stdout.write(f'SKIPPED {username}: {reason}')
+
+    def _error(self, username, reason):
+        self.totals['errors'] += 1
+        self.stderr.write(f'ERROR {username or "<tanpa username>"}: {reason}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from users.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = "Index ulang search coach (search_document + FTS5 / trigram index)."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        with transaction.atomic():
+            count = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} coach(es) with backend '{backend.name}'."))
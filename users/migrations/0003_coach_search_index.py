@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:12
+
+from django.db import OperationalError, migrations, models
+
+FTS_TABLE = 'users_coach_fts'
+TRIGRAM_INDEX = 'users_coach_search_trgm_idx'
+
+
+def _document(coach):
+    user = coach.user
+    parts = [
+        user.first_name,
+        user.last_name,
+        coach.sport.replace('_', ' '),
+        dict(coach._meta.get_field('sport').choices).get(coach.sport, ''),
+        coach.city,
+    ]
+    return ' '.join(p for p in parts if p)
+
+
+def create_search_index(apps, schema_editor):
+    Coach = apps.get_model('users', 'Coach')
+    vendor = schema_editor.connection.vendor
+
+    coaches = list(Coach.objects.select_related('user'))
+    for coach in coaches:
+        coach.search_document = _document(coach)
+    Coach.objects.bulk_update(coaches, ['search_document'], batch_size=1000)
+
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON users_coach '
+            'USING gin (search_document gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5('
+                "coach_id UNINDEXED, document, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except OperationalError:
+            # SQLite tanpa FTS5 -> users.search fallback ke icontains
+            return
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, coach_id, document) VALUES (%s, %s, %s)',
+                [(c.pk.int & ((1 << 63) - 1), c.pk.hex, c.search_document) for c in coaches],
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_coach_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coach',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
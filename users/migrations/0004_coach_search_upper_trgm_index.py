@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:40
+
+from django.db import migrations
+
+OLD_TRIGRAM_INDEX = 'users_coach_search_trgm_idx'
+TRIGRAM_INDEX = 'users_coach_search_upper_trgm_idx'
+
+
+def index_upper_search_document(apps, schema_editor):
+    # `search_document__icontains` di PostgreSQL jadi `UPPER(search_document::text) LIKE UPPER(%s)`,
+    # index gin_trgm_ops di kolom mentah tidak pernah dipakai planner -> index ekspresi UPPER().
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {OLD_TRIGRAM_INDEX}')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON users_coach '
+        'USING gin (UPPER(search_document) gin_trgm_ops)'
+    )
+
+
+def index_raw_search_document(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {OLD_TRIGRAM_INDEX} ON users_coach '
+        'USING gin (search_document gin_trgm_ops)'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_coach_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_upper_search_document, index_raw_search_document),
+    ]
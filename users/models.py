@@ -47,5 +47,27 @@ class Coach(models.Model):
     sport = models.CharField(max_length=20, choices=SPORT_CHOICES, default='other')
     hourly_fee = models.PositiveIntegerField(default=0)
 
+    # Agregat rating dari reviews.Review, di-update oleh view reviews
+    # (lihat reviews.models.apply_rating_change) supaya list coach bisa sort tanpa GROUP BY.
+    rating_avg = models.FloatField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
+    # Teks gabungan nama / sport / kota untuk search (lihat users/search.py)
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-rating_avg', '-rating_count'], name='coach_rating_idx'),
+        ]
+
     def __str__(self):
         return self.user.username
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'rating_{star}_count') for star in range(1, 6)}
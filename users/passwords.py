@@ -0,0 +1,95 @@
+"""
+Hash password di luar thread request.
+
+Hash password adalah bagian paling mahal dari registrasi (ratusan ms CPU
+per hash). Semua hash lewat pool yang dibatasi PASSWORD_HASH_WORKERS:
+
+- hash_password() / create_user(): untuk view registrasi. Lonjakan
+  registrasi antre di pool bersama, tidak memakan semua core, jadi thread
+  request lain tetap jalan.
+- PasswordHashPool: untuk operasi bulk (import CSV), paralel di pool
+  thread atau proses.
+
+hashlib (PBKDF2, scrypt) dan argon2-cffi melepas GIL, jadi pool thread
+sudah paralel. Pool proses hanya perlu untuk hasher Python murni.
+
+Hasher yang dipakai = PASSWORD_HASHERS[0] (lihat settings). Hash lama
+di-upgrade otomatis oleh Django saat login (check_password -> setter).
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def _get_shared_pool():
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ThreadPoolExecutor(
+                max(settings.PASSWORD_HASH_WORKERS, 1), thread_name_prefix='password-hash'
+            )
+        return _shared_pool
+
+
+def hash_password(raw_password):
+    """make_password() lewat pool bersama (blocking sampai hash selesai)."""
+    return _get_shared_pool().submit(make_password, raw_password).result()
+
+
+def create_user(username, password, email='', **extra_fields):
+    """Seperti User.objects.create_user, tapi hash password lewat pool."""
+    user = User(
+        username=User.normalize_username(username),
+        email=User.objects.normalize_email(email),
+        **extra_fields,
+    )
+    user.password = hash_password(password)
+    user.save()
+    return user
+
+
+def _init_process():
+    # Start method "spawn" (macOS / Windows): proses anak perlu setup Django sendiri
+    django.setup()
+
+
+class PasswordHashPool:
+    """
+    Pool sementara untuk hash banyak password sekaligus.
+
+        with PasswordHashPool(workers=4) as pool:
+            hashes = pool.hash(passwords)
+    """
+
+    def __init__(self, workers=None, processes=False):
+        self.workers = max(workers or settings.PASSWORD_HASH_WORKERS, 1)
+        self._executor = None
+        if self.workers > 1:
+            if processes:
+                self._executor = ProcessPoolExecutor(self.workers, initializer=_init_process)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+
+    def hash(self, passwords):
+        passwords = list(passwords)
+        if self._executor is None or len(passwords) < 2:
+            return [make_password(pw) for pw in passwords]
+        chunksize = max(len(passwords) // self.workers, 1)
+        return list(self._executor.map(make_password, passwords, chunksize=chunksize))
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
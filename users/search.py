@@ -0,0 +1,184 @@
+"""
+Search coach untuk coach_list.
+
+Satu interface (`CoachSearchBackend`) dengan implementasi per database:
+- PostgreSQL: trigram GIN index (pg_trgm) di UPPER(Coach.search_document).
+- SQLite: tabel virtual FTS5 `users_coach_fts` yang disinkron lewat signals.
+- Fallback: icontains di search_document (kalau FTS5 / pg_trgm tidak tersedia).
+
+Tabel / index-nya dibuat oleh migration users.0003_coach_search_index
+(index PostgreSQL diganti ke ekspresi UPPER() di users.0004).
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from .models import Coach
+
+FTS_TABLE = 'users_coach_fts'
+TRIGRAM_INDEX = 'users_coach_search_upper_trgm_idx'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def build_search_document(coach):
+    """Teks yang di-index untuk satu coach: nama, cabang olahraga & kota."""
+    user = coach.user
+    parts = [
+        user.first_name,
+        user.last_name,
+        coach.sport.replace('_', ' '),
+        coach.get_sport_display(),
+        coach.city,
+    ]
+    return ' '.join(p for p in parts if p)
+
+
+def _fts_rowid(coach_id):
+    # rowid FTS5 harus integer; ambil 63 bit bawah UUID coach supaya
+    # update / delete per coach tetap lookup by rowid, bukan scan tabel.
+    return coach_id.int & ((1 << 63) - 1)
+
+
+class CoachSearchBackend:
+    """Interface search coach. `search()` mengembalikan queryset yang sudah di-rank."""
+
+    name = 'base'
+
+    def is_available(self):
+        return True
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index(self, coaches):
+        """Simpan ulang search_document coach (dipanggil dari signals)."""
+        changed = []
+        for coach in coaches:
+            document = build_search_document(coach)
+            if coach.search_document != document:
+                coach.search_document = document
+                changed.append(coach)
+        if changed:
+            Coach.objects.bulk_update(changed, ['search_document'], batch_size=1000)
+
+    def remove(self, coach_ids):
+        pass
+
+    def rebuild(self):
+        """Index ulang semua coach. Return jumlah coach yang di-index."""
+        count = 0
+        batch = []
+        for coach in Coach.objects.select_related('user').iterator(chunk_size=2000):
+            batch.append(coach)
+            if len(batch) >= 2000:
+                self.index(batch)
+                count += len(batch)
+                batch = []
+        self.index(batch)
+        return count + len(batch)
+
+
+class IcontainsCoachSearch(CoachSearchBackend):
+    """Fallback tanpa index khusus: satu icontains di search_document (tanpa JOIN / DISTINCT)."""
+
+    name = 'icontains'
+
+    def search(self, queryset, query):
+        return queryset.filter(search_document__icontains=query)
+
+
+class PostgresTrigramCoachSearch(CoachSearchBackend):
+    """
+    icontains di search_document (`UPPER(search_document) LIKE UPPER('%q%')`),
+    dipercepat GIN index gin_trgm_ops di ekspresi yang sama, di-rank dengan
+    TrigramWordSimilarity. Ganti lookup filter = index tidak terpakai lagi.
+    """
+
+    name = 'postgres_trigram'
+
+    def is_available(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            return cursor.fetchone() is not None
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        return (
+            queryset.filter(search_document__icontains=query)
+            .annotate(search_rank=TrigramWordSimilarity(query, 'search_document'))
+            .order_by('-search_rank', 'id')
+        )
+
+
+class SqliteFtsCoachSearch(CoachSearchBackend):
+    """FTS5 (prefix match per kata), di-rank dengan bm25()."""
+
+    name = 'sqlite_fts5'
+
+    def is_available(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+            )
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def match_expression(query):
+        """'budi jak' -> '"budi"* "jak"*' (semua kata harus ada, match awalan kata)."""
+        return ' '.join(f'"{token}"*' for token in _TOKEN_RE.findall(query))
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        # Filter lewat pk__in (satu query FTS), rank bm25 (kolom `rank` FTS5) per coach yang lolos;
+        # dua-duanya ekspresi ORM biasa, jadi queryset tetap bisa di-chain / di-paginate.
+        matched = RawSQL(f'SELECT coach_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        rank = RawSQL(
+            f'SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'AND {FTS_TABLE}.coach_id = {Coach._meta.db_table}.id',
+            [match],
+            output_field=FloatField(),
+        )
+        return queryset.filter(pk__in=matched).annotate(search_rank=rank).order_by('search_rank', 'id')
+
+    def index(self, coaches):
+        super().index(coaches)
+        rows = [(_fts_rowid(c.pk), c.pk.hex, c.search_document) for c in coaches]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(r[0],) for r in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, coach_id, document) VALUES (%s, %s, %s)', rows
+            )
+
+    def remove(self, coach_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(_fts_rowid(i),) for i in coach_ids]
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        return super().rebuild()
+
+
+_BACKENDS = {
+    'postgresql': PostgresTrigramCoachSearch,
+    'sqlite': SqliteFtsCoachSearch,
+}
+_backend = None
+
+
+def get_search_backend():
+    """Backend search untuk database default (dicek sekali per proses)."""
+    global _backend
+    if _backend is None:
+        backend = _BACKENDS.get(connection.vendor, IcontainsCoachSearch)()
+        _backend = backend if backend.is_available() else IcontainsCoachSearch()
+    return _backend
@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Coach
+from .search import get_search_backend
+
+# Field User yang ikut masuk search_document coach
+_USER_SEARCH_FIELDS = {'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=Coach)
+def index_coach(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index([instance])
+
+
+@receiver(post_save, sender=User)
+def reindex_coach_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Login menyimpan last_login saja -> tidak perlu index ulang
+    if raw or (update_fields is not None and not _USER_SEARCH_FIELDS & set(update_fields)):
+        return
+    coach = Coach.objects.filter(user=instance).first()
+    if coach is not None:
+        get_search_backend().index([coach])
+
+
+@receiver(post_delete, sender=Coach)
+def unindex_coach(sender, instance, **kwargs):
+    get_search_backend().remove([instance.pk])
@@ -1,10 +1,24 @@
 from django.test import TestCase, Client
 from django.urls import reverse
 from django.contrib.auth.models import User
+from booking.models import Booking
+from main.testing import QueryBudgetMixin, bulk_users
 from users.models import Coach, Member
+from users.passwords import PasswordHashPool, create_user
 from users.forms import CoachRegistrationForm, MemberRegistrationForm
+from datetime import date, timedelta
 from decimal import Decimal
+from io import StringIO
 import json
+import os
+import tempfile
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, check_password, make_password
+from django.test import override_settings
+from django.db import connection
+from unittest import skipUnless
+from django.core.management import call_command
+from django.core.management.base import CommandError
 
 
 class CoachModelTest(TestCase):
@@ -324,6 +338,90 @@ class CoachListViewTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context['coaches']), 3)
 
+    def test_coach_list_sort_by_rating(self):
+        """Test sorting coaches by stored rating aggregates"""
+        Coach.objects.filter(user__username='coach1').update(rating_avg=4.8, rating_count=5)
+        Coach.objects.filter(user__username='coach2').update(rating_avg=4.8, rating_count=9)
+        response = self.client.get(self.url, {'sort': 'rating'})
+        self.assertEqual(response.status_code, 200)
+        usernames = [c.user.username for c in response.context['coaches']]
+        self.assertEqual(usernames, ['coach2', 'coach1', 'coach0'])
+        self.assertContains(response, '★ 4.8')
+
+    def _search(self, query):
+        response = self.client.get(self.url, {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return sorted(c.user.username for c in response.context['coaches'])
+
+    def test_coach_search_matches_city_sport_and_prefix(self):
+        """Test search covers name, city and sport display, per-word prefix"""
+        Coach.objects.filter(user__username='coach1').update(city='Bandung')
+        Coach.objects.get(user__username='coach1').save()
+        self.assertEqual(self._search('bandung'), ['coach1'])
+        self.assertEqual(self._search('band'), ['coach1'])
+        self.assertEqual(self._search('coach2 jakarta'), ['coach2'])
+        self.assertEqual(len(self._search('basketball')), 3)
+        self.assertEqual(self._search('tennis'), [])
+
+    def test_coach_search_composes_with_orm(self):
+        """Test backend search result can be chained like a normal queryset"""
+        from users.search import get_search_backend
+
+        Coach.objects.filter(user__username='coach1').update(city='Bandung')
+        Coach.objects.get(user__username='coach1').save()
+        results = get_search_backend().search(Coach.objects.select_related('user'), 'basketball')
+        self.assertEqual(results.count(), 3)
+        self.assertEqual([c.user.username for c in results.filter(city='Bandung')], ['coach1'])
+        self.assertEqual(results.exclude(city='Bandung').values('user__username').count(), 2)
+
+    def test_coach_search_index_follows_updates(self):
+        """Test signals keep the search index in sync on rename and delete"""
+        user = User.objects.get(username='coach0')
+        user.first_name = 'Ayu'
+        user.save()
+        self.assertEqual(self._search('ayu'), ['coach0'])
+        self.assertEqual(self._search('coach0'), [])
+
+        # Login hanya update last_login -> document tetap
+        self.client.login(username='coach0', password='pass123')
+        self.assertEqual(self._search('ayu'), ['coach0'])
+
+        Coach.objects.get(user=user).delete()
+        self.assertEqual(self._search('ayu'), [])
+
+    def test_rebuild_coach_search_command(self):
+        """Test rebuild indexes coaches created without signals"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        user = User.objects.create_user(username='bulk', password='pass123', first_name='Sari')
+        Coach.objects.bulk_create([Coach(user=user, sport='tennis', city='Medan')])
+        self.assertEqual(self._search('sari'), [])
+        out = StringIO()
+        call_command('rebuild_coach_search', stdout=out)
+        self.assertIn('Indexed 4 coach(es)', out.getvalue())
+        self.assertEqual(self._search('sari medan'), ['bulk'])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'trigram index hanya ada di PostgreSQL')
+class PostgresCoachSearchIndexTest(TestCase):
+    """Test the trigram GIN index matches the expression the search backend filters on"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='coach0', first_name='Budi', password='pass123')
+        Coach.objects.create(user=user, sport='basketball', city='Jakarta')
+
+    def test_search_plan_uses_trigram_index(self):
+        from users.search import TRIGRAM_INDEX, get_search_backend
+
+        backend = get_search_backend()
+        self.assertEqual(backend.name, 'postgres_trigram')
+        with connection.cursor() as cursor:
+            # Tabel test kecil -> paksa planner memilih index kalau index-nya bisa dipakai
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = backend.search(Coach.objects.all(), 'budi').explain()
+        self.assertIn(TRIGRAM_INDEX, plan)
+
 
 class CoachDetailViewTest(TestCase):
     """Test cases for coach detail view"""
@@ -469,4 +567,136 @@ class GetCoachJSONTest(TestCase):
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.content)
         self.assertEqual(data['username'], 'jsoncoach')
-        self.assertEqual(data['sport'], 'swimming')
\ No newline at end of file
+        self.assertEqual(data['sport'], 'swimming')
+
+
+class ImportCoachesCommandTest(TestCase):
+    HEADER = 'username,email,password,first_name,last_name,sport,hourly_fee,city,phone,description,profile_photo\n'
+
+    def _csv(self, *rows):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(self.HEADER + ''.join(row + '\n' for row in rows))
+        self.addCleanup(os.remove, path)
+        return path
+
+    def _run(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_coaches', path, '--workers', '1', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_in_batches_and_is_idempotent(self):
+        path = self._csv(*[
+            f'coach{i},c{i}@x.com,secret{i},Coach,{i},tennis,{100000 + i},Depok,0812,,'
+            for i in range(7)
+        ])
+        out, _ = self._run(path, '--batch-size', '3')
+        self.assertIn('7 dibuat', out)
+        self.assertIn('baris/detik', out)
+        coach = Coach.objects.select_related('user').get(user__username='coach3')
+        self.assertEqual(coach.hourly_fee, 100003)
+        self.assertTrue(check_password('secret3', coach.user.password))
+        self.assertIn('Depok', coach.search_document)
+
+        out, _ = self._run(path, '--batch-size', '3')
+        self.assertIn('0 dibuat', out)
+        self.assertIn('7 dilewati', out)
+        self.assertEqual(Coach.objects.count(), 7)
+
+    def test_upsert_updates_profile_but_not_password(self):
+        self._run(self._csv('andi,a@x.com,lama123,Andi,S,gym,100,Jakarta,0812,,'))
+        out, _ = self._run(self._csv('andi,baru@x.com,baru123,Andi,Baru,yoga,250,Bali,0813,Yoga pagi,'), '--upsert')
+        self.assertIn('1 di-update', out)
+        coach = Coach.objects.select_related('user').get(user__username='andi')
+        self.assertEqual((coach.sport, coach.hourly_fee, coach.city), ('yoga', 250, 'Bali'))
+        self.assertEqual(coach.user.email, 'baru@x.com')
+        self.assertTrue(check_password('lama123', coach.user.password))
+        self.assertTrue(Coach.objects.filter(search_document__icontains='Bali').exists())
+
+    def test_invalid_and_duplicate_rows_are_reported(self):
+        User.objects.create_user(username='member1', password='x')
+        path = self._csv(
+            'ok,o@x.com,pw,Ok,K,golf,1,Bogor,1,,',
+            'ok,o2@x.com,pw,Ok,K,golf,1,Bogor,1,,',
+            'bad,b@x.com,pw,B,B,curling,1,Bogor,1,,',
+            'fee,f@x.com,pw,F,F,golf,murah,Bogor,1,,',
+            'member1,m@x.com,pw,M,M,golf,1,Bogor,1,,',
+        )
+        out, err = self._run(path, '--upsert')
+        self.assertIn('1 dibuat', out)
+        self.assertIn('1 dilewati', out)
+        self.assertIn('3 error', out)
+        self.assertIn('curling', err)
+        self.assertIn('bukan coach', err)
+
+    def test_process_pool_hashing(self):
+        path = self._csv(*[f'pool{i},p{i}@x.com,pw{i},P,{i},golf,1,Bogor,1,,' for i in range(4)])
+        call_command('import_coaches', path, '--workers', '2', '--processes', stdout=StringIO())
+        user = User.objects.get(username='pool2')
+        self.assertTrue(check_password('pw2', user.password))
+
+    def test_missing_file_or_columns(self):
+        with self.assertRaises(CommandError):
+            self._run('/tidak/ada.csv')
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w') as f:
+            f.write('username,email\nx,y\n')
+        self.addCleanup(os.remove, path)
+        with self.assertRaises(CommandError):
+            self._run(path)
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = 1
+
+
+class PasswordHashingTest(TestCase):
+    def test_create_user_hashes_through_pool(self):
+        user = create_user(username='pooled', password='s3cret-pw', email='Pooled@EXAMPLE.com')
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('s3cret-pw'))
+        self.assertEqual(user.email, 'Pooled@example.com')
+
+    def test_bulk_pool_threads(self):
+        with PasswordHashPool(workers=3) as pool:
+            hashes = pool.hash(f'pw{i}' for i in range(7))
+        self.assertEqual(len(set(hashes)), 7)
+        self.assertTrue(all(check_password(f'pw{i}', h) for i, h in enumerate(hashes)))
+
+    @override_settings(PASSWORD_HASHERS=[
+        'users.tests.FastPBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
+    def test_legacy_hash_is_upgraded_on_login(self):
+        user = User.objects.create(username='legacy', password=make_password('old-pass-123', hasher='md5'))
+        response = self.client.post(reverse('users:login'), {'username': 'legacy', 'password': 'old-pass-123'})
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1$'))
+        self.assertTrue(user.check_password('old-pass-123'))
+
+
+class UsersQueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.member = Member.objects.create(
+            user=User.objects.create_user(username='member', password='pass123'), city='Depok', phone='1'
+        )
+        self.client.login(username='member', password='pass123')
+
+    def seed(self, n):
+        coaches = Coach.objects.bulk_create(
+            Coach(user=user, sport='tennis', city='Depok', hourly_fee=100) for user in bulk_users(n, prefix='coach')
+        )
+        Booking.objects.bulk_create(
+            Booking(coach=coach, member=self.member, date=date.today() + timedelta(days=i % 30))
+            for i, coach in enumerate(coaches)
+        )
+
+    def test_coach_list(self):
+        self.assertQueryBudget(reverse('users:coach_list'), budget=6)
+
+    def test_coach_list_sorted_by_rating(self):
+        self.assertQueryBudget(reverse('users:coach_list'), budget=6, data={'sort': 'rating'})
+
+    def test_show_profile(self):
+        self.assertQueryBudget(reverse('users:show_profile'), budget=5)
@@ -6,11 +6,12 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.db.models import Q
 from django.utils import timezone
 from django.core.paginator import Paginator
 
 from .models import Member, Coach
+from .passwords import create_user
+from .search import get_search_backend
 from .forms import (
     MemberRegistrationForm,
     CoachRegistrationForm,
@@ -19,6 +20,7 @@ from .forms import (
     CoachEditForm
 )
 from booking.models import Booking
+from main.cache import cache_public_page
 
 
 # AUTH / REGISTRATION
@@ -28,7 +30,7 @@ def register_member(request):
     if request.method == 'POST':
         form = MemberRegistrationForm(request.POST)
         if form.is_valid():
-            user = User.objects.create_user(
+            user = create_user(
                 username=form.cleaned_data['username'],
                 email=form.cleaned_data['email'],
                 password=form.cleaned_data['password'],
@@ -53,7 +55,7 @@ def register_coach(request):
     if request.method == 'POST':
         form = CoachRegistrationForm(request.POST)
         if form.is_valid():
-            user = User.objects.create_user(
+            user = create_user(
                 username=form.cleaned_data['username'],
                 email=form.cleaned_data['email'],
                 password=form.cleaned_data['password'],
@@ -100,7 +102,11 @@ def show_profile(request):
 
     if hasattr(user, 'member'):
         profile = user.member
-        bookings = Booking.objects.filter(member=user.member).order_by('-date', '-start_time')
+        bookings = Booking.with_display_status(
+            Booking.objects.filter(member=user.member)
+            .select_related('coach__user')
+            .order_by('-date', '-start_time')
+        )
         user_form = UserEditForm(instance=user)
         profile_form = MemberEditForm(instance=profile)
         context.update({
@@ -114,7 +120,11 @@ def show_profile(request):
     
     elif hasattr(user, 'coach'):
         profile = user.coach
-        bookings = Booking.objects.filter(coach=user.coach).order_by('-date', '-start_time')
+        bookings = Booking.with_display_status(
+            Booking.objects.filter(coach=user.coach)
+            .select_related('member__user')
+            .order_by('-date', '-start_time')
+        )
         user_form = UserEditForm(instance=user)
         profile_form = CoachEditForm(instance=profile)
         context.update({
@@ -212,29 +222,31 @@ def member_details(request, id):
     return render(request, "member_details.html", {'member': member})
 
 
+@cache_public_page('coaches')
 def coach_detail(request, coach_id):
     coach = get_object_or_404(Coach, pk=coach_id)
     return render(request, 'coach_detail.html', {'coach': coach})
     
+@cache_public_page('coaches')
 def coach_list(request):
     query = request.GET.get('q', '')
     sport_filter = request.GET.get('sport', '')
+    sort = request.GET.get('sort', '')
     
-    coaches = Coach.objects.all()
+    coaches = Coach.objects.select_related('user')
 
-    # Search filter
+    # Search filter (FTS5 di SQLite / trigram di PostgreSQL, hasil sudah di-rank)
     if query:
-        coaches = coaches.filter(
-            Q(user__first_name__icontains=query) |
-            Q(user__last_name__icontains=query) |
-            Q(sport__icontains=query) |
-            Q(city__icontains=query)
-        ).distinct()
+        coaches = get_search_backend().search(coaches, query)
 
     # Sport filter
     if sport_filter:
         coaches = coaches.filter(sport=sport_filter)
 
+    # Sort by rating pakai agregat yang tersimpan di Coach (index coach_rating_idx)
+    if sort == 'rating':
+        coaches = coaches.order_by('-rating_avg', '-rating_count')
+
     # Get sport choices from the Coach model
     sport_choices = Coach._meta.get_field('sport').choices
 
@@ -247,6 +259,7 @@ def coach_list(request):
         'coaches': page_obj,
         'search_query': query,
         'sport_filter': sport_filter,
+        'sort': sort,
         'sport_choices': sport_choices,
         'page_obj': page_obj,
     }